@@ -21,6 +21,7 @@ log = logging.getLogger(__name__)
 
 
 _hexmatch = re.compile("^[a-f,0-9]+$")
+PARTIAL_FILE_SUFFIX = ".part"
 
 
 def is_valid_blobhash(blobhash: str) -> bool:
@@ -199,12 +200,24 @@ class AbstractBlob:
             if self.blob_completed_callback:
                 self.blob_completed_callback(self)
 
+    def _get_partial_file_path(self) -> typing.Optional[str]:
+        return None
+
+    def save_verified_file(self, verified_file_path: str):
+        raise NotImplementedError()
+
     def get_blob_writer(self, peer_address: typing.Optional[str] = None,
-                        peer_port: typing.Optional[int] = None) -> HashBlobWriter:
+                        peer_port: typing.Optional[int] = None, stream_to_disk: bool = False) -> HashBlobWriter:
+        """
+        Get a writer for the blob, if stream_to_disk is set and the blob is file backed the bytes are written to a
+        partial file as they arrive rather than being held in memory until the blob is verified
+        """
         if (peer_address, peer_port) in self.writers and not self.writers[(peer_address, peer_port)].closed():
             raise OSError(f"attempted to download blob twice from {peer_address}:{peer_port}")
         fut = asyncio.Future(loop=self.loop)
-        writer = HashBlobWriter(self.blob_hash, self.get_length, fut)
+        writer = HashBlobWriter(
+            self.blob_hash, self.get_length, fut, None if not stream_to_disk else self._get_partial_file_path()
+        )
         self.writers[(peer_address, peer_port)] = writer
 
         def remove_writer(_):
@@ -218,12 +231,15 @@ class AbstractBlob:
                 err = finished.exception()
                 if err:
                     raise err
-                verified_bytes = finished.result()
+                verified = finished.result()
                 while self.writers:
                     _, other = self.writers.popitem()
                     if other is not writer:
                         other.close_handle()
-                self.save_verified_blob(verified_bytes)
+                if writer.file_path:
+                    self.save_verified_file(verified)
+                else:
+                    self.save_verified_blob(verified)
             except (InvalidBlobHashError, InvalidDataError) as error:
                 log.warning("writer error downloading %s: %s", self.blob_hash[:8], str(error))
             except (DownloadCancelledError, asyncio.CancelledError, asyncio.TimeoutError):
@@ -260,6 +276,12 @@ class BlobBuffer(AbstractBlob):
             raise OSError("already have bytes for blob")
         self._verified_bytes = BytesIO(blob_bytes)
 
+    def save_verified_file(self, verified_file_path: str):
+        with open(verified_file_path, 'rb') as f:
+            verified_bytes = f.read()
+        os.remove(verified_file_path)
+        self.save_verified_blob(verified_bytes)
+
     def delete(self):
         if self._verified_bytes:
             self._verified_bytes.close()
@@ -300,10 +322,22 @@ class BlobFile(AbstractBlob):
         return super().is_writeable() and not os.path.isfile(self.file_path)
 
     def get_blob_writer(self, peer_address: typing.Optional[str] = None,
-                        peer_port: typing.Optional[str] = None) -> HashBlobWriter:
+                        peer_port: typing.Optional[str] = None, stream_to_disk: bool = False) -> HashBlobWriter:
         if self.file_exists:
             raise OSError(f"File already exists '{self.file_path}'")
-        return super().get_blob_writer(peer_address, peer_port)
+        return super().get_blob_writer(peer_address, peer_port, stream_to_disk)
+
+    def _get_partial_file_path(self) -> str:
+        return f"{self.file_path}.{binascii.hexlify(os.urandom(4)).decode()}{PARTIAL_FILE_SUFFIX}"
+
+    def save_verified_file(self, verified_file_path: str):
+        if self.verified.is_set() or not self.is_writeable():
+            os.remove(verified_file_path)
+            return
+        os.replace(verified_file_path, self.file_path)
+        self.verified.set()
+        if self.blob_completed_callback:
+            self.blob_completed_callback(self)
 
     @contextlib.contextmanager
     def _reader_context(self) -> typing.ContextManager[typing.BinaryIO]:
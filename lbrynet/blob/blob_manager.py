@@ -2,7 +2,8 @@ import os
 import typing
 import asyncio
 import logging
-from lbrynet.blob.blob_file import is_valid_blobhash, BlobFile, BlobBuffer, AbstractBlob
+import weakref
+from lbrynet.blob.blob_file import is_valid_blobhash, BlobFile, BlobBuffer, AbstractBlob, PARTIAL_FILE_SUFFIX
 from lbrynet.stream.descriptor import StreamDescriptor
 
 if typing.TYPE_CHECKING:
@@ -13,7 +14,42 @@ if typing.TYPE_CHECKING:
 log = logging.getLogger(__name__)
 
 
+class BlobCompletionCounter:
+    """
+    The set of verified blobs out of a group of blobs (such as the data blobs of a stream), kept up to date by the
+    BlobManager as blobs are completed or deleted
+    """
+    __slots__ = [
+        'blob_hashes',
+        'completed',
+        '__weakref__'
+    ]
+
+    def __init__(self, blob_hashes: typing.Set[str], completed: typing.Set[str]):
+        self.blob_hashes = blob_hashes
+        self.completed = completed
+
+    def __len__(self) -> int:
+        return len(self.completed)
+
+    @property
+    def remaining(self) -> int:
+        return len(self.blob_hashes) - len(self.completed)
+
+
+def _prune_completion_counters(completion_counters: typing.Dict[str, 'weakref.WeakSet[BlobCompletionCounter]'],
+                               blob_hashes: typing.Set[str]):
+    # called once a counter is garbage collected, drops the blobs no other counter is keeping track of
+    for blob_hash in blob_hashes:
+        counters = completion_counters.get(blob_hash)
+        if counters is not None and not any(True for _ in counters):
+            del completion_counters[blob_hash]
+
+
 class BlobManager:
+    BLOB_WRITE_INTERVAL = 0.5  # seconds to collect blob completions for before writing them to the database
+    BLOB_WRITE_BATCH_SIZE = 100  # write right away once this many completions are waiting
+
     def __init__(self, loop: asyncio.BaseEventLoop, blob_dir: str, storage: 'SQLiteStorage', config: 'Config',
                  node_data_store: typing.Optional['DictDataStore'] = None):
         """
@@ -30,6 +66,12 @@ class BlobManager:
             else self._node_data_store.completed_blobs
         self.blobs: typing.Dict[str, AbstractBlob] = {}
         self.config = config
+        self._completion_counters: typing.Dict[str, 'weakref.WeakSet[BlobCompletionCounter]'] = {}
+        # blob hash: length, for the completions waiting to be written to the database
+        self._pending_finished_blobs: typing.Dict[str, int] = {}
+        self._pending_unfinished_blobs: typing.Dict[str, int] = {}
+        self._pending_blob_write: typing.Optional[asyncio.Future] = None
+        self._blob_write_handle: typing.Optional[asyncio.TimerHandle] = None
 
     def _get_blob(self, blob_hash: str, length: typing.Optional[int] = None):
         if self.config.save_blobs:
@@ -70,13 +112,38 @@ class BlobManager:
             return False
         return self._get_blob(blob_hash, length).get_is_verified()
 
+    def get_completion_counter(self, blob_hashes: typing.List[str]) -> BlobCompletionCounter:
+        """
+        Check which of the given blobs are verified once, and return a counter that is updated incrementally as they
+        are completed or deleted afterwards
+        """
+        counter = BlobCompletionCounter(set(blob_hashes), set(self.check_completed_blobs(blob_hashes)))
+        for blob_hash in counter.blob_hashes:
+            self._completion_counters.setdefault(blob_hash, weakref.WeakSet()).add(counter)
+        weakref.finalize(counter, _prune_completion_counters, self._completion_counters, counter.blob_hashes)
+        return counter
+
+    def _update_completion_counters(self, blob_hash: str, completed: bool):
+        counters = self._completion_counters.get(blob_hash)
+        if counters is None:
+            return
+        for counter in counters:
+            if completed:
+                counter.completed.add(blob_hash)
+            else:
+                counter.completed.discard(blob_hash)
+
     async def setup(self) -> bool:
         def get_files_in_blob_dir() -> typing.Set[str]:
             if not self.blob_dir:
                 return set()
-            return {
-                item.name for item in os.scandir(self.blob_dir) if is_valid_blobhash(item.name)
-            }
+            blob_files = set()
+            for item in os.scandir(self.blob_dir):
+                if is_valid_blobhash(item.name):
+                    blob_files.add(item.name)
+                elif item.name.endswith(PARTIAL_FILE_SUFFIX):  # left over from an interrupted streamed write
+                    os.remove(item.path)
+            return blob_files
         in_blobfiles_dir = await self.loop.run_in_executor(None, get_files_in_blob_dir)
         to_add = await self.storage.sync_missing_blobs(in_blobfiles_dir)
         if to_add:
@@ -84,25 +151,93 @@ class BlobManager:
         return True
 
     def stop(self):
+        """
+        Stop the blob manager, flush_blob_writes should be awaited first or the completions waiting to be written
+        are dropped
+        """
+        if self._blob_write_handle:
+            self._blob_write_handle.cancel()
+            self._blob_write_handle = None
+        if self._pending_blob_write:
+            log.warning("dropping %i blob completions not written to the database",
+                        len(self._pending_finished_blobs) + len(self._pending_unfinished_blobs))
+            self._pending_blob_write.cancel()
+            self._pending_blob_write = None
+            self._pending_finished_blobs.clear()
+            self._pending_unfinished_blobs.clear()
         while self.blobs:
-            _, blob = self.blobs.popitem()
+            blob_hash, blob = self.blobs.popitem()
             blob.close()
+            if isinstance(blob, BlobBuffer):  # in memory blobs are gone once closed
+                self._update_completion_counters(blob_hash, False)
         self.completed_blob_hashes.clear()
 
     def get_stream_descriptor(self, sd_hash):
         return StreamDescriptor.from_stream_descriptor_blob(self.loop, self.blob_dir, self.get_blob(sd_hash))
 
-    def blob_completed(self, blob: AbstractBlob) -> asyncio.Task:
+    async def _write_blobs(self, finished: typing.Dict[str, int], unfinished: typing.Dict[str, int],
+                           written: asyncio.Future):
+        try:
+            await self.storage.add_completed_blobs(finished, unfinished)
+        except asyncio.CancelledError:
+            written.cancel()
+            raise
+        except Exception as err:
+            log.error("failed to write %i blob completions to the database: %s", len(finished) + len(unfinished),
+                      str(err))
+            if not written.done():
+                written.set_exception(err)
+                # most callers of blob_completed don't wait for the write, the error was logged above
+                written.add_done_callback(lambda f: f.exception())
+        else:
+            if not written.done():
+                written.set_result(None)
+
+    def _flush_blob_writes(self) -> typing.Optional[asyncio.Future]:
+        if self._blob_write_handle:
+            self._blob_write_handle.cancel()
+            self._blob_write_handle = None
+        written = self._pending_blob_write
+        if not written:
+            return
+        finished, self._pending_finished_blobs = self._pending_finished_blobs, {}
+        unfinished, self._pending_unfinished_blobs = self._pending_unfinished_blobs, {}
+        self._pending_blob_write = None
+        self.loop.create_task(self._write_blobs(finished, unfinished, written))
+        return written
+
+    async def flush_blob_writes(self):
+        """
+        Write the blob completions waiting in the write-behind queue to the database
+        """
+        written = self._flush_blob_writes()
+        if written:
+            await written
+
+    def blob_completed(self, blob: AbstractBlob) -> asyncio.Future:
+        """
+        Mark a blob as completed, the database is updated in batches
+
+        :return: future that resolves once the completion is written to the database
+        """
         if blob.blob_hash is None:
             raise Exception("Blob hash is None")
         if not blob.length:
             raise Exception("Blob has a length of 0")
+        self._update_completion_counters(blob.blob_hash, True)
         if isinstance(blob, BlobFile):
             if blob.blob_hash not in self.completed_blob_hashes:
                 self.completed_blob_hashes.add(blob.blob_hash)
-            return self.loop.create_task(self.storage.add_blobs((blob.blob_hash, blob.length), finished=True))
+            self._pending_finished_blobs[blob.blob_hash] = blob.length
         else:
-            return self.loop.create_task(self.storage.add_blobs((blob.blob_hash, blob.length), finished=False))
+            self._pending_unfinished_blobs[blob.blob_hash] = blob.length
+        written = self._pending_blob_write
+        if not written:
+            written = self._pending_blob_write = self.loop.create_future()
+            self._blob_write_handle = self.loop.call_later(self.BLOB_WRITE_INTERVAL, self._flush_blob_writes)
+        if len(self._pending_finished_blobs) + len(self._pending_unfinished_blobs) >= self.BLOB_WRITE_BATCH_SIZE:
+            self._flush_blob_writes()
+        return written
 
     def check_completed_blobs(self, blob_hashes: typing.List[str]) -> typing.List[str]:
         """Returns of the blobhashes_to_check, which are valid"""
@@ -111,6 +246,8 @@ class BlobManager:
     def delete_blob(self, blob_hash: str):
         if not is_valid_blobhash(blob_hash):
             raise Exception("invalid blob hash to delete")
+        self._pending_finished_blobs.pop(blob_hash, None)
+        self._pending_unfinished_blobs.pop(blob_hash, None)
 
         if blob_hash not in self.blobs:
             if self.blob_dir and os.path.isfile(os.path.join(self.blob_dir, blob_hash)):
@@ -119,6 +256,7 @@ class BlobManager:
             self.blobs.pop(blob_hash).delete()
             if blob_hash in self.completed_blob_hashes:
                 self.completed_blob_hashes.remove(blob_hash)
+        self._update_completion_counters(blob_hash, False)
 
     async def delete_blobs(self, blob_hashes: typing.List[str], delete_from_db: typing.Optional[bool] = True):
         for blob_hash in blob_hashes:
@@ -1,3 +1,4 @@
+import os
 import typing
 import logging
 import asyncio
@@ -10,14 +11,23 @@ log = logging.getLogger(__name__)
 
 class HashBlobWriter:
     def __init__(self, expected_blob_hash: str, get_length: typing.Callable[[], int],
-                 finished: asyncio.Future):
+                 finished: asyncio.Future, file_path: typing.Optional[str] = None):
+        """
+        Verify the bytes of a blob as they are written
+
+        The bytes are kept in memory and are the result of `finished` once verified, unless `file_path` is given.
+        In that case they are written to that (temporary) file as they arrive and the result is the path, the file is
+        removed if the writer is closed before the blob is verified.
+        """
         self.expected_blob_hash = expected_blob_hash
         self.get_length = get_length
-        self.buffer = BytesIO()
+        self.file_path = file_path
+        self.buffer: typing.Optional[typing.BinaryIO] = BytesIO() if not file_path else open(file_path, 'wb')
         self.finished = finished
         self.finished.add_done_callback(lambda *_: self.close_handle())
         self._hashsum = get_lbry_hash_obj()
         self.len_so_far = 0
+        self.verified = False
 
     def __del__(self):
         if self.buffer is not None:
@@ -57,7 +67,8 @@ class HashBlobWriter:
                     f"blob hash is {blob_hash} vs expected {self.expected_blob_hash}"
                 ))
             elif self.finished and not (self.finished.done() or self.finished.cancelled()):
-                self.finished.set_result(self.buffer.getvalue())
+                self.verified = True
+                self.finished.set_result(self.buffer.getvalue() if not self.file_path else self.file_path)
             self.close_handle()
 
     def close_handle(self):
@@ -66,3 +77,5 @@ class HashBlobWriter:
         if self.buffer is not None:
             self.buffer.close()
             self.buffer = None
+            if self.file_path and not self.verified and os.path.isfile(self.file_path):
+                os.remove(self.file_path)
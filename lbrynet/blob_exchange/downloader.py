@@ -3,12 +3,14 @@ import typing
 import logging
 from lbrynet.utils import cache_concurrent
 from lbrynet.blob_exchange.client import request_blob
+from lbrynet.blob_exchange.scheduler import PRIORITY_FOREGROUND
 if typing.TYPE_CHECKING:
     from lbrynet.conf import Config
     from lbrynet.dht.node import Node
     from lbrynet.dht.peer import KademliaPeer
     from lbrynet.blob.blob_manager import BlobManager
     from lbrynet.blob.blob_file import AbstractBlob
+    from lbrynet.blob_exchange.scheduler import DownloadScheduler
 
 log = logging.getLogger(__name__)
 
@@ -17,24 +19,42 @@ class BlobDownloader:
     BAN_FACTOR = 2.0  # fixme: when connection manager gets implemented, move it out from here
 
     def __init__(self, loop: asyncio.BaseEventLoop, config: 'Config', blob_manager: 'BlobManager',
-                 peer_queue: asyncio.Queue):
+                 peer_queue: asyncio.Queue, download_scheduler: typing.Optional['DownloadScheduler'] = None,
+                 peers_exhausted_callback: typing.Optional[typing.Callable[[], None]] = None,
+                 peer_failed_callback: typing.Optional[typing.Callable[['KademliaPeer'], None]] = None):
         self.loop = loop
         self.config = config
         self.blob_manager = blob_manager
         self.peer_queue = peer_queue
+        self.download_scheduler = download_scheduler
+        self.peers_exhausted_callback = peers_exhausted_callback
+        self.peer_failed_callback = peer_failed_callback
+        self.peers: typing.Set['KademliaPeer'] = set()  # every peer found so far, offered for each blob
         self.active_connections: typing.Dict['KademliaPeer', asyncio.Task] = {}  # active request_blob calls
         self.ignored: typing.Dict['KademliaPeer', int] = {}
         self.scores: typing.Dict['KademliaPeer', int] = {}
         self.failures: typing.Dict['KademliaPeer', int] = {}
         self.connections: typing.Dict['KademliaPeer', asyncio.Transport] = {}
         self.is_running = asyncio.Event(loop=self.loop)
+        # priorities of the pending download_blob calls, per blob hash
+        self.blob_priorities: typing.Dict[str, typing.List[int]] = {}
 
     def should_race_continue(self, blob: 'AbstractBlob'):
         if len(self.active_connections) >= self.config.max_connections_per_download:
             return False
         return not (blob.get_is_verified() or not blob.is_writeable())
 
-    async def request_blob_from_peer(self, blob: 'AbstractBlob', peer: 'KademliaPeer', connection_id: int = 0):
+    async def request_blob_from_peer(self, blob: 'AbstractBlob', peer: 'KademliaPeer', connection_id: int = 0,
+                                     priority: int = PRIORITY_FOREGROUND):
+        if not self.download_scheduler:
+            return await self._request_blob_from_peer(blob, peer, connection_id)
+        await self.download_scheduler.acquire(priority)
+        try:
+            return await self._request_blob_from_peer(blob, peer, connection_id)
+        finally:
+            self.download_scheduler.release(priority)
+
+    async def _request_blob_from_peer(self, blob: 'AbstractBlob', peer: 'KademliaPeer', connection_id: int = 0):
         if blob.get_is_verified():
             return
         transport = self.connections.get(peer)
@@ -49,6 +69,8 @@ class BlobDownloader:
             self.failures[peer] = self.failures.get(peer, 0) + 1
             if peer in self.connections:
                 del self.connections[peer]
+            if self.peer_failed_callback:
+                self.peer_failed_callback(peer)
         elif transport:
             log.debug("keep peer %s:%i", peer.address, peer.tcp_port)
             self.failures[peer] = 0
@@ -74,30 +96,47 @@ class BlobDownloader:
             if (now - when) < min(30.0, (self.failures.get(peer, 0) ** self.BAN_FACTOR))
         ))
 
-    @cache_concurrent
     async def download_blob(self, blob_hash: str, length: typing.Optional[int] = None,
-                            connection_id: int = 0) -> 'AbstractBlob':
+                            connection_id: int = 0, priority: int = PRIORITY_FOREGROUND) -> 'AbstractBlob':
+        """
+        Download a blob, concurrent calls for the same blob share one download that runs at the highest of their
+        priorities
+        """
+        priorities = self.blob_priorities.setdefault(blob_hash, [])
+        priorities.append(priority)
+        try:
+            return await self._download_blob(blob_hash, length, connection_id)
+        finally:
+            priorities.remove(priority)
+            if not priorities:
+                del self.blob_priorities[blob_hash]
+
+    @cache_concurrent
+    async def _download_blob(self, blob_hash: str, length: typing.Optional[int] = None,
+                             connection_id: int = 0) -> 'AbstractBlob':
         blob = self.blob_manager.get_blob(blob_hash, length)
         if blob.get_is_verified():
             return blob
         self.is_running.set()
         try:
             while not blob.get_is_verified() and self.is_running.is_set():
-                batch: typing.Set['KademliaPeer'] = set()
                 while not self.peer_queue.empty():
-                    batch.update(self.peer_queue.get_nowait())
-                if batch:
-                    self.peer_queue.put_nowait(list(batch))
+                    self.peers.update(self.peer_queue.get_nowait())
                 log.debug(
                     "running, %d peers, %d ignored, %d active",
-                    len(batch), len(self.ignored), len(self.active_connections)
+                    len(self.peers), len(self.ignored), len(self.active_connections)
                 )
-                for peer in sorted(batch, key=lambda peer: self.scores.get(peer, 0), reverse=True):
+                if self.peers_exhausted_callback and not self.active_connections and \
+                        all(peer in self.ignored for peer in self.peers):
+                    self.peers_exhausted_callback()
+                for peer in sorted(self.peers, key=lambda peer: self.scores.get(peer, 0), reverse=True):
                     if not self.should_race_continue(blob):
                         break
                     if peer not in self.active_connections and peer not in self.ignored:
                         log.debug("request %s from %s:%i", blob_hash[:8], peer.address, peer.tcp_port)
-                        t = self.loop.create_task(self.request_blob_from_peer(blob, peer, connection_id))
+                        t = self.loop.create_task(self.request_blob_from_peer(
+                            blob, peer, connection_id, min(self.blob_priorities.get(blob_hash, [PRIORITY_FOREGROUND]))
+                        ))
                         self.active_connections[peer] = t
                 await self.new_peer_or_finished()
                 self.cleanup_active()
@@ -119,7 +158,9 @@ async def download_blob(loop, config: 'Config', blob_manager: 'BlobManager', nod
     search_queue = asyncio.Queue(loop=loop, maxsize=config.max_connections_per_download)
     search_queue.put_nowait(blob_hash)
     peer_queue, accumulate_task = node.accumulate_peers(search_queue)
-    downloader = BlobDownloader(loop, config, blob_manager, peer_queue)
+    downloader = BlobDownloader(
+        loop, config, blob_manager, peer_queue, peer_failed_callback=node.peer_search_cache.invalidate_peer
+    )
     try:
         return await downloader.download_blob(blob_hash)
     finally:
@@ -0,0 +1,73 @@
+import asyncio
+import typing
+import collections
+
+PRIORITY_INTERACTIVE = 0  # range requests streaming to a player
+PRIORITY_FOREGROUND = 1  # streams being downloaded for a `get`
+PRIORITY_BACKGROUND = 2  # saves resumed at startup and other re-downloads
+
+# fraction of the connections a class may use while a higher priority class is downloading
+PRIORITY_SHARES = {
+    PRIORITY_INTERACTIVE: 1.0,
+    PRIORITY_FOREGROUND: 0.5,
+    PRIORITY_BACKGROUND: 0.25
+}
+
+
+class DownloadScheduler:
+    """
+    Daemon-wide limit on the number of concurrent blob requests, shared between priority classes.
+
+    When only one class is downloading it can use all of the connections. Once a higher priority class has active or
+    waiting requests, the lower priority classes are limited to their share of the connections and the freed
+    connections go to the highest priority waiters first.
+
+    With max_connections set to 0 there is no overall limit, the lower priority classes are then limited to their
+    share of the connections in use so they still give way to the higher priority ones.
+    """
+
+    def __init__(self, loop: asyncio.BaseEventLoop, max_connections: int):
+        self.loop = loop
+        self.max_connections = max_connections
+        self.active: typing.Dict[int, int] = {priority: 0 for priority in PRIORITY_SHARES}
+        self.waiting: typing.Dict[int, typing.Deque[asyncio.Future]] = {
+            priority: collections.deque() for priority in PRIORITY_SHARES
+        }
+
+    def _can_start(self, priority: int) -> bool:
+        in_use = sum(self.active.values())
+        if self.max_connections and in_use >= self.max_connections:
+            return False
+        if any(self.active[p] or self.waiting[p] for p in PRIORITY_SHARES if p < priority):
+            share = int((self.max_connections or in_use) * PRIORITY_SHARES[priority])
+            return self.active[priority] < max(1, share)
+        return True
+
+    def _wake_waiters(self):
+        for priority in sorted(self.waiting):
+            waiting = self.waiting[priority]
+            while waiting and self._can_start(priority):
+                fut = waiting.popleft()
+                if not fut.done():
+                    self.active[priority] += 1
+                    fut.set_result(None)
+
+    async def acquire(self, priority: int):
+        if not any(self.waiting[p] for p in PRIORITY_SHARES if p <= priority) and self._can_start(priority):
+            self.active[priority] += 1
+            return
+        fut = self.loop.create_future()
+        self.waiting[priority].append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():  # the connection was granted before the cancel was delivered
+                self.release(priority)
+            elif fut in self.waiting[priority]:
+                self.waiting[priority].remove(fut)
+                self._wake_waiters()
+            raise
+
+    def release(self, priority: int):
+        self.active[priority] -= 1
+        self._wake_waiters()
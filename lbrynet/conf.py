@@ -483,6 +483,12 @@ class Config(CLIConfig):
     peer_connect_timeout = Float("Timeout to establish a TCP connection to a peer", 3.0)
     node_rpc_timeout = Float("Timeout when making a DHT request", constants.rpc_timeout)
 
+    # database
+    database_read_connections = Integer(
+        "Number of read only database connections used for listing files and blobs alongside the connection that "
+        "writes to the database, set to 0 to run every query on the writer", 4
+    )
+
     # blob announcement and download
     save_blobs = Toggle("Save encrypted blob files for hosting, otherwise download blobs to memory only.", True)
 
@@ -491,17 +497,31 @@ class Config(CLIConfig):
         previous_names=['announce_head_blobs_only']
     )
     concurrent_blob_announcers = Integer(
-        "Number of blobs to iteratively announce at once, set to 0 to disable", 10,
+        "Maximum number of blobs to iteratively announce at once, lowered while announcements are failing or the "
+        "packet rate limit is reached, set to 0 to disable", 10,
         previous_names=['concurrent_announcers']
     )
+    announce_packets_per_second = Float(
+        "Maximum rate of DHT requests the node sends while announcing blobs, counting the other requests it sends "
+        "in the meantime (such as pings) but not its replies to other nodes, set to 0 for no limit", 200.0
+    )
     max_connections_per_download = Integer(
         "Maximum number of peers to connect to while downloading a blob", 4,
         previous_names=['max_connections_per_stream']
     )
+    max_download_connections = Integer(
+        "Maximum number of blob requests to run at once across all downloads, shared between streaming to a "
+        "player, downloads started with `get` and background saves (in that priority order), set to 0 for no "
+        "limit (the lower priorities still give way to the higher ones)", 0
+    )
     fixed_peer_delay = Float(
         "Amount of seconds before adding the reflector servers as potential peers to download from in case dht"
         "peers are not found or are slow", 2.0
     )
+    speculative_head_blob_fetch = Toggle(
+        "Start downloading the head blob of a stream from the peers that had the descriptor as soon as the "
+        "descriptor is loaded, while searching for more peers for the head blob", True
+    )
     max_key_fee = MaxKeyFee(
         "Don't download streams with fees exceeding this amount", {'currency': 'USD', 'amount': 50.0}
     )
@@ -514,6 +534,9 @@ class Config(CLIConfig):
     concurrent_reflector_uploads = Integer(
         "Maximum number of streams to upload to a reflector server at a time", 10
     )
+    reflector_upload_connections = Integer(
+        "Maximum number of connections to open to a reflector server while uploading the blobs of a stream", 4
+    )
 
     # servers
     reflector_servers = Servers("Reflector re-hosting servers", [
@@ -541,6 +564,11 @@ class Config(CLIConfig):
 
     # daemon
     save_files = Toggle("Save downloaded files when calling `get` by default", True)
+    lazy_stream_restore = Toggle(
+        "Initialize managed files from the database in the background after the stream manager starts, "
+        "rather than before. Files are initialized on demand when looked up by commands or the streaming server, "
+        "file_list only includes files that have been initialized.", False
+    )
     components_to_skip = Strings("components which will be skipped during start-up of daemon", [])
     share_usage_data = Toggle(
         "Whether to share usage stats and diagnostic info with LBRY.", True,
@@ -8,50 +8,137 @@ if typing.TYPE_CHECKING:
 log = logging.getLogger(__name__)
 
 
+class AnnounceScheduler:
+    """
+    Sizes the announce batches and the delays between them from the backlog of blobs to announce and from how the
+    previous batches went, keeping the DHT node under `max_packets_per_second` sent request packets (0 for no limit)
+
+    The requests counted are all the ones the node sends while a batch is announced, including the pings and
+    routing table refreshes running at the same time, but not the replies to requests from other nodes.
+    """
+
+    idle_delay = 60.0  # seconds to wait between rounds once the overdue blobs are announced
+    batch_seconds = 30.0  # target duration of a batch, so progress is saved regularly
+    fetch_limit = 1000  # overdue blobs to fetch from the database per round
+    smoothing = 0.3
+
+    def __init__(self, max_concurrency: int, max_packets_per_second: float = 0.0):
+        self.max_concurrency = max_concurrency
+        self.max_packets_per_second = max_packets_per_second
+        self.concurrency = max_concurrency
+        self.success_rate = 1.0
+        self.blobs_per_second: typing.Optional[float] = None
+        self.packets_per_blob: typing.Optional[float] = None
+        self.backlogged = False
+
+    def _smooth(self, average: typing.Optional[float], value: float) -> float:
+        return value if average is None else average + self.smoothing * (value - average)
+
+    def round_delay(self) -> float:
+        # start the next round right away while more blobs are overdue than fit in a round, unless most of the
+        # announcements are failing
+        if self.backlogged and self.success_rate >= 0.5:
+            return 0.0
+        return self.idle_delay
+
+    def fetched(self, blob_count: int):
+        self.backlogged = blob_count >= self.fetch_limit
+
+    def next_batch_size(self, queued: int) -> int:
+        if self.blobs_per_second is None:
+            batch = self.concurrency * 10
+        else:
+            batch = max(self.concurrency, int(self.blobs_per_second * self.batch_seconds))
+        if self.max_packets_per_second and self.packets_per_blob:
+            batch = min(batch, max(1, int(self.max_packets_per_second * self.batch_seconds / self.packets_per_blob)))
+        return min(queued, batch)
+
+    def _under_packet_limit(self, elapsed: float, packets: int) -> bool:
+        if not self.max_packets_per_second:
+            return True
+        return packets < 0.9 * self.max_packets_per_second * elapsed
+
+    def record_batch(self, attempted: int, announced: int, elapsed: float, packets: int):
+        success_rate = announced / attempted
+        self.success_rate = self._smooth(self.success_rate, success_rate)
+        self.packets_per_blob = self._smooth(self.packets_per_blob, packets / attempted)
+        if elapsed > 0:
+            self.blobs_per_second = self._smooth(self.blobs_per_second, attempted / elapsed)
+        # additive increase and multiplicative decrease of the lookups run at once
+        under_packet_limit = self._under_packet_limit(elapsed, packets)
+        if success_rate < 0.5 or not under_packet_limit:
+            self.concurrency = max(1, self.concurrency // 2)
+        elif success_rate >= 0.9:
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+
+    def pause(self, elapsed: float, packets: int) -> float:
+        """
+        Seconds to wait after a batch that sent `packets` in `elapsed` seconds to stay under the packet rate limit
+        """
+        if not self.max_packets_per_second:
+            return 0.0
+        return max(0.0, packets / self.max_packets_per_second - elapsed)
+
+
 class BlobAnnouncer:
-    def __init__(self, loop: asyncio.BaseEventLoop, node: 'Node', storage: 'SQLiteStorage'):
+    def __init__(self, loop: asyncio.BaseEventLoop, node: 'Node', storage: 'SQLiteStorage',
+                 max_packets_per_second: float = 0.0):
         self.loop = loop
         self.node = node
         self.storage = storage
+        self.max_packets_per_second = max_packets_per_second
+        self.scheduler: typing.Optional[AnnounceScheduler] = None
         self.announce_task: asyncio.Task = None
         self.announce_queue: typing.List[str] = []
 
-    async def _submit_announcement(self, blob_hash):
+    async def _submit_announcements(self, blob_hashes: typing.List[str], search_concurrency: int) -> typing.List[str]:
         try:
-            peers = len(await self.node.announce_blob(blob_hash))
-            if peers > 4:
-                return blob_hash
-            else:
-                log.warning("failed to announce %s, could only find %d peers, retrying soon.", blob_hash[:8], peers)
+            stored_to = await self.node.announce_blobs(blob_hashes, search_concurrency)
         except Exception as err:
             if isinstance(err, asyncio.CancelledError):
                 raise err
-            log.warning("error announcing %s: %s", blob_hash[:8], str(err))
-
+            log.warning("error announcing %i blobs: %s", len(blob_hashes), str(err))
+            return []
+        announced = []
+        for blob_hash, node_ids in stored_to.items():
+            if len(node_ids) > 4:
+                announced.append(blob_hash)
+            else:
+                log.warning("failed to announce %s, could only find %d peers, retrying soon.", blob_hash[:8],
+                            len(node_ids))
+        return announced
 
     async def _announce(self, batch_size: typing.Optional[int] = 10):
         while batch_size:
             if not self.node.joined.is_set():
                 await self.node.joined.wait()
-            await asyncio.sleep(60, loop=self.loop)
+            await asyncio.sleep(self.scheduler.round_delay(), loop=self.loop)
             if not self.node.protocol.routing_table.get_peers():
                 log.warning("No peers in DHT, announce round skipped")
                 continue
-            self.announce_queue.extend(await self.storage.get_blobs_to_announce())
+            to_announce = await self.storage.get_blobs_to_announce(limit=self.scheduler.fetch_limit)
+            self.scheduler.fetched(len(to_announce))
+            self.announce_queue.extend(to_announce)
             log.debug("announcer task wake up, %d blobs to announce", len(self.announce_queue))
             while len(self.announce_queue):
                 log.info("%i blobs to announce", len(self.announce_queue))
-                announced = await asyncio.gather(*[
-                    self._submit_announcement(
-                        self.announce_queue.pop()) for _ in range(batch_size) if self.announce_queue
-                ], loop=self.loop)
-                announced = list(filter(None, announced))
+                batch = [self.announce_queue.pop() for _ in range(self.scheduler.next_batch_size(
+                    len(self.announce_queue)))]
+                started, sent_requests = self.loop.time(), self.node.protocol.sent_requests
+                announced = await self._submit_announcements(batch, self.scheduler.concurrency)
+                elapsed = self.loop.time() - started
+                sent_requests = self.node.protocol.sent_requests - sent_requests
+                self.scheduler.record_batch(len(batch), len(announced), elapsed, sent_requests)
                 if announced:
                     await self.storage.update_last_announced_blobs(announced)
                     log.info("announced %i blobs", len(announced))
+                pause = self.scheduler.pause(elapsed, sent_requests)
+                if pause:
+                    await asyncio.sleep(pause, loop=self.loop)
 
     def start(self, batch_size: typing.Optional[int] = 10):
         assert not self.announce_task or self.announce_task.done(), "already running"
+        self.scheduler = AnnounceScheduler(batch_size, self.max_packets_per_second)
         self.announce_task = self.loop.create_task(self._announce(batch_size))
 
     def stop(self):
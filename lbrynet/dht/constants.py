@@ -11,7 +11,6 @@ replacement_cache_size = 8
 rpc_timeout = 5.0
 rpc_attempts = 5
 rpc_attempts_pruning_window = 600
-iterative_lookup_delay = rpc_timeout / 2.0  # TODO: use config val / 2 if rpc timeout is provided
 refresh_interval = 3600  # 1 hour
 replicate_interval = refresh_interval
 data_expiration = 86400  # 24 hours
@@ -23,6 +22,9 @@ rpc_id_length = 20
 protocol_version = 1
 bottom_out_limit = 3
 msg_size_limit = max_datagram_size - 26
+peer_search_cache_ttl = 60.0
+peer_search_cache_negative_ttl = 10.0
+peer_search_cache_size = 1000
 
 
 def digest(data: bytes) -> bytes:
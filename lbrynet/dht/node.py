@@ -4,10 +4,11 @@ import typing
 import binascii
 from lbrynet.utils import resolve_host
 from lbrynet.dht import constants
-from lbrynet.dht.protocol.distance import Distance
+from lbrynet.dht.protocol.distance import closest_peers
 from lbrynet.dht.protocol.iterative_find import IterativeNodeFinder, IterativeValueFinder
 from lbrynet.dht.protocol.protocol import KademliaProtocol
 from lbrynet.dht.peer import KademliaPeer
+from lbrynet.dht.peer_search_cache import PeerSearchCache
 
 if typing.TYPE_CHECKING:
     from lbrynet.dht.peer import PeerManager
@@ -23,6 +24,7 @@ class Node:
         self.internal_udp_port = internal_udp_port
         self.protocol = KademliaProtocol(loop, peer_manager, node_id, external_ip, udp_port, peer_port, rpc_timeout,
                                          split_buckets_under_index)
+        self.peer_search_cache = PeerSearchCache(loop)
         self.listening_port: asyncio.DatagramTransport = None
         self.joined = asyncio.Event(loop=self.loop)
         self._join_task: asyncio.Task = None
@@ -73,25 +75,107 @@ class Node:
             self.loop.call_later(constants.refresh_interval, fut.set_result, None)
             await fut
 
-    async def announce_blob(self, blob_hash: str) -> typing.List[bytes]:
-        hash_value = binascii.unhexlify(blob_hash.encode())
-        assert len(hash_value) == constants.hash_length
-        peers = await self.peer_search(hash_value)
+    async def _store_to_peers(self, hash_value: bytes, peers: typing.List['KademliaPeer'],
+                              semaphore: typing.Optional[asyncio.Semaphore] = None) -> typing.List[bytes]:
+        async def store(peer: 'KademliaPeer') -> typing.Tuple[bytes, bool]:
+            if not semaphore:
+                return await self.protocol.store_to_peer(hash_value, peer)
+            async with semaphore:
+                return await self.protocol.store_to_peer(hash_value, peer)
 
-        if not self.protocol.external_ip:
-            raise Exception("Cannot determine external IP")
         log.debug("Store to %i peers", len(peers))
         for peer in peers:
             log.debug("store to %s %s %s", peer.address, peer.udp_port, peer.tcp_port)
-        stored_to_tup = await asyncio.gather(
-            *(self.protocol.store_to_peer(hash_value, peer) for peer in peers), loop=self.loop
-        )
+        stored_to_tup = await asyncio.gather(*(store(peer) for peer in peers), loop=self.loop)
         stored_to = [node_id for node_id, contacted in stored_to_tup if contacted]
         if stored_to:
             log.info("Stored %s to %i of %i attempted peers", binascii.hexlify(hash_value).decode()[:8],
                      len(stored_to), len(peers))
         else:
-            log.warning("Failed announcing %s, stored to 0 peers", blob_hash[:8])
+            log.warning("Failed announcing %s, stored to 0 peers", binascii.hexlify(hash_value).decode()[:8])
+        return stored_to
+
+    async def announce_blob(self, blob_hash: str) -> typing.List[bytes]:
+        hash_value = binascii.unhexlify(blob_hash.encode())
+        assert len(hash_value) == constants.hash_length
+        peers = await self.peer_search(hash_value)
+
+        if not self.protocol.external_ip:
+            raise Exception("Cannot determine external IP")
+        return await self._store_to_peers(hash_value, peers)
+
+    @staticmethod
+    def _lookup_covers_key(searched: bytes, found: typing.List['KademliaPeer'], key: bytes) -> bool:
+        """
+        Whether the k closest of the peers found searching for one key can be used as the k closest peers to
+        another key, without a lookup for it
+
+        XOR distances to the two keys differ only in the bits below the highest bit the keys differ in. If the k-th
+        and 2k-th closest peers found differ in a higher bit, then every peer within the k-th closest stays closer
+        to the other key than every peer beyond the 2k-th, so the same k peers are the closest to either key. This
+        relies on the lookup having found the 2k closest peers, which it usually but not always does, so it is a
+        heuristic that over-fetching 2k peers per lookup makes safe in most cases.
+        """
+        if len(found) < constants.k * 2:
+            return False
+        searched_int = int.from_bytes(searched, 'big')
+        distances = sorted(peer.node_id_int ^ searched_int for peer in found)
+        boundary = distances[constants.k - 1] ^ distances[constants.k * 2 - 1]
+        return (searched_int ^ int.from_bytes(key, 'big')).bit_length() < boundary.bit_length()
+
+    async def _announce_key_range(self, hash_values: typing.List[bytes], semaphore: asyncio.Semaphore,
+                                  stored_to: typing.Dict[str, typing.List[bytes]]):
+        searched, found = None, []
+        stores: typing.Dict[bytes, asyncio.Task] = {}
+        try:
+            for hash_value in hash_values:
+                if not self._lookup_covers_key(searched, found, hash_value):
+                    # start from the closest peers found for the previous (nearby) key as well as from the routing
+                    # table, it usually takes fewer rounds of find_node requests to converge
+                    shortlist = closest_peers(
+                        hash_value, set(found).union(self.protocol.routing_table.find_close_peers(hash_value)),
+                        constants.k
+                    )
+                    searched = hash_value
+                    found = await self.peer_search(hash_value, count=constants.k * 2, shortlist=shortlist or None)
+                stores[hash_value] = self.loop.create_task(
+                    self._store_to_peers(hash_value, closest_peers(hash_value, found, constants.k), semaphore)
+                )
+            for hash_value, store in stores.items():
+                stored_to[binascii.hexlify(hash_value).decode()] = await store
+        finally:
+            for store in stores.values():
+                if not store.done():
+                    store.cancel()
+
+    async def announce_blobs(self, blob_hashes: typing.Iterable[str], search_concurrency: int = 10,
+                             max_concurrent_stores: int = constants.alpha * constants.k
+                             ) -> typing.Dict[str, typing.List[bytes]]:
+        """
+        Announce many blobs, sharing the node lookups between blobs with nearby hashes
+
+        The hashes are sorted and split into `search_concurrency` contiguous ranges of the keyspace, each range is
+        announced in order so that a lookup can start from (or be skipped in favor of) the results of the one before
+        it. The store requests for the found peers run alongside the following lookups, up to
+        `max_concurrent_stores` at a time.
+
+        :return: {blob_hash: [node ids the blob was stored to]}
+        """
+        hash_values = sorted({binascii.unhexlify(blob_hash.encode()) for blob_hash in blob_hashes})
+        assert all(len(hash_value) == constants.hash_length for hash_value in hash_values)
+        if not hash_values:
+            return {}
+        if not self.protocol.external_ip:
+            raise Exception("Cannot determine external IP")
+        semaphore = asyncio.Semaphore(max_concurrent_stores, loop=self.loop)
+        stored_to: typing.Dict[str, typing.List[bytes]] = {}
+        ranges = min(max(1, search_concurrency), len(hash_values))
+        await asyncio.gather(*(
+            self._announce_key_range(
+                hash_values[i * len(hash_values) // ranges:(i + 1) * len(hash_values) // ranges], semaphore,
+                stored_to
+            ) for i in range(ranges)
+        ), loop=self.loop)
         return stored_to
 
     def stop(self) -> None:
@@ -192,9 +276,7 @@ class Node:
         async for iteration_peers in self.get_iterative_node_finder(
                 node_id, shortlist=shortlist, bottom_out_limit=bottom_out_limit, max_results=max_results):
             peers.extend(iteration_peers)
-        distance = Distance(node_id)
-        peers.sort(key=lambda peer: distance(peer.node_id))
-        return peers[:count]
+        return closest_peers(node_id, peers, count)
 
     async def _accumulate_search_junction(self, search_queue: asyncio.Queue,
                                           result_queue: asyncio.Queue):
@@ -208,8 +290,44 @@ class Node:
                 task.cancel()
 
     async def _value_producer(self, blob_hash: str, result_queue: asyncio.Queue):
-        async for results in self.get_iterative_value_finder(binascii.unhexlify(blob_hash.encode())):
+        key = binascii.unhexlify(blob_hash.encode())
+        cached = self.peer_search_cache.get(key)
+        if cached is not None:
+            if cached:
+                result_queue.put_nowait(cached)
+            return
+        found = []
+        async for results in self.get_iterative_value_finder(key):
+            found.extend(results)
             result_queue.put_nowait(results)
+        # only cache the result of the finished search, not the partial results of its first iterations
+        if found:
+            self.peer_search_cache.add(key, found)
+        else:
+            self.peer_search_cache.add_not_found(key)
+
+    async def search_blob_peers(self, blob_hash: str, bottom_out_limit: int = 40,
+                                max_results: int = -1) -> typing.List['KademliaPeer']:
+        """
+        Find the peers hosting a blob, or return the peers found by a recent search for it
+
+        Searches narrower than the default ones, stopping at `max_results` peers or bottoming out sooner, are not
+        cached since their result would be returned in place of a complete one
+        """
+        key = binascii.unhexlify(blob_hash.encode())
+        cached = self.peer_search_cache.get(key)
+        if cached is not None:
+            return cached if max_results < 0 else cached[:max_results]
+        peers = []
+        async for new_peers in self.get_iterative_value_finder(key, bottom_out_limit=bottom_out_limit,
+                                                               max_results=max_results):
+            peers.extend(new_peers)
+        if max_results < 0 and bottom_out_limit >= 40:
+            if peers:
+                self.peer_search_cache.add(key, peers)
+            else:
+                self.peer_search_cache.add_not_found(key)
+        return peers
 
     def accumulate_peers(self, search_queue: asyncio.Queue,
                          peer_queue: typing.Optional[asyncio.Queue] = None) -> typing.Tuple[
@@ -142,6 +142,7 @@ class KademliaPeer:
     __slots__ = [
         'loop',
         '_node_id',
+        '_node_id_int',
         'address',
         'udp_port',
         'tcp_port',
@@ -161,6 +162,7 @@ class KademliaPeer:
             raise ValueError("invalid ip address")
         self.loop = loop
         self._node_id = node_id
+        self._node_id_int = None if node_id is None else int.from_bytes(node_id, 'big')
         self.address = address
         self.udp_port = udp_port
         self.tcp_port = tcp_port
@@ -175,11 +177,19 @@ class KademliaPeer:
     def set_id(self, node_id):
         if not self._node_id:
             self._node_id = node_id
+            self._node_id_int = int.from_bytes(node_id, 'big')
 
     @property
     def node_id(self) -> bytes:
         return self._node_id
 
+    @property
+    def node_id_int(self) -> typing.Optional[int]:
+        """
+        The node id as an int, for computing XOR distances
+        """
+        return self._node_id_int
+
     def compact_address_udp(self) -> bytearray:
         return make_compact_address(self.node_id, self.address, self.udp_port)
 
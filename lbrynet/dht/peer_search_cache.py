@@ -0,0 +1,86 @@
+import asyncio
+import typing
+from collections import OrderedDict
+from lbrynet.dht import constants
+if typing.TYPE_CHECKING:
+    from lbrynet.dht.peer import KademliaPeer
+
+
+class PeerSearchCache:
+    """
+    Short lived, size bounded cache of the peers found by recent searches for blob peers, including the searches
+    that found none. A result is dropped as soon as connecting to one of its peers fails.
+    """
+
+    def __init__(self, loop: asyncio.BaseEventLoop, ttl: float = constants.peer_search_cache_ttl,
+                 negative_ttl: float = constants.peer_search_cache_negative_ttl,
+                 max_size: int = constants.peer_search_cache_size):
+        self.loop = loop
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+        # { <key>: (<expiration time>, [<peer>, ...]) }, in least to most recently used order
+        self._results: 'OrderedDict[bytes, typing.Tuple[float, typing.List[KademliaPeer]]]' = OrderedDict()
+        # { (<address>, <tcp port>): {<key>, ...} }
+        self._keys_by_address: typing.Dict[typing.Tuple[str, int], typing.Set[bytes]] = {}
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def _remove(self, key: bytes):
+        _, peers = self._results.pop(key)
+        for peer in peers:
+            keys = self._keys_by_address[(peer.address, peer.tcp_port)]
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_address[(peer.address, peer.tcp_port)]
+
+    def _set(self, key: bytes, ttl: float, peers: typing.List['KademliaPeer']):
+        self._results[key] = (self.loop.time() + ttl, peers)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_size:
+            self._remove(next(iter(self._results)))
+
+    def get(self, key: bytes) -> typing.Optional[typing.List['KademliaPeer']]:
+        """
+        Returns None if the key was not searched for recently, otherwise the (possibly empty) list of peers found
+        """
+        if key not in self._results:
+            return None
+        expiration, peers = self._results[key]
+        if expiration <= self.loop.time():
+            self._remove(key)
+            return None
+        self._results.move_to_end(key)
+        return list(peers)
+
+    def add(self, key: bytes, peers: typing.List['KademliaPeer']):
+        """
+        Add peers found for a key to the peers found for it so far, the result expires `ttl` seconds after the
+        last peers are added
+        """
+        if not peers:
+            return
+        found = self.get(key) or []
+        if key in self._results:
+            self._remove(key)
+        for peer in peers:
+            if peer not in found:
+                found.append(peer)
+        for peer in found:
+            self._keys_by_address.setdefault((peer.address, peer.tcp_port), set()).add(key)
+        self._set(key, self.ttl, found)
+
+    def add_not_found(self, key: bytes):
+        if self.get(key):
+            return
+        if key in self._results:
+            self._remove(key)
+        self._set(key, self.negative_ttl, [])
+
+    def invalidate_peer(self, peer: 'KademliaPeer'):
+        """
+        Drop the results containing a peer, so the next search for their keys goes to the network
+        """
+        for key in list(self._keys_by_address.get((peer.address, peer.tcp_port), ())):
+            self._remove(key)
@@ -2,69 +2,102 @@ import asyncio
 import typing
 
 from lbrynet.dht import constants
+from lbrynet.dht.peer import KademliaPeer
+from lbrynet.dht.serialization.datagram import decode_compact_address
 if typing.TYPE_CHECKING:
-    from lbrynet.dht.peer import KademliaPeer, PeerManager
+    from lbrynet.dht.peer import PeerManager
+
+
+def pack_announcement(timestamp: int, tcp_port: int) -> int:
+    return (timestamp << 16) | tcp_port
+
+
+def unpack_announcement(announcement: int) -> typing.Tuple[int, int]:
+    """
+    :return: (timestamp, tcp_port)
+    """
+    return announcement >> 16, announcement & 0xffff
 
 
 class DictDataStore:
     def __init__(self, loop: asyncio.BaseEventLoop, peer_manager: 'PeerManager'):
         # Dictionary format:
-        # { <key>: [(<contact>, <age>), ...] }
-        self._data_store: typing.Dict[bytes, typing.List[typing.Tuple['KademliaPeer', float]]] = {}
+        # { <key>: {<compact udp address of the contact>: <packed age and tcp port>, ...} }
+        self._data_store: typing.Dict[bytes, typing.Dict[bytes, int]] = {}
+        # { <minute of the announcement>: {<key>, ...} }, a time wheel of the keys to check for expired
+        # announcements, keeping one entry per key each minute rather than one per announcement
+        self._expirations: typing.Dict[int, typing.Set[bytes]] = {}
 
         self.loop = loop
         self._peer_manager = peer_manager
         self.completed_blobs: typing.Set[str] = set()
 
+    def _remove_peer(self, key: bytes, compact_address: bytes):
+        stored = self._data_store[key]
+        del stored[compact_address]
+        if not stored:
+            del self._data_store[key]
+
     def removed_expired_peers(self):
+        expired_before = self.loop.time() - constants.data_expiration
+        for minute in sorted(self._expirations):
+            if (minute + 1) * 60 > expired_before:
+                break
+            for key in self._expirations.pop(minute):
+                for compact_address, announcement in list(self._data_store.get(key, {}).items()):
+                    if unpack_announcement(announcement)[0] < expired_before:
+                        self._remove_peer(key, compact_address)
+
+    def _filter_expired(self, key: bytes) -> typing.Iterator[typing.Tuple[bytes, str, int, int, bytes]]:
+        """
+        Returns (node_id, address, udp_port, tcp_port, compact_address) of the non-expired announcements
+        """
         now = self.loop.time()
-        keys = list(self._data_store.keys())
-        for key in keys:
-            to_remove = []
-            for (peer, ts) in self._data_store[key]:
-                if ts + constants.data_expiration < now or self._peer_manager.peer_is_good(peer) is False:
-                    to_remove.append((peer, ts))
-            for item in to_remove:
-                self._data_store[key].remove(item)
-            if not self._data_store[key]:
-                del self._data_store[key]
+        for compact_address, announcement in list(self._data_store.get(key, {}).items()):
+            ts, tcp_port = unpack_announcement(announcement)
+            if ts + constants.data_expiration > now:
+                node_id, address, udp_port = decode_compact_address(compact_address)
+                yield node_id, address, udp_port, tcp_port, compact_address
 
     def filter_bad_and_expired_peers(self, key: bytes) -> typing.Iterator['KademliaPeer']:
         """
         Returns only non-expired and unknown/good peers
         """
-        for peer in self.filter_expired_peers(key):
-            if self._peer_manager.peer_is_good(peer) is not False:
-                yield peer
+        bad = []
+        for node_id, address, udp_port, tcp_port, compact_address in self._filter_expired(key):
+            if self._peer_manager.contact_triple_is_good(node_id, address, udp_port) is not False:
+                yield KademliaPeer(self.loop, address, node_id, udp_port, tcp_port or None)
+            else:
+                bad.append(compact_address)
+        for compact_address in bad:
+            self._remove_peer(key, compact_address)
 
     def filter_expired_peers(self, key: bytes) -> typing.Iterator['KademliaPeer']:
         """
         Returns only non-expired peers
         """
-        now = self.loop.time()
-        for (peer, ts) in self._data_store.get(key, []):
-            if ts + constants.data_expiration > now:
-                yield peer
+        for node_id, address, udp_port, tcp_port, _ in self._filter_expired(key):
+            yield KademliaPeer(self.loop, address, node_id, udp_port, tcp_port or None)
 
     def has_peers_for_blob(self, key: bytes) -> bool:
         return key in self._data_store
 
     def add_peer_to_blob(self, contact: 'KademliaPeer', key: bytes) -> None:
-        now = self.loop.time()
-        if key in self._data_store:
-            current = list(filter(lambda x: x[0] == contact, self._data_store[key]))
-            if len(current):
-                self._data_store[key][self._data_store[key].index(current[0])] = contact, now
-            else:
-                self._data_store[key].append((contact, now))
-        else:
-            self._data_store[key] = [(contact, now)]
+        now = int(self.loop.time())
+        stored = self._data_store.setdefault(key, {})
+        stored[bytes(contact.compact_address_udp())] = pack_announcement(now, contact.tcp_port or 0)
+        self._expirations.setdefault(now // 60, set()).add(key)
 
     def get_peers_for_blob(self, key: bytes) -> typing.List['KademliaPeer']:
         return list(self.filter_bad_and_expired_peers(key))
 
     def get_storing_contacts(self) -> typing.List['KademliaPeer']:
-        peers = set()
-        for key, stored in self._data_store.items():
-            peers.update(set(map(lambda tup: tup[0], stored)))
-        return list(peers)
+        compact_addresses = set()
+        for stored in self._data_store.values():
+            compact_addresses.update(stored)
+        peers = []
+        for compact_address in compact_addresses:
+            node_id, address, udp_port = decode_compact_address(compact_address)
+            if self._peer_manager.contact_triple_is_good(node_id, address, udp_port) is not False:
+                peers.append(self._peer_manager.get_kademlia_peer(node_id, address, udp_port))
+        return peers
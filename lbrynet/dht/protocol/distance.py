@@ -1,4 +1,8 @@
+import heapq
+import typing
 from lbrynet.dht import constants
+if typing.TYPE_CHECKING:
+    from lbrynet.dht.peer import KademliaPeer
 
 
 class Distance:
@@ -23,3 +27,26 @@ class Distance:
     def is_closer(self, a: bytes, b: bytes) -> bool:
         """Returns true is `a` is closer to `key` than `b` is"""
         return self(a) < self(b)
+
+
+def _key_int(key: bytes) -> int:
+    if len(key) != constants.hash_length:
+        raise ValueError(f"invalid key length: {len(key)}")
+    return int.from_bytes(key, 'big')
+
+
+def sort_by_distance(key: bytes, peers: typing.Iterable['KademliaPeer']) -> typing.List['KademliaPeer']:
+    """
+    Sort peers by the XOR distance of their node ids to `key`, closest first, using the node ids cached as ints
+    """
+    key_int = _key_int(key)
+    return sorted(peers, key=lambda peer: peer.node_id_int ^ key_int)
+
+
+def closest_peers(key: bytes, peers: typing.Iterable['KademliaPeer'], count: int) -> typing.List['KademliaPeer']:
+    """
+    The (up to) `count` peers closest to `key`, closest first. Same result as sort_by_distance(key, peers)[:count]
+    without sorting all of the peers
+    """
+    key_int = _key_int(key)
+    return heapq.nsmallest(count, peers, key=lambda peer: peer.node_id_int ^ key_int)
@@ -6,7 +6,7 @@ import typing
 import logging
 from lbrynet.dht import constants
 from lbrynet.dht.error import RemoteException, TransportNotConnected
-from lbrynet.dht.protocol.distance import Distance
+from lbrynet.dht.protocol.distance import Distance, closest_peers
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -101,7 +101,6 @@ class IterativeFinder:
         self.bottom_out_count = 0
         self.running = False
         self.tasks: typing.List[asyncio.Task] = []
-        self.delayed_calls: typing.List[asyncio.Handle] = []
         for peer in get_shortlist(routing_table, key, shortlist):
             if peer.node_id:
                 self._add_active(peer)
@@ -137,7 +136,10 @@ class IterativeFinder:
         return []
 
     def _is_closer(self, peer: 'KademliaPeer') -> bool:
-        return not self.closest_peer or self.distance.is_closer(peer.node_id, self.closest_peer.node_id)
+        if not self.closest_peer:
+            return True
+        key_int = self.distance.val_key_one
+        return peer.node_id_int ^ key_int < self.closest_peer.node_id_int ^ key_int
 
     def _add_active(self, peer):
         if peer not in self.active and peer.node_id and peer.node_id != self.protocol.node_id:
@@ -169,17 +171,19 @@ class IterativeFinder:
             return
         return await self._handle_probe_result(peer, response)
 
-    async def _search_round(self):
+    def _search_round(self):
         """
-        Send up to constants.alpha (5) probes to closest active peers
+        Send probes to the closest active peers that haven't been contacted yet, until there are constants.alpha (5)
+        probes outstanding. This runs again as each probe finishes, so a slow peer doesn't hold up the lookup. The
+        search is exhausted once the closest active peers have all been contacted.
         """
 
         added = 0
-        to_probe = list(self.active - self.contacted)
-        to_probe.sort(key=lambda peer: self.distance(self.key))
-        for peer in to_probe:
-            if added >= constants.alpha:
+        for peer in closest_peers(self.key, self.active, max(constants.k, self.max_results)):
+            if len(self.running_probes) >= constants.alpha:
                 break
+            if peer in self.contacted:
+                continue
             origin_address = (peer.address, peer.udp_port)
             if origin_address in self.exclude:
                 continue
@@ -200,21 +204,17 @@ class IterativeFinder:
         t = self.loop.create_task(self._send_probe(peer))
 
         def callback(_):
-            self.running_probes.difference_update({
-                probe for probe in self.running_probes if probe.done() or probe == t
-            })
-            if not self.running_probes:
-                self.tasks.append(self.loop.create_task(self._search_task(0.0)))
+            self.running_probes.discard(t)
+            if self.running:
+                self._search_round()
 
         t.add_done_callback(callback)
         self.running_probes.add(t)
 
-    async def _search_task(self, delay: typing.Optional[float] = constants.iterative_lookup_delay):
+    async def _search_task(self):
         try:
             if self.running:
-                await self._search_round()
-            if self.running:
-                self.delayed_calls.append(self.loop.call_later(delay, self._search))
+                self._search_round()
         except (asyncio.CancelledError, StopAsyncIteration, TransportNotConnected):
             if self.running:
                 self.loop.call_soon(self.aclose)
@@ -246,11 +246,10 @@ class IterativeFinder:
     def aclose(self):
         self.running = False
         self.iteration_queue.put_nowait(None)
-        for task in chain(self.tasks, self.running_probes, self.delayed_calls):
+        for task in chain(self.tasks, self.running_probes):
             task.cancel()
         self.tasks.clear()
         self.running_probes.clear()
-        self.delayed_calls.clear()
 
 
 class IterativeNodeFinder(IterativeFinder):
@@ -278,8 +277,7 @@ class IterativeNodeFinder(IterativeFinder):
                and peer.node_id != self.protocol.node_id
                and self.peer_manager.peer_is_good(peer) is not False
         ]
-        not_yet_yielded.sort(key=lambda peer: self.distance(peer.node_id))
-        to_yield = not_yet_yielded[:min(constants.k, len(not_yet_yielded))]
+        to_yield = closest_peers(self.key, not_yet_yielded, constants.k)
         if to_yield:
             self.yielded_peers.update(to_yield)
             self.iteration_queue.put_nowait(to_yield)
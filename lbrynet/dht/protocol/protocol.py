@@ -208,7 +208,7 @@ class PingQueue:
         async def ping_task():
             try:
                 if self._protocol.peer_manager.peer_is_good(peer):
-                    if peer not in self._protocol.routing_table.get_peers():
+                    if peer not in self._protocol.routing_table:
                         self._protocol.add_peer(peer)
                     return
                 await self._protocol.get_rpc_peer(peer).ping()
@@ -261,6 +261,7 @@ class KademliaProtocol(DatagramProtocol):
         self.sent_messages: typing.Dict[bytes, typing.Tuple['KademliaPeer', asyncio.Future, RequestDatagram]] = {}
         self.protocol_version = constants.protocol_version
         self.started_listening_time = 0
+        self.sent_requests = 0  # request datagrams sent, replies to other nodes aren't counted
         self.transport: DatagramTransport = None
         self.old_token_secret = constants.generate_id()
         self.token_secret = constants.generate_id()
@@ -311,10 +312,10 @@ class KademliaProtocol(DatagramProtocol):
         return args, {}
 
     async def _add_peer(self, peer: 'KademliaPeer'):
-        for p in self.routing_table.get_peers():
-            if (p.address, p.udp_port) == (peer.address, peer.udp_port) and p.node_id != peer.node_id:
-                self.routing_table.remove_peer(p)
-                self.routing_table.join_buckets()
+        existing = self.routing_table.get_peer_by_address(peer.address, peer.udp_port)
+        if existing is not None and existing.node_id != peer.node_id:
+            self.routing_table.remove_peer(existing)
+            self.routing_table.join_buckets()
         bucket_index = self.routing_table.kbucket_index(peer.node_id)
         if self.routing_table.buckets[bucket_index].add_peer(peer):
             return True
@@ -591,6 +592,7 @@ class KademliaProtocol(DatagramProtocol):
             response_fut = self.loop.create_future()
             response_fut.add_done_callback(pop_from_sent_messages)
             self.sent_messages[message.rpc_id] = (peer, response_fut, message)
+            self.sent_requests += 1
         try:
             self.transport.sendto(data, (peer.address, peer.udp_port))
         except OSError as err:
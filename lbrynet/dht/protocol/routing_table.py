@@ -5,23 +5,65 @@ import typing
 import itertools
 
 from lbrynet.dht import constants
-from lbrynet.dht.protocol.distance import Distance
+from lbrynet.dht.protocol.distance import Distance, sort_by_distance, closest_peers
 if typing.TYPE_CHECKING:
     from lbrynet.dht.peer import KademliaPeer, PeerManager
 
 log = logging.getLogger(__name__)
 
 
+class RoutingTableIndex:
+    """
+    Indexes of the peers in the k-buckets of a routing table by (address, udp_port) and by node id, kept up to date by
+    the buckets as peers are added and removed
+    """
+
+    def __init__(self):
+        self.by_node_id: typing.Dict[bytes, 'KademliaPeer'] = {}
+        self._by_address: typing.Dict[typing.Tuple[str, int], 'KademliaPeer'] = {}
+        # the address each node id is indexed under, the address or port of a peer object may be updated in place
+        self._addresses: typing.Dict[bytes, typing.Tuple[str, int]] = {}
+
+    def add(self, peer: 'KademliaPeer'):
+        self._remove_node_id(peer.node_id)
+        address = (peer.address, peer.udp_port)
+        self.by_node_id[peer.node_id] = peer
+        self._by_address[address] = peer
+        self._addresses[peer.node_id] = address
+
+    def remove(self, peer: 'KademliaPeer'):
+        indexed = self.by_node_id.get(peer.node_id)
+        if indexed is not None and indexed == peer:
+            self._remove_node_id(peer.node_id)
+
+    def _remove_node_id(self, node_id: bytes):
+        peer = self.by_node_id.pop(node_id, None)
+        address = self._addresses.pop(node_id, None)
+        if peer is not None and self._by_address.get(address) is peer:
+            del self._by_address[address]
+
+    def get_by_address(self, address: str, udp_port: int) -> typing.Optional['KademliaPeer']:
+        peer = self._by_address.get((address, udp_port))
+        if peer is not None and (peer.address, peer.udp_port) == (address, udp_port):
+            return peer
+
+    def __contains__(self, peer: 'KademliaPeer') -> bool:
+        indexed = self.by_node_id.get(peer.node_id)
+        return indexed is not None and indexed == peer
+
+
 class KBucket:
     """ Description - later
     """
 
-    def __init__(self, peer_manager: 'PeerManager', range_min: int, range_max: int, node_id: bytes):
+    def __init__(self, peer_manager: 'PeerManager', range_min: int, range_max: int, node_id: bytes,
+                 index: typing.Optional[RoutingTableIndex] = None):
         """
         @param range_min: The lower boundary for the range in the n-bit ID
                          space covered by this k-bucket
         @param range_max: The upper boundary for the range in the ID space
                          covered by this k-bucket
+        @param index: The index of the routing table this k-bucket belongs to
         """
         self._peer_manager = peer_manager
         self.last_accessed = 0
@@ -30,6 +72,7 @@ class KBucket:
         self.peers: typing.List['KademliaPeer'] = []
         self._node_id = node_id
         self._distance_to_self = Distance(node_id)
+        self._index = index or RoutingTableIndex()
 
     def add_peer(self, peer: 'KademliaPeer') -> bool:
         """ Add contact to _contact list in the right order. This will move the
@@ -48,16 +91,20 @@ class KBucket:
             #   (e.g. optimization-specific stuff) to pe updated as well
             self.peers.remove(peer)
             self.peers.append(peer)
+            self._index.add(peer)
             return True
         else:
             for i in range(len(self.peers)):
                 p = self.peers[i]
                 if p.node_id == peer.node_id:
                     self.peers.remove(p)
+                    self._index.remove(p)
                     self.peers.append(peer)
+                    self._index.add(peer)
                     return True
         if len(self.peers) < constants.k:
             self.peers.append(peer)
+            self._index.add(peer)
             return True
         else:
             return False
@@ -110,8 +157,7 @@ class KBucket:
         if sort_distance_to is False:
             pass
         else:
-            sort_distance_to = sort_distance_to or self._node_id
-            peers.sort(key=lambda c: Distance(sort_distance_to)(c.node_id))
+            peers = sort_by_distance(sort_distance_to or self._node_id, peers)
 
         return peers[:min(current_len, count)]
 
@@ -124,6 +170,7 @@ class KBucket:
 
     def remove_peer(self, peer: 'KademliaPeer') -> None:
         self.peers.remove(peer)
+        self._index.remove(peer)
 
     def key_in_range(self, key: bytes) -> bool:
         """ Tests whether the specified key (i.e. node ID) is in the range
@@ -169,9 +216,12 @@ class TreeRoutingTable:
         self._peer_manager = peer_manager
         self._parent_node_id = parent_node_id
         self._split_buckets_under_index = split_buckets_under_index
+        self._parent_node_id_int = int.from_bytes(parent_node_id, 'big')
+        self._index = RoutingTableIndex()
         self.buckets: typing.List[KBucket] = [
             KBucket(
-                self._peer_manager, range_min=0, range_max=2 ** constants.hash_bits, node_id=self._parent_node_id
+                self._peer_manager, range_min=0, range_max=2 ** constants.hash_bits, node_id=self._parent_node_id,
+                index=self._index
             )
         ]
 
@@ -182,11 +232,10 @@ class TreeRoutingTable:
         #  https://stackoverflow.com/questions/32129978/highly-unbalanced-kademlia-routing-table/32187456#32187456
         if bucket_index < self._split_buckets_under_index:
             return True
-        contacts = self.get_peers()
+        contacts = closest_peers(self._parent_node_id, self.get_peers(), constants.k)
+        kth_contact = contacts[-1]
         distance = Distance(self._parent_node_id)
-        contacts.sort(key=lambda c: distance(c.node_id))
-        kth_contact = contacts[-1] if len(contacts) < constants.k else contacts[constants.k - 1]
-        return distance(to_add) < distance(kth_contact.node_id)
+        return distance(to_add) < kth_contact.node_id_int ^ self._parent_node_id_int
 
     def find_close_peers(self, key: bytes, count: typing.Optional[int] = None,
                          sender_node_id: typing.Optional[bytes] = None) -> typing.List['KademliaPeer']:
@@ -194,20 +243,23 @@ class TreeRoutingTable:
         if sender_node_id:
             exclude.append(sender_node_id)
         count = count or constants.k
-        distance = Distance(key)
-        contacts = self.get_peers()
-        contacts = [c for c in contacts if c.node_id not in exclude]
-        if contacts:
-            contacts.sort(key=lambda c: distance(c.node_id))
-            return contacts[:min(count, len(contacts))]
-        return []
+        return closest_peers(key, (c for c in self.get_peers() if c.node_id not in exclude), count)
 
     def get_peer(self, contact_id: bytes) -> 'KademliaPeer':
         """
         @raise IndexError: No contact with the specified contact ID is known
                            by this node
         """
-        return self.buckets[self.kbucket_index(contact_id)].get_peer(contact_id)
+        peer = self._index.by_node_id.get(contact_id)
+        if peer is None:
+            raise IndexError(contact_id)
+        return peer
+
+    def get_peer_by_address(self, address: str, udp_port: int) -> typing.Optional['KademliaPeer']:
+        return self._index.get_by_address(address, udp_port)
+
+    def __contains__(self, peer: 'KademliaPeer') -> bool:
+        return peer in self._index
 
     def get_refresh_list(self, start_index: int = 0, force: bool = False) -> typing.List[bytes]:
         bucket_index = start_index
@@ -236,9 +288,12 @@ class TreeRoutingTable:
         self.buckets[bucket_index].last_accessed = int(self._loop.time())
 
     def kbucket_index(self, key: bytes) -> int:
+        if len(key) != constants.hash_length:
+            raise ValueError(f"invalid length of key to compare: {len(key)}")
+        distance = self._parent_node_id_int ^ int.from_bytes(key, 'big')
         i = 0
         for bucket in self.buckets:
-            if bucket.key_in_range(key):
+            if bucket.range_min <= distance < bucket.range_max:
                 return i
             else:
                 i += 1
@@ -268,17 +323,15 @@ class TreeRoutingTable:
         old_bucket = self.buckets[old_bucket_index]
         split_point = old_bucket.range_max - (old_bucket.range_max - old_bucket.range_min) // 2
         # Create a new k-bucket to cover the range split off from the old bucket
-        new_bucket = KBucket(self._peer_manager, split_point, old_bucket.range_max, self._parent_node_id)
+        new_bucket = KBucket(
+            self._peer_manager, split_point, old_bucket.range_max, self._parent_node_id, self._index
+        )
         old_bucket.range_max = split_point
         # Now, add the new bucket into the routing table tree
         self.buckets.insert(old_bucket_index + 1, new_bucket)
-        # Finally, copy all nodes that belong to the new k-bucket into it...
-        for contact in old_bucket.peers:
-            if new_bucket.key_in_range(contact.node_id):
-                new_bucket.add_peer(contact)
-        # ...and remove them from the old bucket
-        for contact in new_bucket.peers:
-            old_bucket.remove_peer(contact)
+        # Finally, move all nodes that belong to the new k-bucket into it, they stay in the routing table index
+        new_bucket.peers = [contact for contact in old_bucket.peers if new_bucket.key_in_range(contact.node_id)]
+        old_bucket.peers = [contact for contact in old_bucket.peers if not new_bucket.key_in_range(contact.node_id)]
 
     def join_buckets(self):
         if len(self.buckets) == 1:
@@ -305,11 +358,7 @@ class TreeRoutingTable:
         return self.join_buckets()
 
     def contact_in_routing_table(self, address_tuple: typing.Tuple[str, int]) -> bool:
-        for bucket in self.buckets:
-            for contact in bucket.get_peers(sort_distance_to=False):
-                if address_tuple[0] == contact.address and address_tuple[1] == contact.udp_port:
-                    return True
-        return False
+        return self._index.get_by_address(*address_tuple) is not None
 
     def buckets_with_contacts(self) -> int:
         count = 0
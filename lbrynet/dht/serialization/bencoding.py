@@ -2,58 +2,71 @@ import typing
 from lbrynet.dht.error import DecodeError
 
 
-def _bencode(data: typing.Union[int, bytes, bytearray, str, list, tuple, dict]) -> bytes:
-    if isinstance(data, int):
-        return b'i%de' % data
-    elif isinstance(data, (bytes, bytearray)):
-        return b'%d:%s' % (len(data), data)
-    elif isinstance(data, str):
-        return b'%d:%s' % (len(data), data.encode())
+_INTEGER, _LIST, _DICT, _END = b'ilde'
+_ZERO, _NINE = b'09'
+
+
+def _bencode_into(data: typing.Union[int, bytes, bytearray, str, list, tuple, dict], buffer: bytearray):
+    # ordered by how often the types appear in datagrams
+    if isinstance(data, (bytes, bytearray)):
+        buffer += b'%d:' % len(data)
+        buffer += data
+    elif isinstance(data, int):
+        buffer += b'i%de' % data
     elif isinstance(data, (list, tuple)):
-        encoded_list_items = b''
+        buffer.append(_LIST)
         for item in data:
-            encoded_list_items += _bencode(item)
-        return b'l%se' % encoded_list_items
+            _bencode_into(item, buffer)
+        buffer.append(_END)
     elif isinstance(data, dict):
-        encoded_dict_items = b''
-        keys = data.keys()
-        for key in sorted(keys):
-            encoded_dict_items += _bencode(key)
-            encoded_dict_items += _bencode(data[key])
-        return b'd%se' % encoded_dict_items
+        buffer.append(_DICT)
+        for key in sorted(data.keys()):
+            _bencode_into(key, buffer)
+            _bencode_into(data[key], buffer)
+        buffer.append(_END)
+    elif isinstance(data, str):
+        buffer += b'%d:' % len(data)
+        buffer += data.encode()
     else:
         raise TypeError(f"Cannot bencode {type(data)}")
 
 
+def _bencode(data: typing.Union[int, bytes, bytearray, str, list, tuple, dict]) -> bytes:
+    buffer = bytearray()
+    _bencode_into(data, buffer)
+    return bytes(buffer)
+
+
 def _bdecode(data: bytes, start_index: int = 0) -> typing.Tuple[typing.Union[int, bytes, list, tuple, dict], int]:
-    if data[start_index] == ord('i'):
-        end_pos = data[start_index:].find(b'e') + start_index
-        return int(data[start_index + 1:end_pos]), end_pos + 1
-    elif data[start_index] == ord('l'):
+    """
+    Decode the value starting at `start_index`, returns the value and the index following it. Only the decoded byte
+    strings are copied out of `data`, the rest of the parsing works on indexes into it.
+    """
+    token = data[start_index]
+    if _ZERO <= token <= _NINE:
+        split_pos = data.index(b':', start_index)
+        end_pos = split_pos + 1 + int(data[start_index:split_pos])
+        if end_pos > len(data):
+            raise DecodeError(f"byte string at {start_index} runs past the end of the data")
+        return data[split_pos + 1:end_pos], end_pos
+    elif token == _LIST:
         start_index += 1
         decoded_list = []
-        while data[start_index] != ord('e'):
+        while data[start_index] != _END:
             list_data, start_index = _bdecode(data, start_index)
             decoded_list.append(list_data)
         return decoded_list, start_index + 1
-    elif data[start_index] == ord('d'):
+    elif token == _DICT:
         start_index += 1
         decoded_dict = {}
-        while data[start_index] != ord('e'):
+        while data[start_index] != _END:
             key, start_index = _bdecode(data, start_index)
-            value, start_index = _bdecode(data, start_index)
-            decoded_dict[key] = value
-        return decoded_dict, start_index
-    else:
-        split_pos = data[start_index:].find(b':') + start_index
-        try:
-            length = int(data[start_index:split_pos])
-        except (ValueError, TypeError) as err:
-            raise DecodeError(err)
-        start_index = split_pos + 1
-        end_pos = start_index + length
-        b = data[start_index:end_pos]
-        return b, end_pos
+            decoded_dict[key], start_index = _bdecode(data, start_index)
+        return decoded_dict, start_index + 1
+    elif token == _INTEGER:
+        end_pos = data.index(b'e', start_index)
+        return int(data[start_index + 1:end_pos]), end_pos + 1
+    raise DecodeError(f"invalid token at {start_index}: {chr(token)}")
 
 
 def bencode(data: typing.Dict) -> bytes:
@@ -72,5 +85,5 @@ def bdecode(data: bytes, allow_non_dict_return: typing.Optional[bool] = False) -
         if not allow_non_dict_return and not isinstance(result, dict):
             raise ValueError(f'expected dict, got {type(result)}')
         return result
-    except (ValueError, TypeError) as err:
+    except (ValueError, TypeError, IndexError) as err:
         raise DecodeError(err)
@@ -298,6 +298,7 @@ class BlobComponent(Component):
         return await self.blob_manager.setup()
 
     async def stop(self):
+        await self.blob_manager.flush_blob_writes()
         self.blob_manager.stop()
 
     async def get_status(self):
@@ -385,7 +386,9 @@ class HashAnnouncerComponent(Component):
     async def start(self):
         storage = self.component_manager.get_component(DATABASE_COMPONENT)
         dht_node = self.component_manager.get_component(DHT_COMPONENT)
-        self.hash_announcer = BlobAnnouncer(asyncio.get_event_loop(), dht_node, storage)
+        self.hash_announcer = BlobAnnouncer(
+            asyncio.get_event_loop(), dht_node, storage, self.conf.announce_packets_per_second
+        )
         self.hash_announcer.start(self.conf.concurrent_blob_announcers)
         log.info("Started blob announcer")
 
@@ -415,7 +418,7 @@ class StreamManagerComponent(Component):
         if not self.stream_manager:
             return
         return {
-            'managed_files': len(self.stream_manager.streams)
+            'managed_files': len(self.stream_manager.streams) + len(self.stream_manager.pending_file_infos)
         }
 
     async def start(self):
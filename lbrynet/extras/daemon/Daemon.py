@@ -12,7 +12,7 @@ from typing import Callable, Optional, List
 from binascii import hexlify, unhexlify
 from traceback import format_exc
 from aiohttp import web
-from functools import wraps
+from functools import wraps, partial
 from google.protobuf.message import DecodeError
 from torba.client.wallet import Wallet
 from torba.client.baseaccount import SingleKey, HierarchicalDeterministic
@@ -504,6 +504,7 @@ class Daemon(metaclass=JSONRPCServerType):
         sd_hash = request.path.split("/stream/")[1]
         if not self.stream_manager.started.is_set():
             await self.stream_manager.started.wait()
+        await self.stream_manager.restore_streams(sd_hash=sd_hash)
         if sd_hash not in self.stream_manager.streams:
             return web.HTTPNotFound()
         return await self.stream_manager.stream_partial_content(request, sd_hash)
@@ -1465,7 +1466,8 @@ class Daemon(metaclass=JSONRPCServerType):
     """
 
     @requires(STREAM_MANAGER_COMPONENT)
-    def jsonrpc_file_list(self, sort=None, reverse=False, comparison=None, **kwargs):
+    async def jsonrpc_file_list(self, sort=None, reverse=False, comparison=None, page=None, page_size=None,
+                                **kwargs):
         """
         List files limited by optional filters
 
@@ -1476,6 +1478,7 @@ class Daemon(metaclass=JSONRPCServerType):
                       [--claim_name=<claim_name>] [--blobs_in_stream=<blobs_in_stream>]
                       [--blobs_remaining=<blobs_remaining>] [--sort=<sort_by>]
                       [--comparison=<comparison>] [--full_status=<full_status>] [--reverse]
+                      [--page=<page>] [--page_size=<page_size>]
 
         Options:
             --sd_hash=<sd_hash>                    : (str) get file with matching sd hash
@@ -1494,11 +1497,20 @@ class Daemon(metaclass=JSONRPCServerType):
             --blobs_remaining=<blobs_remaining>    : (int) amount of remaining blobs to download
             --sort=<sort_by>                       : (str) field to sort by (one of the above filter fields)
             --comparison=<comparison>              : (str) logical comparision, (eq | ne | g | ge | l | le)
+            --page=<page>                          : (int) page to return during paginating
+            --page_size=<page_size>                : (int) number of items on page during pagination
 
-        Returns: {List[File]}
+        Returns: {Paginated[File]}
         """
         sort = sort or 'rowid'
         comparison = comparison or 'eq'
+        if None not in (page, page_size):
+            return await maybe_paginate(
+                partial(self.stream_manager.get_filtered_streams_page, sort, reverse),
+                self.stream_manager.count_filtered_streams,
+                page, page_size, comparison=comparison, **kwargs
+            )
+        await self.stream_manager.restore_streams(comparison, **kwargs)
         return self.stream_manager.get_filtered_streams(
             sort, reverse, comparison, **kwargs
         )
@@ -1527,6 +1539,7 @@ class Daemon(metaclass=JSONRPCServerType):
         if status not in ['start', 'stop']:
             raise Exception('Status must be "start" or "stop".')
 
+        await self.stream_manager.restore_streams(**kwargs)
         streams = self.stream_manager.get_filtered_streams(**kwargs)
         if not streams:
             raise Exception(f'Unable to find a file for {kwargs}')
@@ -1576,6 +1589,7 @@ class Daemon(metaclass=JSONRPCServerType):
             (bool) true if deletion was successful
         """
 
+        await self.stream_manager.restore_streams(**kwargs)
         streams = self.stream_manager.get_filtered_streams(**kwargs)
 
         if len(streams) > 1:
@@ -1625,6 +1639,7 @@ class Daemon(metaclass=JSONRPCServerType):
         Returns: {File}
         """
 
+        await self.stream_manager.restore_streams(**kwargs)
         streams = self.stream_manager.get_filtered_streams(**kwargs)
 
         if len(streams) > 1:
@@ -2540,6 +2555,7 @@ class Daemon(metaclass=JSONRPCServerType):
             old_stream_hash = await self.storage.get_stream_hash_for_sd_hash(old_txo.claim.stream.source.sd_hash)
             if file_path is not None:
                 if old_stream_hash:
+                    await self.stream_manager.restore_streams(stream_hash=old_stream_hash)
                     stream_to_delete = self.stream_manager.get_stream_by_stream_hash(old_stream_hash)
                     await self.stream_manager.delete_stream(stream_to_delete, delete_file=False)
                 file_stream = await self.stream_manager.create_stream(file_path)
@@ -2970,6 +2986,7 @@ class Daemon(metaclass=JSONRPCServerType):
         """
         if not blob_hash or not is_valid_blobhash(blob_hash):
             return f"Invalid blob hash to delete '{blob_hash}'"
+        await self.stream_manager.restore_streams(sd_hash=blob_hash)
         streams = self.stream_manager.get_filtered_streams(sd_hash=blob_hash)
         if streams:
             await self.stream_manager.delete_stream(streams[0])
@@ -3009,10 +3026,9 @@ class Daemon(metaclass=JSONRPCServerType):
                 raise Exception("invalid bottom out limit")
         else:
             search_bottom_out_limit = 4
-        peers = []
-        async for new_peers in self.dht_node.get_iterative_value_finder(unhexlify(blob_hash.encode()), max_results=1,
-                                                                        bottom_out_limit=search_bottom_out_limit):
-            peers.extend(new_peers)
+        peers = await self.dht_node.search_blob_peers(
+            blob_hash, bottom_out_limit=search_bottom_out_limit, max_results=1
+        )
         results = [
             {
                 "node_id": hexlify(peer.node_id).decode(),
@@ -3174,6 +3190,7 @@ class Daemon(metaclass=JSONRPCServerType):
             port = int(port)
         else:
             server, port = random.choice(self.conf.reflector_servers)
+        await self.stream_manager.restore_streams(**kwargs)
         reflected = await asyncio.gather(*[
             stream.upload_to_reflector(server, port)
             for stream in self.stream_manager.get_filtered_streams(**kwargs)
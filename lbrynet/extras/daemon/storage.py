@@ -5,6 +5,9 @@ import typing
 import asyncio
 import binascii
 import time
+import pathlib
+import threading
+from concurrent.futures.thread import ThreadPoolExecutor
 from torba.client.basedatabase import SQLiteMixin
 from lbrynet.conf import Config
 from lbrynet.wallet.dewies import dewies_to_lbc, lbc_to_dewies
@@ -112,6 +115,48 @@ def _batched_select(transaction, query, parameters, batch_size=900):
             yield result
 
 
+def _batched_execute(transaction, query, parameters, prefix=(), batch_size=900) -> int:
+    updated = 0
+    for start_index in range(0, len(parameters), batch_size):
+        current_batch = parameters[start_index:start_index+batch_size]
+        bind = "({})".format(','.join(['?'] * len(current_batch)))
+        updated += transaction.execute(query.format(bind), (*prefix, *current_batch)).rowcount
+    return updated
+
+
+def encode_stream_blobs(blobs: typing.List[BlobInfo]) -> str:
+    """
+    Compact form of the blob list of a stream descriptor, "length:iv:blob_hash" for each blob in order
+    """
+    return ",".join(f"{blob.length}:{blob.iv}:{blob.blob_hash or ''}" for blob in blobs)
+
+
+def decode_stream_blobs(encoded: str) -> typing.List[BlobInfo]:
+    blobs = []
+    for blob_num, blob in enumerate(encoded.split(",")):
+        length, iv, blob_hash = blob.split(":")
+        blobs.append(BlobInfo(blob_num, int(length), iv, blob_hash or None))
+    return blobs
+
+
+def add_blobs(transaction: sqlite3.Connection, blob_hashes_and_lengths: typing.Iterable[typing.Tuple[str, int]],
+              finished: bool):
+    blob_hashes_and_lengths = list(blob_hashes_and_lengths)
+    transaction.executemany(
+        "insert or ignore into blob values (?, ?, ?, ?, ?, ?, ?)",
+        [
+            (blob_hash, length, 0, 0, "pending" if not finished else "finished", 0, 0)
+            for blob_hash, length in blob_hashes_and_lengths
+        ]
+    )
+    if finished:
+        transaction.executemany(
+            "update blob set status='finished' where blob.blob_hash=?", [
+                (blob_hash, ) for blob_hash, _ in blob_hashes_and_lengths
+            ]
+        )
+
+
 def get_all_lbry_files(transaction: sqlite3.Connection) -> typing.List[typing.Dict]:
     files = []
     signed_claims = {}
@@ -146,9 +191,17 @@ def get_all_lbry_files(transaction: sqlite3.Connection) -> typing.List[typing.Di
                 "saved_file": bool(saved_file),
                 "content_fee": None if not raw_content_fee else Transaction(
                     binascii.unhexlify(raw_content_fee)
-                )
+                ),
+                "sd_length": None,
+                "blobs": None
             }
         )
+    files_by_stream_hash = {file["stream_hash"]: file for file in files}
+    for stream_hash, sd_length, blobs in _batched_select(
+            transaction, "select stream_hash, sd_length, blobs from stream_descriptor where stream_hash in {}",
+            list(files_by_stream_hash.keys())):
+        files_by_stream_hash[stream_hash]["sd_length"] = sd_length
+        files_by_stream_hash[stream_hash]["blobs"] = decode_stream_blobs(blobs)
     for claim_name, claim_id in _batched_select(
             transaction, "select c.claim_name, c.claim_id from claim c where c.claim_id in {}",
             list(signed_claims.keys())):
@@ -157,6 +210,76 @@ def get_all_lbry_files(transaction: sqlite3.Connection) -> typing.List[typing.Di
     return files
 
 
+# columns for the fields files can be filtered and sorted by, matching the ManagedStream attributes
+file_filter_columns = {
+    'rowid': "f.rowid",
+    'status': "f.status",
+    'file_name': "coalesce(f.file_name, s.suggested_filename)",  # hex
+    'sd_hash': "s.sd_hash",
+    'stream_hash': "f.stream_hash",
+    'claim_name': "c.claim_name",
+    'claim_height': "c.height",
+    'claim_id': "c.claim_id",
+    'outpoint': "c.claim_outpoint",
+    'txid': "substr(c.claim_outpoint, 1, 64)",
+    'nout': "cast(substr(c.claim_outpoint, 66) as integer)",
+    'channel_claim_id': "c.channel_claim_id",
+    'channel_name': "(select claim_name from claim where claim_id=c.channel_claim_id)",
+    'blobs_remaining': "(select count(sb.blob_hash) from stream_blob sb inner join blob b on "
+                       "b.blob_hash=sb.blob_hash and b.status!='finished' where sb.stream_hash=f.stream_hash)",
+    'blobs_in_stream': "(select count(blob_hash) from stream_blob where stream_hash=f.stream_hash)"
+}
+
+# 'is' and 'is not' are null safe, like comparisons with None in python
+sql_comparison_operators = {
+    'eq': ' is ',
+    'ne': ' is not ',
+    'g': '>',
+    'l': '<',
+    'ge': '>=',
+    'le': '<=',
+}
+
+
+def _filtered_files_query(select: str, sort_by: typing.Optional[str], reverse: bool, comparison: str,
+                          search_by: typing.Dict) -> typing.Tuple[str, typing.List]:
+    query = (
+        f"select {select} from file f "
+        "inner join stream s on s.stream_hash=f.stream_hash "
+        # the same joins as get_all_lbry_files, files without a claim aren't loaded and shouldn't be counted
+        "inner join content_claim cc on cc.stream_hash=f.stream_hash "
+        "inner join claim c on c.claim_outpoint=cc.claim_outpoint"
+    )
+    args = []
+    if search_by:
+        # like StreamManager.get_filtered_streams, a file matches if any of the given fields match
+        conditions = []
+        for field, value in search_by.items():
+            if field == 'file_name' and value is not None:
+                value = binascii.hexlify(value.encode()).decode()
+            conditions.append(f"{file_filter_columns[field]}{sql_comparison_operators[comparison]}?")
+            args.append(value)
+        query += " where " + " or ".join(conditions)
+    if sort_by:
+        query += f" order by {file_filter_columns[sort_by]} {'desc' if reverse else 'asc'}, " \
+                 f"f.rowid {'desc' if reverse else 'asc'}"
+    return query, args
+
+
+def get_filtered_file_sd_hashes(transaction: sqlite3.Connection, sort_by: typing.Optional[str], reverse: bool,
+                                comparison: str, offset: int, limit: typing.Optional[int],
+                                search_by: typing.Dict) -> typing.List[str]:
+    query, args = _filtered_files_query("s.sd_hash", sort_by, reverse, comparison, search_by)
+    query += " limit ? offset ?"
+    args.extend((-1 if limit is None else limit, offset))
+    return [sd_hash for (sd_hash, ) in transaction.execute(query, args).fetchall()]
+
+
+def count_filtered_files(transaction: sqlite3.Connection, comparison: str, search_by: typing.Dict) -> int:
+    query, args = _filtered_files_query("count(*)", None, False, comparison, search_by)
+    return transaction.execute(query, args).fetchone()[0]
+
+
 def store_stream(transaction: sqlite3.Connection, sd_blob: 'BlobFile', descriptor: 'StreamDescriptor'):
     # add all blobs, except the last one, which is empty
     transaction.executemany(
@@ -175,6 +298,8 @@ def store_stream(transaction: sqlite3.Connection, sd_blob: 'BlobFile', descripto
         [(descriptor.stream_hash, blob.blob_hash, blob.blob_num, blob.iv)
          for blob in descriptor.blobs]
     )
+    # cache the parsed descriptor so it doesn't need to be read from the sd blob again
+    store_stream_descriptor(transaction, descriptor, sd_blob.length or descriptor.length)
     # ensure should_announce is set regardless if insert was ignored
     transaction.execute(
         "update blob set should_announce=1 where blob_hash in (?, ?)",
@@ -182,13 +307,23 @@ def store_stream(transaction: sqlite3.Connection, sd_blob: 'BlobFile', descripto
     )
 
 
+def store_stream_descriptor(transaction: sqlite3.Connection, descriptor: 'StreamDescriptor', sd_length: int):
+    transaction.execute(
+        "insert or replace into stream_descriptor values (?, ?, ?)",
+        (descriptor.stream_hash, sd_length, encode_stream_blobs(descriptor.blobs))
+    )
+
+
 def delete_stream(transaction: sqlite3.Connection, descriptor: 'StreamDescriptor'):
     blob_hashes = [(blob.blob_hash, ) for blob in descriptor.blobs[:-1]]
     blob_hashes.append((descriptor.sd_hash, ))
     transaction.execute("delete from content_claim where stream_hash=? ", (descriptor.stream_hash,))
+    transaction.execute("delete from file_progress where stream_hash=? ", (descriptor.stream_hash,))
     transaction.execute("delete from file where stream_hash=? ", (descriptor.stream_hash,))
     transaction.execute("delete from stream_blob where stream_hash=?", (descriptor.stream_hash,))
+    transaction.execute("delete from stream_descriptor where stream_hash=?", (descriptor.stream_hash,))
     transaction.execute("delete from stream where stream_hash=? ", (descriptor.stream_hash,))
+    transaction.execute("delete from reflector_queue where sd_hash=? ", (descriptor.sd_hash,))
     transaction.executemany("delete from blob where blob_hash=?", blob_hashes)
 
 
@@ -210,6 +345,46 @@ def store_file(transaction: sqlite3.Connection, stream_hash: str, file_name: typ
     return transaction.execute("select rowid from file where stream_hash=?", (stream_hash, )).fetchone()[0]
 
 
+class ReadConnectionPool:
+    """
+    Read only connections to a WAL mode database, one per executor thread. Readers see the last committed state of
+    the database and don't queue behind the (single) writer connection or each other.
+    """
+
+    def __init__(self, path: str, size: int):
+        self.uri = f"{pathlib.Path(os.path.abspath(path)).as_uri()}?mode=ro"
+        self.executor = ThreadPoolExecutor(max_workers=size)
+        self.connections: typing.List[sqlite3.Connection] = []
+        self._local = threading.local()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if not connection:
+            connection = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+            self._local.connection = connection
+            self.connections.append(connection)
+        return connection
+
+    def _run(self, fun: typing.Callable, *args):
+        connection = self._get_connection()
+        connection.execute('begin')  # the queries in `fun` all read from the same snapshot
+        try:
+            return fun(connection, *args)
+        finally:
+            connection.rollback()
+
+    def run(self, fun: typing.Callable, *args) -> typing.Awaitable:
+        return asyncio.wrap_future(self.executor.submit(self._run, fun, *args))
+
+    def execute_fetchall(self, sql: str, parameters: typing.Iterable = ()) -> typing.Awaitable[typing.List]:
+        return self.run(lambda connection: connection.execute(sql, parameters).fetchall())
+
+    async def close(self):
+        await asyncio.get_event_loop().run_in_executor(None, self.executor.shutdown)
+        while self.connections:
+            self.connections.pop().close()
+
+
 class SQLiteStorage(SQLiteMixin):
     CREATE_TABLES_QUERY = """
             pragma foreign_keys=on;
@@ -282,6 +457,34 @@ class SQLiteStorage(SQLiteMixin):
                 timestamp integer,
                 primary key (sd_hash, reflector_address)
             );
+
+            create table if not exists file_progress (
+                stream_hash text primary key not null references file,
+                blobs_written integer not null,
+                bytes_written integer not null
+            );
+
+            create table if not exists stream_descriptor (
+                stream_hash text primary key not null references stream,
+                sd_length integer not null,
+                blobs text not null
+            );
+
+            create table if not exists reflector_queue (
+                sd_hash text primary key not null,
+                priority integer not null,
+                size integer not null,
+                attempts integer not null,
+                next_attempt integer not null
+            );
+
+            create index if not exists blob_announce_idx on blob (
+                should_announce, next_announce_time, status, blob_hash
+            );
+
+            create index if not exists blob_single_announce_idx on blob (
+                next_announce_time, status, blob_hash
+            ) where single_announce=1;
     """
 
     def __init__(self, conf: Config, path, loop=None, time_getter: typing.Optional[typing.Callable[[], float]] = None):
@@ -290,6 +493,31 @@ class SQLiteStorage(SQLiteMixin):
         self.content_claim_callbacks = {}
         self.loop = loop or asyncio.get_event_loop()
         self.time_getter = time_getter or time.time
+        self.read_pool: typing.Optional[ReadConnectionPool] = None
+
+    async def open(self):
+        await super().open()
+        if self._db_path != ':memory:' and self.conf.database_read_connections > 0:
+            self.read_pool = ReadConnectionPool(self._db_path, self.conf.database_read_connections)
+
+    async def close(self):
+        if self.read_pool:
+            await self.read_pool.close()
+            self.read_pool = None
+        await super().close()
+
+    def read(self, fun: typing.Callable, *args) -> typing.Awaitable:
+        """
+        Run a read only function on a pooled reader connection, falling back to the writer for in-memory databases
+        """
+        if self.read_pool:
+            return self.read_pool.run(fun, *args)
+        return self.db.run(fun, *args)
+
+    def read_fetchall(self, sql: str, parameters: typing.Iterable = ()) -> typing.Awaitable[typing.List]:
+        if self.read_pool:
+            return self.read_pool.execute_fetchall(sql, parameters)
+        return self.db.execute_fetchall(sql, parameters)
 
     async def run_and_return_one_or_none(self, query, *args):
         for row in await self.db.execute_fetchall(query, args):
@@ -304,21 +532,17 @@ class SQLiteStorage(SQLiteMixin):
     # # # # # # # # # blob functions # # # # # # # # #
 
     async def add_blobs(self, *blob_hashes_and_lengths: typing.Tuple[str, int], finished=False):
-        def _add_blobs(transaction: sqlite3.Connection):
-            transaction.executemany(
-                "insert or ignore into blob values (?, ?, ?, ?, ?, ?, ?)",
-                [
-                    (blob_hash, length, 0, 0, "pending" if not finished else "finished", 0, 0)
-                    for blob_hash, length in blob_hashes_and_lengths
-                ]
-            )
-            if finished:
-                transaction.executemany(
-                    "update blob set status='finished' where blob.blob_hash=?", [
-                        (blob_hash, ) for blob_hash, _ in blob_hashes_and_lengths
-                    ]
-                )
-        return await self.db.run(_add_blobs)
+        return await self.db.run(add_blobs, blob_hashes_and_lengths, finished)
+
+    def add_completed_blobs(self, finished: typing.Dict[str, int],
+                            unfinished: typing.Dict[str, int]) -> typing.Awaitable:
+        """
+        Add a batch of blobs in one transaction, marking the ones in `finished` as finished
+        """
+        def _add_completed_blobs(transaction: sqlite3.Connection):
+            add_blobs(transaction, unfinished.items(), False)
+            add_blobs(transaction, finished.items(), True)
+        return self.db.run(_add_completed_blobs)
 
     def get_blob_status(self, blob_hash: str):
         return self.run_and_return_one_or_none(
@@ -330,69 +554,72 @@ class SQLiteStorage(SQLiteMixin):
             "select should_announce from blob where blob_hash=?", blob_hash
         )
 
-    def count_should_announce_blobs(self):
-        return self.run_and_return_one_or_none(
+    async def count_should_announce_blobs(self):
+        (count, ), = await self.read_fetchall(
             "select count(*) from blob where should_announce=1 and status='finished'"
         )
+        return count
 
-    def get_all_should_announce_blobs(self):
-        return self.run_and_return_list(
+    async def get_all_should_announce_blobs(self):
+        return [blob_hash for (blob_hash, ) in await self.read_fetchall(
             "select blob_hash from blob where should_announce=1 and status='finished'"
-        )
+        )]
 
-    def get_all_finished_blobs(self):
-        return self.run_and_return_list(
+    async def get_all_finished_blobs(self):
+        return [blob_hash for (blob_hash, ) in await self.read_fetchall(
             "select blob_hash from blob where status='finished'"
-        )
+        )]
 
     def count_finished_blobs(self):
         return self.run_and_return_one_or_none(
             "select count(*) from blob where status='finished'"
         )
 
-    def update_last_announced_blobs(self, blob_hashes: typing.List[str]):
+    def update_last_announced_blobs(self, blob_hashes: typing.List[str]) -> typing.Awaitable[int]:
         def _update_last_announced_blobs(transaction: sqlite3.Connection):
-            last_announced = self.time_getter()
-            return transaction.executemany(
-                "update blob set next_announce_time=?, last_announced_time=?, single_announce=0 "
-                "where blob_hash=?",
-                [(int(last_announced + (data_expiration / 2)), int(last_announced), blob_hash)
-                 for blob_hash in blob_hashes]
+            last_announced = int(self.time_getter())
+            return _batched_execute(
+                transaction, "update blob set next_announce_time=?, last_announced_time=?, single_announce=0 "
+                             "where blob_hash in {}",
+                list(blob_hashes), (int(last_announced + (data_expiration / 2)), last_announced)
             )
         return self.db.run(_update_last_announced_blobs)
 
-    def should_single_announce_blobs(self, blob_hashes, immediate=False):
+    def should_single_announce_blobs(self, blob_hashes, immediate=False) -> typing.Awaitable[int]:
         def set_single_announce(transaction):
-            now = int(self.time_getter())
-            for blob_hash in blob_hashes:
-                if immediate:
-                    transaction.execute(
-                        "update blob set single_announce=1, next_announce_time=? "
-                        "where blob_hash=? and status='finished'", (int(now), blob_hash)
-                    )
-                else:
-                    transaction.execute(
-                        "update blob set single_announce=1 where blob_hash=? and status='finished'", (blob_hash,)
-                    )
+            if immediate:
+                return _batched_execute(
+                    transaction, "update blob set single_announce=1, next_announce_time=? "
+                                 "where status='finished' and blob_hash in {}",
+                    list(blob_hashes), (int(self.time_getter()), )
+                )
+            return _batched_execute(
+                transaction, "update blob set single_announce=1 where status='finished' and blob_hash in {}",
+                list(blob_hashes)
+            )
         return self.db.run(set_single_announce)
 
-    def get_blobs_to_announce(self):
+    def get_blobs_to_announce(self, limit: int = 1000) -> typing.Awaitable[typing.List[str]]:
         def get_and_update(transaction):
             timestamp = int(self.time_getter())
             if self.conf.announce_head_and_sd_only:
+                # the two halves of the union are each answered from an index rather than a scan of the blob table
                 r = transaction.execute(
-                    "select blob_hash from blob "
-                    "where blob_hash is not null and "
-                    "(should_announce=1 or single_announce=1) and next_announce_time<? and status='finished' "
-                    "order by next_announce_time asc limit ?",
-                    (timestamp, int(self.conf.concurrent_blob_announcers * 10))
+                    "select blob_hash from ("
+                    "   select blob_hash, next_announce_time from blob "
+                    "   where should_announce=1 and next_announce_time<? and status='finished' "
+                    "   union "
+                    "   select blob_hash, next_announce_time from blob "
+                    "   where single_announce=1 and next_announce_time<? and status='finished'"
+                    ") where blob_hash is not null order by next_announce_time asc limit ?",
+                    (timestamp, timestamp, limit)
                 )
             else:
                 r = transaction.execute(
                     "select blob_hash from blob where blob_hash is not null "
                     "and next_announce_time<? and status='finished' "
                     "order by next_announce_time asc limit ?",
-                    (timestamp, int(self.conf.concurrent_blob_announcers * 10))
+                    (timestamp, limit)
                 )
             return [b[0] for b in r.fetchall()]
         return self.db.run(get_and_update)
@@ -467,6 +694,9 @@ class SQLiteStorage(SQLiteMixin):
     def store_stream(self, sd_blob: 'BlobFile', descriptor: 'StreamDescriptor'):
         return self.db.run(store_stream, sd_blob, descriptor)
 
+    def store_stream_descriptor(self, descriptor: 'StreamDescriptor', sd_length: int):
+        return self.db.run(store_stream_descriptor, descriptor, sd_length)
+
     def get_blobs_for_stream(self, stream_hash, only_completed=False) -> typing.Awaitable[typing.List[BlobInfo]]:
         def _get_blobs_for_stream(transaction):
             crypt_blob_infos = []
@@ -497,7 +727,7 @@ class SQLiteStorage(SQLiteMixin):
                 if not blob_hash:
                     break
             return crypt_blob_infos
-        return self.db.run(_get_blobs_for_stream)
+        return self.read(_get_blobs_for_stream)
 
     def get_sd_blob_hash_for_stream(self, stream_hash):
         return self.run_and_return_one_or_none(
@@ -558,7 +788,23 @@ class SQLiteStorage(SQLiteMixin):
         return await self.db.run(update_manually_removed_files)
 
     def get_all_lbry_files(self) -> typing.Awaitable[typing.List[typing.Dict]]:
-        return self.db.run(get_all_lbry_files)
+        return self.read(get_all_lbry_files)
+
+    def get_filtered_file_sd_hashes(self, sort_by: typing.Optional[str] = None, reverse: bool = False,
+                                    comparison: typing.Optional[str] = None, offset: int = 0,
+                                    limit: typing.Optional[int] = None,
+                                    **search_by) -> typing.Awaitable[typing.List[str]]:
+        """
+        Get the sd hashes of a page of files, filtered and sorted the same way StreamManager.get_filtered_streams
+        filters and sorts the streams for them
+        """
+        return self.read(
+            get_filtered_file_sd_hashes, sort_by, reverse, comparison or 'eq', offset, limit, search_by
+        )
+
+    def count_filtered_files(self, comparison: typing.Optional[str] = None,
+                             **search_by) -> typing.Awaitable[int]:
+        return self.read(count_filtered_files, comparison or 'eq', search_by)
 
     def change_file_status(self, stream_hash: str, new_status: str):
         log.debug("update file status %s -> %s", stream_hash, new_status)
@@ -590,6 +836,24 @@ class SQLiteStorage(SQLiteMixin):
             stream_hash,
         ))
 
+    def save_file_progress(self, stream_hash: str, blobs_written: int, bytes_written: int):
+        """
+        Record that the first `blobs_written` blobs of a stream, `bytes_written` bytes, are in its output file
+        """
+        return self.db.execute(
+            "insert or replace into file_progress values (?, ?, ?)", (stream_hash, blobs_written, bytes_written)
+        )
+
+    async def get_file_progress(self, stream_hash: str) -> typing.Optional[typing.Tuple[int, int]]:
+        progress = await self.db.execute_fetchall(
+            "select blobs_written, bytes_written from file_progress where stream_hash=?", (stream_hash, )
+        )
+        if progress:
+            return tuple(progress[0])
+
+    def clear_file_progress(self, stream_hash: str):
+        return self.db.execute("delete from file_progress where stream_hash=?", (stream_hash, ))
+
     async def recover_streams(self, descriptors_and_sds: typing.List[typing.Tuple['StreamDescriptor', 'BlobFile',
                                                                                   typing.Optional[Transaction]]],
                               download_directory: str):
@@ -850,10 +1114,27 @@ class SQLiteStorage(SQLiteMixin):
             (sd_hash, reflector_address)
         )
 
-    def get_streams_to_re_reflect(self):
-        return self.run_and_return_list(
-            "select s.sd_hash from stream s "
+    def get_streams_to_re_reflect(self) -> typing.Awaitable[typing.List[typing.Tuple[str, int]]]:
+        return self.read_fetchall(
+            "select s.sd_hash, (select coalesce(sum(b.blob_length), 0) from stream_blob sb "
+            "                   join blob b on b.blob_hash=sb.blob_hash where sb.stream_hash=s.stream_hash) "
+            "from stream s "
             "left outer join reflected_stream r on s.sd_hash=r.sd_hash "
             "where r.timestamp is null or r.timestamp < ?",
-            int(self.time_getter()) - 86400
+            (int(self.time_getter()) - 86400, )
+        )
+
+    def save_reflector_queue_entry(self, sd_hash: str, priority: int, size: int, attempts: int,
+                                   next_attempt: int):
+        return self.db.execute(
+            "insert or replace into reflector_queue values (?, ?, ?, ?, ?)",
+            (sd_hash, priority, size, attempts, next_attempt)
+        )
+
+    def delete_reflector_queue_entry(self, sd_hash: str):
+        return self.db.execute("delete from reflector_queue where sd_hash=?", (sd_hash, ))
+
+    def get_reflector_queue(self) -> typing.Awaitable[typing.List[typing.Tuple[str, int, int, int, int]]]:
+        return self.read_fetchall(
+            "select sd_hash, priority, size, attempts, next_attempt from reflector_queue"
         )
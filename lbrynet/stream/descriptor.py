@@ -55,12 +55,13 @@ class StreamDescriptor:
         'suggested_file_name',
         'blobs',
         'stream_hash',
-        'sd_hash'
+        'sd_hash',
+        '_length'
     ]
 
     def __init__(self, loop: asyncio.BaseEventLoop, blob_dir: str, stream_name: str, key: str,
                  suggested_file_name: str, blobs: typing.List[BlobInfo], stream_hash: typing.Optional[str] = None,
-                 sd_hash: typing.Optional[str] = None):
+                 sd_hash: typing.Optional[str] = None, length: typing.Optional[int] = None):
         self.loop = loop
         self.blob_dir = blob_dir
         self.stream_name = stream_name
@@ -69,10 +70,13 @@ class StreamDescriptor:
         self.blobs = blobs
         self.stream_hash = stream_hash or self.get_stream_hash()
         self.sd_hash = sd_hash
+        self._length = length
 
     @property
-    def length(self):
-        return len(self.as_json())
+    def length(self) -> int:
+        if self._length is None:
+            self._length = len(self.as_json())
+        return self._length
 
     def get_stream_hash(self) -> str:
         return self.calculate_stream_hash(
@@ -164,7 +168,8 @@ class StreamDescriptor:
             [BlobInfo(info['blob_num'], info['length'], info['iv'], info.get('blob_hash'))
              for info in decoded['blobs']],
             decoded['stream_hash'],
-            blob.blob_hash
+            blob.blob_hash,
+            len(json_bytes)
         )
         if descriptor.get_stream_hash() != decoded['stream_hash']:
             raise InvalidStreamDescriptorError("Stream hash does not match stream metadata")
@@ -6,6 +6,7 @@ from lbrynet.error import DownloadSDTimeout
 from lbrynet.utils import resolve_host
 from lbrynet.stream.descriptor import StreamDescriptor
 from lbrynet.blob_exchange.downloader import BlobDownloader
+from lbrynet.blob_exchange.scheduler import PRIORITY_FOREGROUND
 from lbrynet.dht.peer import KademliaPeer
 if typing.TYPE_CHECKING:
     from lbrynet.conf import Config
@@ -13,23 +14,32 @@ if typing.TYPE_CHECKING:
     from lbrynet.blob.blob_manager import BlobManager
     from lbrynet.blob.blob_file import AbstractBlob
     from lbrynet.blob.blob_info import BlobInfo
+    from lbrynet.blob_exchange.scheduler import DownloadScheduler
 
 log = logging.getLogger(__name__)
 
 
 class StreamDownloader:
+    PEER_SEARCH_INTERVAL = 10.0  # minimum seconds between searches started because the known peers ran dry
+
     def __init__(self, loop: asyncio.BaseEventLoop, config: 'Config', blob_manager: 'BlobManager', sd_hash: str,
-                 descriptor: typing.Optional[StreamDescriptor] = None):
+                 descriptor: typing.Optional[StreamDescriptor] = None,
+                 download_scheduler: typing.Optional['DownloadScheduler'] = None):
         self.loop = loop
         self.config = config
         self.blob_manager = blob_manager
         self.sd_hash = sd_hash
         self.search_queue = asyncio.Queue(loop=loop)     # blob hashes to feed into the iterative finder
         self.peer_queue = asyncio.Queue(loop=loop)       # new peers to try
-        self.blob_downloader = BlobDownloader(self.loop, self.config, self.blob_manager, self.peer_queue)
+        self.blob_downloader = BlobDownloader(
+            self.loop, self.config, self.blob_manager, self.peer_queue, download_scheduler, self._search_for_peers,
+            self._peer_failed
+        )
         self.descriptor: typing.Optional[StreamDescriptor] = descriptor
         self.node: typing.Optional['Node'] = None
         self.accumulate_task: typing.Optional[asyncio.Task] = None
+        self.head_blob_task: typing.Optional[asyncio.Task] = None
+        self.last_peer_search: typing.Optional[float] = None
         self.fixed_peers_handle: typing.Optional[asyncio.Handle] = None
         self.fixed_peers_delay: typing.Optional[float] = None
         self.added_fixed_peers = False
@@ -89,45 +99,82 @@ class StreamDownloader:
         await self.add_fixed_peers()
         # start searching for peers for the sd hash
         self.search_queue.put_nowait(self.sd_hash)
+        self.last_peer_search = self.loop.time()
         log.info("searching for peers for stream %s", self.sd_hash)
 
         if not self.descriptor:
             await self.load_descriptor(connection_id)
 
-        # add the head blob to the peer search
-        self.search_queue.put_nowait(self.descriptor.blobs[0].blob_hash)
-        log.info("added head blob to peer search for stream %s", self.sd_hash)
+        # the peers found for the sd blob are offered first for the rest of the stream, only search for the head
+        # blob if there aren't any yet
+        head_blob_info = self.descriptor.blobs[0]
+        if not self.blob_downloader.peers and self.peer_queue.empty():
+            self.search_queue.put_nowait(head_blob_info.blob_hash)
+            log.info("added head blob to peer search for stream %s", self.sd_hash)
+        if self.config.speculative_head_blob_fetch and not self.blob_manager.is_blob_verified(
+                head_blob_info.blob_hash):
+            # the peers (and open connections) used for the descriptor likely have the head blob too, start
+            # downloading it from them right away instead of waiting for the first read and the head blob search
+            self.head_blob_task = self.loop.create_task(self.blob_downloader.download_blob(
+                head_blob_info.blob_hash, head_blob_info.length, connection_id
+            ))
+            self.head_blob_task.add_done_callback(lambda t: None if t.cancelled() else t.exception())
 
         if not await self.blob_manager.storage.stream_exists(self.sd_hash):
+            await self.blob_manager.flush_blob_writes()
             await self.blob_manager.storage.store_stream(
                 self.blob_manager.get_blob(self.sd_hash, length=self.descriptor.length), self.descriptor
             )
 
-    async def download_stream_blob(self, blob_info: 'BlobInfo', connection_id: int = 0) -> 'AbstractBlob':
+    async def download_stream_blob(self, blob_info: 'BlobInfo', connection_id: int = 0,
+                                   priority: int = PRIORITY_FOREGROUND) -> 'AbstractBlob':
         if not filter(lambda blob: blob.blob_hash == blob_info.blob_hash, self.descriptor.blobs[:-1]):
             raise ValueError(f"blob {blob_info.blob_hash} is not part of stream with sd hash {self.sd_hash}")
+        if blob_info.blob_num == 0 and self.head_blob_task and not self.head_blob_task.done():
+            return await asyncio.wait_for(
+                asyncio.shield(self.head_blob_task), self.config.blob_download_timeout * 10, loop=self.loop
+            )
         blob = await asyncio.wait_for(
-            self.blob_downloader.download_blob(blob_info.blob_hash, blob_info.length, connection_id),
+            self.blob_downloader.download_blob(blob_info.blob_hash, blob_info.length, connection_id, priority),
             self.config.blob_download_timeout * 10, loop=self.loop
         )
         return blob
 
+    def _search_for_peers(self):
+        # every peer found so far has failed, search again for the peers hosting the stream
+        if not self.node or not self.accumulate_task or (
+                self.last_peer_search is not None and
+                self.loop.time() - self.last_peer_search < self.PEER_SEARCH_INTERVAL):
+            return
+        self.last_peer_search = self.loop.time()
+        log.info("known peers for stream %s ran dry, searching again", self.sd_hash)
+        self.search_queue.put_nowait(self.sd_hash)
+
+    def _peer_failed(self, peer: 'KademliaPeer'):
+        # don't hand out the cached search results containing a peer that can't be connected to
+        if self.node:
+            self.node.peer_search_cache.invalidate_peer(peer)
+
     def decrypt_blob(self, blob_info: 'BlobInfo', blob: 'AbstractBlob') -> bytes:
         return blob.decrypt(
             binascii.unhexlify(self.descriptor.key.encode()), binascii.unhexlify(blob_info.iv.encode())
         )
 
-    async def read_blob(self, blob_info: 'BlobInfo', connection_id: int = 0) -> bytes:
+    async def read_blob(self, blob_info: 'BlobInfo', connection_id: int = 0,
+                        priority: int = PRIORITY_FOREGROUND) -> bytes:
         start = None
         if self.time_to_first_bytes is None:
             start = self.loop.time()
-        blob = await self.download_stream_blob(blob_info, connection_id)
+        blob = await self.download_stream_blob(blob_info, connection_id, priority)
         decrypted = self.decrypt_blob(blob_info, blob)
         if start:
             self.time_to_first_bytes = self.loop.time() - start
         return decrypted
 
     def stop(self):
+        if self.head_blob_task:
+            self.head_blob_task.cancel()
+            self.head_blob_task = None
         if self.accumulate_task:
             self.accumulate_task.cancel()
             self.accumulate_task = None
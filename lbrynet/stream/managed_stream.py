@@ -7,6 +7,7 @@ from aiohttp.web import Request, StreamResponse
 from lbrynet.utils import generate_id
 from lbrynet.error import DownloadSDTimeout
 from lbrynet.schema.mime_types import guess_media_type
+from lbrynet.blob_exchange.scheduler import PRIORITY_INTERACTIVE, PRIORITY_FOREGROUND
 from lbrynet.stream.downloader import StreamDownloader
 from lbrynet.stream.descriptor import StreamDescriptor
 from lbrynet.stream.reflector.client import StreamReflectorClient
@@ -14,8 +15,9 @@ from lbrynet.extras.daemon.storage import StoredStreamClaim
 if typing.TYPE_CHECKING:
     from lbrynet.conf import Config
     from lbrynet.schema.claim import Claim
-    from lbrynet.blob.blob_manager import BlobManager
+    from lbrynet.blob.blob_manager import BlobManager, BlobCompletionCounter
     from lbrynet.blob.blob_info import BlobInfo
+    from lbrynet.blob_exchange.scheduler import DownloadScheduler
     from lbrynet.dht.node import Node
     from lbrynet.extras.daemon.analytics import AnalyticsManager
     from lbrynet.wallet.transaction import Transaction
@@ -66,7 +68,10 @@ class ManagedStream:
         'saving',
         'finished_writing',
         'started_writing',
-        'finished_write_attempt'
+        'finished_write_attempt',
+        'stream_changed_callback',
+        '_completion_counter',
+        '_keep_partial_file'
     ]
 
     def __init__(self, loop: asyncio.BaseEventLoop, config: 'Config', blob_manager: 'BlobManager',
@@ -75,7 +80,9 @@ class ManagedStream:
                  download_id: typing.Optional[str] = None, rowid: typing.Optional[int] = None,
                  descriptor: typing.Optional[StreamDescriptor] = None,
                  content_fee: typing.Optional['Transaction'] = None,
-                 analytics_manager: typing.Optional['AnalyticsManager'] = None):
+                 analytics_manager: typing.Optional['AnalyticsManager'] = None,
+                 download_scheduler: typing.Optional['DownloadScheduler'] = None,
+                 stream_changed_callback: typing.Optional[typing.Callable[['ManagedStream'], None]] = None):
         self.loop = loop
         self.config = config
         self.blob_manager = blob_manager
@@ -88,7 +95,9 @@ class ManagedStream:
         self.rowid = rowid
         self.written_bytes = 0
         self.content_fee = content_fee
-        self.downloader = StreamDownloader(self.loop, self.config, self.blob_manager, sd_hash, descriptor)
+        self.downloader = StreamDownloader(
+            self.loop, self.config, self.blob_manager, sd_hash, descriptor, download_scheduler
+        )
         self.analytics_manager = analytics_manager
 
         self.fully_reflected = asyncio.Event(loop=self.loop)
@@ -101,6 +110,9 @@ class ManagedStream:
         self.finished_writing = asyncio.Event(loop=self.loop)
         self.started_writing = asyncio.Event(loop=self.loop)
         self.finished_write_attempt = asyncio.Event(loop=self.loop)
+        self.stream_changed_callback = stream_changed_callback
+        self._completion_counter: typing.Optional['BlobCompletionCounter'] = None
+        self._keep_partial_file = False
 
     @property
     def descriptor(self) -> StreamDescriptor:
@@ -121,6 +133,9 @@ class ManagedStream:
     async def update_status(self, status: str):
         assert status in [self.STATUS_RUNNING, self.STATUS_STOPPED, self.STATUS_FINISHED]
         self._status = status
+        callback = self.stream_changed_callback
+        if callback:
+            callback(self)
         await self.blob_manager.storage.change_file_status(self.stream_hash, status)
 
     @property
@@ -172,10 +187,17 @@ class ManagedStream:
         if self.stream_claim_info:
             return binascii.hexlify(self.stream_claim_info.claim.to_bytes())
 
+    @property
+    def completion_counter(self) -> 'BlobCompletionCounter':
+        if self._completion_counter is None:
+            self._completion_counter = self.blob_manager.get_completion_counter(
+                [b.blob_hash for b in self.descriptor.blobs[:-1]]
+            )
+        return self._completion_counter
+
     @property
     def blobs_completed(self) -> int:
-        return sum([1 if self.blob_manager.is_blob_verified(b.blob_hash) else 0
-                    for b in self.descriptor.blobs[:-1]])
+        return len(self.completion_counter)
 
     @property
     def blobs_in_stream(self) -> int:
@@ -214,8 +236,8 @@ class ManagedStream:
             written_bytes = None
         return {
             'streaming_url': f"http://{self.config.streaming_host}:{self.config.streaming_port}/stream/{self.sd_hash}",
-            'completed': (self.output_file_exists and self.status in ('stopped', 'finished')) or all(
-                self.blob_manager.is_blob_verified(b.blob_hash) for b in self.descriptor.blobs[:-1]),
+            'completed': (self.output_file_exists and self.status in ('stopped', 'finished')) or (
+                not self.completion_counter.remaining),
             'file_name': file_name,
             'download_directory': download_directory,
             'points_paid': 0.0,
@@ -254,6 +276,8 @@ class ManagedStream:
             loop, blob_manager.blob_dir, file_path, key=key, iv_generator=iv_generator,
             blob_completed_callback=blob_manager.blob_completed
         )
+        # the completions of the new blobs are batched, write them before the stream references them
+        await blob_manager.flush_blob_writes()
         await blob_manager.storage.store_stream(
             blob_manager.get_blob(descriptor.sd_hash), descriptor
         )
@@ -298,13 +322,14 @@ class ManagedStream:
         if (finished and self.status != self.STATUS_FINISHED) or self.status == self.STATUS_RUNNING:
             await self.update_status(self.STATUS_FINISHED if finished else self.STATUS_STOPPED)
 
-    async def _aiter_read_stream(self, start_blob_num: typing.Optional[int] = 0, connection_id: int = 0)\
+    async def _aiter_read_stream(self, start_blob_num: typing.Optional[int] = 0, connection_id: int = 0,
+                                 priority: int = PRIORITY_FOREGROUND)\
             -> typing.AsyncIterator[typing.Tuple['BlobInfo', bytes]]:
         if start_blob_num >= len(self.descriptor.blobs[:-1]):
             raise IndexError(start_blob_num)
         for i, blob_info in enumerate(self.descriptor.blobs[start_blob_num:-1]):
             assert i + start_blob_num == blob_info.blob_num
-            decrypted = await self.downloader.read_blob(blob_info, connection_id)
+            decrypted = await self.downloader.read_blob(blob_info, connection_id, priority)
             yield (blob_info, decrypted)
 
     async def stream_file(self, request: Request, node: typing.Optional['Node'] = None) -> StreamResponse:
@@ -321,7 +346,8 @@ class ManagedStream:
         self.streaming.set()
         try:
             wrote = 0
-            async for blob_info, decrypted in self._aiter_read_stream(skip_blobs, connection_id=2):
+            async for blob_info, decrypted in self._aiter_read_stream(skip_blobs, connection_id=2,
+                                                                     priority=PRIORITY_INTERACTIVE):
                 if (blob_info.blob_num == len(self.descriptor.blobs) - 2) or (len(decrypted) + wrote >= size):
                     decrypted += (b'\x00' * (size - len(decrypted) - wrote - (skip_blobs * 2097151)))
                     await response.write_eof(decrypted)
@@ -345,35 +371,46 @@ class ManagedStream:
         handle.write(data)
         handle.flush()
 
-    async def _save_file(self, output_path: str):
+    async def _save_file(self, output_path: str, priority: int = PRIORITY_FOREGROUND,
+                         progress: typing.Optional[typing.Tuple[int, int]] = None):
         log.info("save file for lbry://%s#%s (sd hash %s...) -> %s", self.claim_name, self.claim_id, self.sd_hash[:6],
                  output_path)
         self.saving.set()
         self.finished_write_attempt.clear()
-        self.finished_writing.clear()
-        self.started_writing.clear()
+        self._keep_partial_file = False
+        blobs_written, self.written_bytes = 0, 0
+        if progress and os.path.isfile(output_path) and os.path.getsize(output_path) >= progress[1]:
+            blobs_written, self.written_bytes = progress
+            log.info("resume saving %s after blob %i/%i (%i bytes)", self.sd_hash[:6], blobs_written,
+                     len(self.descriptor.blobs) - 1, self.written_bytes)
         try:
-            with open(output_path, 'wb') as file_write_handle:
-                async for blob_info, decrypted in self._aiter_read_stream(connection_id=1):
-                    log.info("write blob %i/%i", blob_info.blob_num + 1, len(self.descriptor.blobs) - 1)
-                    await self.loop.run_in_executor(None, self._write_decrypted_blob, file_write_handle, decrypted)
-                    self.written_bytes += len(decrypted)
-                    if not self.started_writing.is_set():
-                        self.started_writing.set()
-            await self.update_status(ManagedStream.STATUS_FINISHED)
-            if self.analytics_manager:
-                self.loop.create_task(self.analytics_manager.send_download_finished(
-                    self.download_id, self.claim_name, self.sd_hash
-                ))
-            self.finished_writing.set()
-            log.info("finished saving file for lbry://%s#%s (sd hash %s...) -> %s", self.claim_name, self.claim_id,
-                     self.sd_hash[:6], self.full_path)
-            await self.blob_manager.storage.set_saved_file(self.stream_hash)
+            with open(output_path, 'r+b' if blobs_written else 'wb') as file_write_handle:
+                if blobs_written:
+                    file_write_handle.seek(self.written_bytes)
+                    file_write_handle.truncate()
+                    self.started_writing.set()
+                if blobs_written < len(self.descriptor.blobs) - 1:
+                    async for blob_info, decrypted in self._aiter_read_stream(blobs_written, connection_id=1,
+                                                                              priority=priority):
+                        log.info("write blob %i/%i", blob_info.blob_num + 1, len(self.descriptor.blobs) - 1)
+                        await self.loop.run_in_executor(
+                            None, self._write_decrypted_blob, file_write_handle, decrypted
+                        )
+                        self.written_bytes += len(decrypted)
+                        await self.blob_manager.storage.save_file_progress(
+                            self.stream_hash, blob_info.blob_num + 1, self.written_bytes
+                        )
+                        if not self.started_writing.is_set():
+                            self.started_writing.set()
         except Exception as err:
+            if isinstance(err, asyncio.CancelledError) and self._keep_partial_file:
+                # the daemon is shutting down, keep what was written so the save can resume on the next start
+                raise err
             if os.path.isfile(output_path):
                 log.warning("removing incomplete download %s for %s", output_path, self.sd_hash)
                 os.remove(output_path)
             self.written_bytes = 0
+            await self.blob_manager.storage.clear_file_progress(self.stream_hash)
             if isinstance(err, asyncio.TimeoutError):
                 self.downloader.stop()
                 await self.blob_manager.storage.change_file_download_dir_and_file_name(
@@ -386,15 +423,32 @@ class ManagedStream:
             elif not isinstance(err, asyncio.CancelledError):
                 log.exception("unexpected error encountered writing file for stream %s", self.sd_hash)
             raise err
+        else:
+            # the file is complete, finish the bookkeeping even if the save task is cancelled meanwhile
+            await asyncio.shield(self._finish_saving_file(), loop=self.loop)
         finally:
             self.saving.clear()
             self.finished_write_attempt.set()
 
+    async def _finish_saving_file(self):
+        await self.update_status(ManagedStream.STATUS_FINISHED)
+        await self.blob_manager.storage.set_saved_file(self.stream_hash)
+        await self.blob_manager.storage.clear_file_progress(self.stream_hash)
+        if self.analytics_manager:
+            self.loop.create_task(self.analytics_manager.send_download_finished(
+                self.download_id, self.claim_name, self.sd_hash
+            ))
+        self.finished_writing.set()
+        log.info("finished saving file for lbry://%s#%s (sd hash %s...) -> %s", self.claim_name, self.claim_id,
+                 self.sd_hash[:6], self.full_path)
+
     async def save_file(self, file_name: typing.Optional[str] = None, download_directory: typing.Optional[str] = None,
-                        node: typing.Optional['Node'] = None):
+                        node: typing.Optional['Node'] = None, priority: int = PRIORITY_FOREGROUND):
         await self.start(node)
         if self.file_output_task and not self.file_output_task.done():  # cancel an already running save task
             self.file_output_task.cancel()
+            await asyncio.wait([self.file_output_task], loop=self.loop)
+        previous_download_directory = self.download_directory
         self.download_directory = download_directory or self.download_directory or self.config.download_dir
         if not self.download_directory:
             raise ValueError("no directory to download to")
@@ -403,20 +457,30 @@ class ManagedStream:
         if not os.path.isdir(self.download_directory):
             log.warning("download directory '%s' does not exist, attempting to make it", self.download_directory)
             os.mkdir(self.download_directory)
-        self._file_name = await get_next_available_file_name(
-            self.loop, self.download_directory,
-            file_name or self.descriptor.suggested_file_name
-        )
-        await self.blob_manager.storage.change_file_download_dir_and_file_name(
-            self.stream_hash, self.download_directory, self.file_name
-        )
+        file_name = file_name or self.descriptor.suggested_file_name
+        progress = await self.blob_manager.storage.get_file_progress(self.stream_hash)
+        if progress and file_name == self._file_name and self.download_directory == previous_download_directory \
+                and os.path.isfile(os.path.join(self.download_directory, file_name)):
+            # resume writing the partially saved file
+            pass
+        else:
+            progress = None
+            await self.blob_manager.storage.clear_file_progress(self.stream_hash)
+            self._file_name = await get_next_available_file_name(self.loop, self.download_directory, file_name)
+            await self.blob_manager.storage.change_file_download_dir_and_file_name(
+                self.stream_hash, self.download_directory, self.file_name
+            )
         await self.update_status(ManagedStream.STATUS_RUNNING)
         self.written_bytes = 0
-        self.file_output_task = self.loop.create_task(self._save_file(self.full_path))
+        # clear these before the task starts so the waits below don't return for a previous save
+        self.finished_writing.clear()
+        self.started_writing.clear()
+        self.file_output_task = self.loop.create_task(self._save_file(self.full_path, priority, progress))
         await self.started_writing.wait()
 
-    def stop_tasks(self):
+    def stop_tasks(self, keep_partial_file: bool = False):
         if self.file_output_task and not self.file_output_task.done():
+            self._keep_partial_file = keep_partial_file
             self.file_output_task.cancel()
         self.file_output_task = None
         while self.streaming_responses:
@@ -426,9 +490,25 @@ class ManagedStream:
         self.downloader.stop()
         self._running.clear()
 
+    @staticmethod
+    async def _send_blobs_to_reflector(protocol: StreamReflectorClient, to_send: asyncio.Queue,
+                                       sent: typing.List[str]):
+        while not to_send.empty():
+            blob_hash = to_send.get_nowait()
+            await protocol.send_blob(blob_hash)
+            sent.append(blob_hash)
+
+    async def _connect_and_send_blobs_to_reflector(self, host: str, port: int, protocol: StreamReflectorClient,
+                                                   to_send: asyncio.Queue, sent: typing.List[str]):
+        await self.loop.create_connection(lambda: protocol, host, port)
+        await protocol.send_handshake()
+        await protocol.send_descriptor()  # the reflector has the sd blob by now, this opens the stream for blobs
+        await self._send_blobs_to_reflector(protocol, to_send, sent)
+
     async def upload_to_reflector(self, host: str, port: int) -> typing.List[str]:
         sent = []
         protocol = StreamReflectorClient(self.blob_manager, self.descriptor)
+        protocols = [protocol]
         try:
             await self.loop.create_connection(lambda: protocol, host, port)
             await protocol.send_handshake()
@@ -440,19 +520,33 @@ class ManagedStream:
                     self.fully_reflected.set()
                     await self.blob_manager.storage.update_reflected_stream(self.sd_hash, f"{host}:{port}")
                     return []
-            we_have = [
-                blob_hash for blob_hash in needed if blob_hash in self.blob_manager.completed_blob_hashes
-            ]
-            for blob_hash in we_have:
-                await protocol.send_blob(blob_hash)
-                sent.append(blob_hash)
+            to_send = asyncio.Queue(loop=self.loop)
+            for blob_hash in needed:
+                if blob_hash in self.blob_manager.completed_blob_hashes:
+                    to_send.put_nowait(blob_hash)
+            # the needed blobs are split between up to reflector_upload_connections connections, each connection
+            # takes the next blob from the queue as soon as the reflector confirms the previous one
+            protocols.extend(
+                StreamReflectorClient(self.blob_manager, self.descriptor)
+                for _ in range(min(self.config.reflector_upload_connections, to_send.qsize()) - 1)
+            )
+            results = await asyncio.gather(
+                self._send_blobs_to_reflector(protocol, to_send, sent),
+                *(self._connect_and_send_blobs_to_reflector(host, port, extra_protocol, to_send, sent)
+                  for extra_protocol in protocols[1:]),
+                loop=self.loop, return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
         except (asyncio.TimeoutError, ValueError):
             return sent
         except ConnectionRefusedError:
             return sent
         finally:
-            if protocol.transport:
-                protocol.transport.close()
+            for p in protocols:
+                if p.transport:
+                    p.transport.close()
         if not self.fully_reflected.is_set():
             self.fully_reflected.set()
             await self.blob_manager.storage.update_reflected_stream(self.sd_hash, f"{host}:{port}")
@@ -465,6 +559,9 @@ class ManagedStream:
             binascii.hexlify(claim.to_bytes()).decode(), claim.signing_channel_id, claim_info['address'],
             claim_info['claim_sequence'], claim_info.get('channel_name')
         )
+        callback = self.stream_changed_callback
+        if callback:
+            callback(self)
 
     async def update_content_claim(self, claim_info: typing.Optional[typing.Dict] = None):
         if not claim_info:
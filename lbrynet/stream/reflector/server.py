@@ -6,7 +6,7 @@ from json.decoder import JSONDecodeError
 from lbrynet.stream.descriptor import StreamDescriptor
 
 if typing.TYPE_CHECKING:
-    from lbrynet.blob.blob_file import BlobFile
+    from lbrynet.blob.blob_file import BlobFile, AbstractBlob
     from lbrynet.blob.blob_manager import BlobManager
     from lbrynet.blob.writer import HashBlobWriter
 
@@ -15,9 +15,11 @@ log = logging.getLogger(__name__)
 
 
 class ReflectorServerProtocol(asyncio.Protocol):
-    def __init__(self, blob_manager: 'BlobManager'):
+    def __init__(self, blob_manager: 'BlobManager', idle_timeout: float = 30.0):
         self.loop = asyncio.get_event_loop()
         self.blob_manager = blob_manager
+        self.idle_timeout = idle_timeout
+        self.last_received = self.loop.time()
         self.server_task: asyncio.Task = None
         self.started_listening = asyncio.Event(loop=self.loop)
         self.buf = b''
@@ -33,6 +35,7 @@ class ReflectorServerProtocol(asyncio.Protocol):
         self.transport = transport
 
     def data_received(self, data: bytes):
+        self.last_received = self.loop.time()
         if self.incoming.is_set():
             try:
                 self.writer.write(data)
@@ -49,6 +52,22 @@ class ReflectorServerProtocol(asyncio.Protocol):
     def send_response(self, response: typing.Dict):
         self.transport.write(json.dumps(response).encode())
 
+    async def wait_for_blob(self, blob: 'AbstractBlob'):
+        """
+        Wait for an incoming blob to be verified for as long as the client keeps sending data, raise
+        asyncio.TimeoutError if nothing is received for idle_timeout seconds
+        """
+        while True:
+            try:
+                return await asyncio.wait_for(blob.verified.wait(), self.idle_timeout, loop=self.loop)
+            except asyncio.TimeoutError:
+                if self.loop.time() - self.last_received >= self.idle_timeout:
+                    raise
+
+    def get_blob_writer(self, blob: 'AbstractBlob') -> 'HashBlobWriter':
+        # stream the blob to disk as it arrives so that memory use doesn't grow with the number of uploads
+        return blob.get_blob_writer(self.transport.get_extra_info('peername'), stream_to_disk=True)
+
     async def handle_request(self, request: typing.Dict):
         if self.client_version is None:
             if 'version' not in request:
@@ -63,11 +82,11 @@ class ReflectorServerProtocol(asyncio.Protocol):
                 return
             self.sd_blob = self.blob_manager.get_blob(request['sd_blob_hash'], request['sd_blob_size'])
             if not self.sd_blob.get_is_verified():
-                self.writer = self.sd_blob.get_blob_writer(self.transport.get_extra_info('peername'))
+                self.writer = self.get_blob_writer(self.sd_blob)
                 self.incoming.set()
                 self.send_response({"send_sd_blob": True})
                 try:
-                    await asyncio.wait_for(self.sd_blob.verified.wait(), 30, loop=self.loop)
+                    await self.wait_for_blob(self.sd_blob)
                     self.descriptor = await StreamDescriptor.from_stream_descriptor_blob(
                         self.loop, self.blob_manager.blob_dir, self.sd_blob
                     )
@@ -87,7 +106,7 @@ class ReflectorServerProtocol(asyncio.Protocol):
                 if self.writer:
                     self.writer.close_handle()
                     self.writer = None
-                self.send_response({"send_sd_blob": False, 'needed': [
+                self.send_response({"send_sd_blob": False, 'needed_blobs': [
                     blob.blob_hash for blob in self.descriptor.blobs[:-1]
                     if not self.blob_manager.get_blob(blob.blob_hash).get_is_verified()
                 ]})
@@ -102,11 +121,11 @@ class ReflectorServerProtocol(asyncio.Protocol):
                 return
             blob = self.blob_manager.get_blob(request['blob_hash'], request['blob_size'])
             if not blob.get_is_verified():
-                self.writer = blob.get_blob_writer(self.transport.get_extra_info('peername'))
+                self.writer = self.get_blob_writer(blob)
                 self.incoming.set()
                 self.send_response({"send_blob": True})
                 try:
-                    await asyncio.wait_for(blob.verified.wait(), 30, loop=self.loop)
+                    await self.wait_for_blob(blob)
                     self.send_response({"received_blob": True})
                 except asyncio.TimeoutError:
                     self.send_response({"received_blob": False})
@@ -121,9 +140,10 @@ class ReflectorServerProtocol(asyncio.Protocol):
 
 
 class ReflectorServer:
-    def __init__(self, blob_manager: 'BlobManager'):
+    def __init__(self, blob_manager: 'BlobManager', idle_timeout: float = 30.0):
         self.loop = asyncio.get_event_loop()
         self.blob_manager = blob_manager
+        self.idle_timeout = idle_timeout
         self.server_task: asyncio.Task = None
         self.started_listening = asyncio.Event(loop=self.loop)
 
@@ -133,7 +153,7 @@ class ReflectorServer:
 
         async def _start_server():
             server = await self.loop.create_server(
-                lambda: ReflectorServerProtocol(self.blob_manager),
+                lambda: ReflectorServerProtocol(self.blob_manager, self.idle_timeout),
                 interface, port
             )
             self.started_listening.set()
@@ -1,14 +1,18 @@
 import os
+import time
+import heapq
 import asyncio
 import typing
 import binascii
 import logging
 import random
+import itertools
 from decimal import Decimal
 from aiohttp.web import Request
 from lbrynet.error import ResolveError, InvalidStreamDescriptorError, KeyFeeAboveMaxAllowed, InsufficientFundsError
 from lbrynet.error import ResolveTimeout, DownloadDataTimeout
 from lbrynet.utils import cache_concurrent
+from lbrynet.blob_exchange.scheduler import DownloadScheduler, PRIORITY_BACKGROUND
 from lbrynet.stream.descriptor import StreamDescriptor
 from lbrynet.stream.managed_stream import ManagedStream
 from lbrynet.schema.claim import Claim
@@ -46,6 +50,41 @@ filter_fields = [
     'blobs_in_stream'
 ]
 
+# fields with a maintained index, sd_hash is indexed by StreamManager.streams
+indexed_fields = [
+    'stream_hash',
+    'claim_id',
+    'claim_name',
+    'outpoint',
+    'status'
+]
+
+# fields that can be matched against a file row before its stream is initialized
+file_info_fields = [
+    'rowid',
+    'status',
+    'sd_hash',
+    'stream_hash',
+    'claim_name',
+    'claim_height',
+    'claim_id',
+    'outpoint',
+    'txid',
+    'nout',
+    'channel_claim_id',
+    'channel_name'
+]
+
+# reflection priorities, lower values are uploaded first and streams of the same priority are uploaded smallest first
+REFLECT_PRIORITY_PUBLISH = 0
+REFLECT_PRIORITY_DOWNLOAD = 1
+REFLECT_PRIORITY_RE_REFLECT = 2
+
+REFLECT_RETRY_DELAY = 60
+REFLECT_MAX_RETRY_DELAY = 3600
+REFLECT_MAX_ATTEMPTS = 8
+REFLECT_RE_REFLECT_INTERVAL = 86400  # reflected streams are uploaded again after a day, like get_streams_to_re_reflect
+
 comparison_operators = {
     'eq': lambda a, b: a == b,
     'ne': lambda a, b: a != b,
@@ -62,6 +101,16 @@ def path_or_none(p) -> typing.Optional[str]:
     return binascii.unhexlify(p).decode()
 
 
+def file_info_value(file_info: typing.Dict, field: str):
+    if field in ('rowid', 'status', 'sd_hash', 'stream_hash'):
+        return file_info[field]
+    if file_info['claim'] is None:
+        return None
+    if field == 'claim_height':
+        return file_info['claim'].height
+    return getattr(file_info['claim'], field)
+
+
 class StreamManager:
     def __init__(self, loop: asyncio.BaseEventLoop, config: 'Config', blob_manager: 'BlobManager',
                  wallet: 'LbryWalletManager', storage: 'SQLiteStorage', node: typing.Optional['Node'],
@@ -74,15 +123,69 @@ class StreamManager:
         self.node = node
         self.analytics_manager = analytics_manager
         self.streams: typing.Dict[str, ManagedStream] = {}
+        self.download_scheduler = DownloadScheduler(self.loop, self.config.max_download_connections)
+        self._stream_index: typing.Dict[str, typing.Dict[typing.Any, typing.Dict[str, ManagedStream]]] = {
+            field: {} for field in indexed_fields
+        }
+        self._indexed_values: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        self.pending_file_infos: typing.Dict[str, typing.Dict] = {}
+        self.restore_pending_task: typing.Optional[asyncio.Task] = None
+        self._restore_lock = asyncio.Lock(loop=self.loop)
+        self._to_resume_saving: typing.List[typing.Tuple[str, str, str]] = []
         self.resume_saving_task: typing.Optional[asyncio.Task] = None
         self.re_reflect_task: typing.Optional[asyncio.Task] = None
         self.update_stream_finished_futs: typing.List[asyncio.Future] = []
-        self.running_reflector_uploads: typing.List[asyncio.Task] = []
+        self._reflect_queue: typing.List[typing.Tuple[int, int, str]] = []  # heap of (priority, size, sd_hash)
+        self._reflect_entries: typing.Dict[str, typing.Tuple[int, int, int]] = {}  # sd_hash: (priority, size, attempts)
+        self._reflect_retries: typing.Dict[str, asyncio.TimerHandle] = {}
+        self._reflecting: typing.Set[str] = set()
+        self._reflect_queue_changed = asyncio.Event(loop=self.loop)
         self.started = asyncio.Event(loop=self.loop)
 
+    def _index_stream(self, stream: ManagedStream):
+        self._unindex_stream(stream.sd_hash)
+        values = {}
+        for field in indexed_fields:
+            value = getattr(stream, field)
+            values[field] = value
+            self._stream_index[field].setdefault(value, {})[stream.sd_hash] = stream
+        self._indexed_values[stream.sd_hash] = values
+
+    def _unindex_stream(self, sd_hash: str):
+        values = self._indexed_values.pop(sd_hash, None)
+        if not values:
+            return
+        for field, value in values.items():
+            indexed = self._stream_index[field].get(value)
+            if indexed is None:
+                continue
+            indexed.pop(sd_hash, None)
+            if not indexed:
+                del self._stream_index[field][value]
+
+    def _add_to_streams(self, stream: ManagedStream):
+        self.streams[stream.sd_hash] = stream
+        stream.stream_changed_callback = self._stream_changed
+        self._index_stream(stream)
+        self.storage.content_claim_callbacks[stream.stream_hash] = lambda: self._update_content_claim(stream)
+
+    def _stream_changed(self, stream: ManagedStream):
+        self._index_stream(stream)
+        if stream.status == ManagedStream.STATUS_FINISHED and not stream.fully_reflected.is_set():
+            self.loop.create_task(self.queue_stream_for_reflection(stream, REFLECT_PRIORITY_DOWNLOAD))
+
+    def _remove_from_streams(self, sd_hash: str) -> typing.Optional[ManagedStream]:
+        stream = self.streams.pop(sd_hash, None)
+        self._unindex_stream(sd_hash)
+        if stream:
+            stream.stream_changed_callback = None
+        return stream
+
     async def _update_content_claim(self, stream: ManagedStream):
         claim_info = await self.storage.get_content_claim(stream.stream_hash)
-        self.streams.setdefault(stream.sd_hash, stream).set_claim(claim_info, claim_info['value'])
+        if stream.sd_hash not in self.streams:
+            self._add_to_streams(stream)
+        self.streams[stream.sd_hash].set_claim(claim_info, claim_info['value'])
 
     async def recover_streams(self, file_infos: typing.List[typing.Dict]):
         to_restore = []
@@ -115,40 +218,45 @@ class StreamManager:
 
     async def add_stream(self, rowid: int, sd_hash: str, file_name: typing.Optional[str],
                          download_directory: typing.Optional[str], status: str,
-                         claim: typing.Optional['StoredStreamClaim'], content_fee: typing.Optional['Transaction']):
-        try:
-            descriptor = await self.blob_manager.get_stream_descriptor(sd_hash)
-        except InvalidStreamDescriptorError as err:
-            log.warning("Failed to start stream for sd %s - %s", sd_hash, str(err))
-            return
+                         claim: typing.Optional['StoredStreamClaim'], content_fee: typing.Optional['Transaction'],
+                         descriptor: typing.Optional[StreamDescriptor] = None):
+        if not descriptor:
+            try:
+                descriptor = await self.blob_manager.get_stream_descriptor(sd_hash)
+            except InvalidStreamDescriptorError as err:
+                log.warning("Failed to start stream for sd %s - %s", sd_hash, str(err))
+                return
+            await self.storage.store_stream_descriptor(descriptor, descriptor.length)
         stream = ManagedStream(
             self.loop, self.config, self.blob_manager, descriptor.sd_hash, download_directory, file_name, status,
             claim, content_fee=content_fee, rowid=rowid, descriptor=descriptor,
-            analytics_manager=self.analytics_manager
+            analytics_manager=self.analytics_manager, download_scheduler=self.download_scheduler
         )
-        self.streams[sd_hash] = stream
-        self.storage.content_claim_callbacks[stream.stream_hash] = lambda: self._update_content_claim(stream)
+        self._add_to_streams(stream)
 
-    async def load_and_resume_streams_from_database(self):
-        to_recover = []
-        to_start = []
-
-        await self.storage.update_manually_removed_files_since_last_run()
+    def _get_cached_descriptor(self, file_info: typing.Dict) -> typing.Optional[StreamDescriptor]:
+        if not file_info['blobs'] or not self.blob_manager.is_blob_verified(file_info['sd_hash']):
+            return
+        return StreamDescriptor(
+            self.loop, self.blob_manager.blob_dir, binascii.unhexlify(file_info['stream_name']).decode(),
+            file_info['key'], binascii.unhexlify(file_info['suggested_file_name']).decode(), file_info['blobs'],
+            file_info['stream_hash'], file_info['sd_hash'], file_info['sd_length']
+        )
 
-        for file_info in await self.storage.get_all_lbry_files():
-            # if the sd blob is not verified, try to reconstruct it from the database
-            # this could either be because the blob files were deleted manually or save_blobs was not true when
-            # the stream was downloaded
-            if not self.blob_manager.is_blob_verified(file_info['sd_hash']):
-                to_recover.append(file_info)
-            to_start.append(file_info)
+    async def _restore_file_infos(self,
+                                  file_infos: typing.List[typing.Dict]) -> typing.List[typing.Tuple[str, str, str]]:
+        # if the sd blob is not verified, try to reconstruct it from the database
+        # this could either be because the blob files were deleted manually or save_blobs was not true when
+        # the stream was downloaded
+        to_recover = [
+            file_info for file_info in file_infos if not self.blob_manager.is_blob_verified(file_info['sd_hash'])
+        ]
         if to_recover:
             await self.recover_streams(to_recover)
 
-        log.info("Initializing %i files", len(to_start))
         to_resume_saving = []
         add_stream_tasks = []
-        for file_info in to_start:
+        for file_info in file_infos:
             file_name = path_or_none(file_info['file_name'])
             download_directory = path_or_none(file_info['download_directory'])
             if file_name and download_directory and not file_info['saved_file'] and file_info['status'] == 'running':
@@ -156,42 +264,188 @@ class StreamManager:
             add_stream_tasks.append(self.loop.create_task(self.add_stream(
                 file_info['rowid'], file_info['sd_hash'], file_name,
                 download_directory, file_info['status'],
-                file_info['claim'], file_info['content_fee']
+                file_info['claim'], file_info['content_fee'], self._get_cached_descriptor(file_info)
             )))
         if add_stream_tasks:
             await asyncio.gather(*add_stream_tasks, loop=self.loop)
-        log.info("Started stream manager with %i files", len(self.streams))
+        return to_resume_saving
+
+    async def load_and_resume_streams_from_database(self):
+        await self.storage.update_manually_removed_files_since_last_run()
+        file_infos = await self.storage.get_all_lbry_files()
         if not self.node:
             log.warning("no DHT node given, resuming downloads trusting that we can contact reflector")
+
+        if self.config.lazy_stream_restore:
+            log.info("Deferring initialization of %i files", len(file_infos))
+            self.pending_file_infos.update({file_info['sd_hash']: file_info for file_info in file_infos})
+            self.restore_pending_task = self.loop.create_task(self.restore_pending_streams())
+            return
+
+        log.info("Initializing %i files", len(file_infos))
+        to_resume_saving = await self._restore_file_infos(file_infos)
+        log.info("Started stream manager with %i files", len(self.streams))
         if to_resume_saving:
             self.resume_saving_task = self.loop.create_task(self.resume(to_resume_saving))
 
+    async def _restore_pending(self, sd_hashes: typing.List[str]):
+        async with self._restore_lock:
+            file_infos = [
+                self.pending_file_infos.pop(sd_hash) for sd_hash in sd_hashes if sd_hash in self.pending_file_infos
+            ]
+            if file_infos:
+                self._to_resume_saving.extend(await self._restore_file_infos(file_infos))
+
+    async def restore_pending_streams(self, batch_size: int = 100):
+        """
+        Initialize the file rows deferred at startup in small batches, yielding to other tasks in between
+        """
+        while self.pending_file_infos:
+            await self._restore_pending(list(itertools.islice(self.pending_file_infos, batch_size)))
+            await asyncio.sleep(0, loop=self.loop)
+        log.info("Finished initializing stream manager with %i files", len(self.streams))
+        if self._to_resume_saving:
+            to_resume_saving, self._to_resume_saving = self._to_resume_saving, []
+            self.resume_saving_task = self.loop.create_task(self.resume(to_resume_saving))
+
+    async def restore_streams(self, comparison: typing.Optional[str] = None, **search_by):
+        """
+        Initialize deferred file rows that could match a filter before looking them up in StreamManager.streams
+
+        :param comparison: comparison operator used for filtering
+        :param search_by: fields and values to filter by, if none are given all deferred files are initialized
+        """
+        if not self.pending_file_infos:
+            return
+        search_by.pop('full_status', None)
+        comparison = comparison or 'eq'
+        if search_by and comparison in comparison_operators and all(
+                search in file_info_fields for search in search_by):
+            sd_hashes = [
+                sd_hash for sd_hash, file_info in self.pending_file_infos.items()
+                if any(comparison_operators[comparison](file_info_value(file_info, search), val)
+                       for search, val in search_by.items())
+            ]
+        else:
+            sd_hashes = list(self.pending_file_infos.keys())
+        await self._restore_pending(sd_hashes)
+
     async def resume(self, to_resume_saving):
         log.info("Resuming saving %i files", len(to_resume_saving))
         await asyncio.gather(
-            *(self.streams[sd_hash].save_file(file_name, download_directory, node=self.node)
+            *(self.streams[sd_hash].save_file(file_name, download_directory, node=self.node,
+                                              priority=PRIORITY_BACKGROUND)
               for (file_name, download_directory, sd_hash) in to_resume_saving),
             loop=self.loop
         )
 
-    async def reflect_streams(self):
+    def _push_reflect_entry(self, sd_hash: str):
+        self._reflect_retries.pop(sd_hash, None)
+        if sd_hash in self._reflect_entries:
+            priority, size, _ = self._reflect_entries[sd_hash]
+            heapq.heappush(self._reflect_queue, (priority, size, sd_hash))
+            self._reflect_queue_changed.set()
+
+    def _schedule_reflect_entry(self, sd_hash: str, priority: int, size: int, attempts: int = 0,
+                                delay: float = 0.0):
+        self._reflect_entries[sd_hash] = (priority, size, attempts)
+        if delay > 0:
+            self._reflect_retries[sd_hash] = self.loop.call_later(delay, self._push_reflect_entry, sd_hash)
+        else:
+            self._push_reflect_entry(sd_hash)
+
+    def _unschedule_reflect_entry(self, sd_hash: str):
+        self._reflect_entries.pop(sd_hash, None)
+        retry = self._reflect_retries.pop(sd_hash, None)
+        if retry:
+            retry.cancel()
+
+    async def queue_stream_for_reflection(self, stream: ManagedStream, priority: int = REFLECT_PRIORITY_PUBLISH):
+        """
+        Add a stream to the persisted reflector queue, the queue is consumed by reflect_streams
+        """
+        if not (self.config.reflect_streams and self.config.reflector_servers):
+            return
+        if stream.sd_hash in self._reflect_entries:
+            return
+        size = sum(blob.length for blob in stream.descriptor.blobs)
+        self._schedule_reflect_entry(stream.sd_hash, priority, size)
+        await self.storage.save_reflector_queue_entry(stream.sd_hash, priority, size, 0, int(time.time()))
+
+    async def _load_reflector_queue(self):
+        now = int(time.time())
+        for sd_hash, priority, size, attempts, next_attempt in await self.storage.get_reflector_queue():
+            self._schedule_reflect_entry(sd_hash, priority, size, attempts, max(0, next_attempt - now))
+        for sd_hash, size in await self.storage.get_streams_to_re_reflect():
+            if sd_hash not in self._reflect_entries:
+                self._schedule_reflect_entry(sd_hash, REFLECT_PRIORITY_RE_REFLECT, size)
+
+    async def _schedule_re_reflect(self, sd_hash: str, size: int):
+        self._schedule_reflect_entry(sd_hash, REFLECT_PRIORITY_RE_REFLECT, size, delay=REFLECT_RE_REFLECT_INTERVAL)
+        # not persisted, on startup the stream is queued again by get_streams_to_re_reflect once it is due
+        await self.storage.delete_reflector_queue_entry(sd_hash)
+
+    async def _reflect_stream(self, sd_hash: str):
+        priority, size, attempts = self._reflect_entries[sd_hash]
+        await self._restore_pending([sd_hash])
+        stream = self.streams.get(sd_hash)
+        if not stream or not self.blob_manager.is_blob_verified(sd_hash) or not stream.blobs_completed:
+            self._unschedule_reflect_entry(sd_hash)
+            await self.storage.delete_reflector_queue_entry(sd_hash)
+            return
+        if priority == REFLECT_PRIORITY_RE_REFLECT:
+            stream.fully_reflected.clear()
+        elif stream.fully_reflected.is_set():
+            await self._schedule_re_reflect(sd_hash, size)
+            return
+        host, port = random.choice(self.config.reflector_servers)
+        try:
+            await stream.upload_to_reflector(host, port)
+        except Exception as err:
+            if isinstance(err, asyncio.CancelledError):
+                raise err
+            log.warning("error reflecting stream %s to %s:%i - %s", sd_hash[:6], host, port, str(err))
+        if sd_hash not in self._reflect_entries:  # the stream was deleted during the upload
+            return
+        if stream.fully_reflected.is_set():
+            await self._schedule_re_reflect(sd_hash, size)
+        elif attempts + 1 >= REFLECT_MAX_ATTEMPTS:
+            log.warning("giving up reflecting stream %s after %i attempts", sd_hash[:6], attempts + 1)
+            self._unschedule_reflect_entry(sd_hash)
+            await self.storage.delete_reflector_queue_entry(sd_hash)
+        else:
+            delay = min(REFLECT_RETRY_DELAY * 2 ** attempts, REFLECT_MAX_RETRY_DELAY)
+            self._schedule_reflect_entry(sd_hash, priority, size, attempts + 1, delay)
+            await self.storage.save_reflector_queue_entry(
+                sd_hash, priority, size, attempts + 1, int(time.time() + delay)
+            )
+
+    async def _reflect_worker(self):
         while True:
-            if self.config.reflect_streams and self.config.reflector_servers:
-                sd_hashes = await self.storage.get_streams_to_re_reflect()
-                sd_hashes = [sd for sd in sd_hashes if sd in self.streams]
-                batch = []
-                while sd_hashes:
-                    stream = self.streams[sd_hashes.pop()]
-                    if self.blob_manager.is_blob_verified(stream.sd_hash) and stream.blobs_completed:
-                        if not stream.fully_reflected.is_set():
-                            host, port = random.choice(self.config.reflector_servers)
-                            batch.append(stream.upload_to_reflector(host, port))
-                    if len(batch) >= self.config.concurrent_reflector_uploads:
-                        await asyncio.gather(*batch, loop=self.loop)
-                        batch = []
-                if batch:
-                    await asyncio.gather(*batch, loop=self.loop)
-            await asyncio.sleep(300, loop=self.loop)
+            while not self._reflect_queue:
+                self._reflect_queue_changed.clear()
+                await self._reflect_queue_changed.wait()
+            _, _, sd_hash = heapq.heappop(self._reflect_queue)
+            if sd_hash not in self._reflect_entries or sd_hash in self._reflect_retries or sd_hash in self._reflecting:
+                continue
+            self._reflecting.add(sd_hash)
+            try:
+                await self._reflect_stream(sd_hash)
+            finally:
+                self._reflecting.discard(sd_hash)
+
+    async def reflect_streams(self):
+        """
+        Upload queued streams to the reflector servers, fresh publishes first and then the smallest streams first.
+        Failed uploads are retried with an exponential backoff, the queue is persisted in the database. Reflected
+        streams are queued again to be re-reflected after REFLECT_RE_REFLECT_INTERVAL.
+        """
+        if not (self.config.reflect_streams and self.config.reflector_servers):
+            return
+        await self._load_reflector_queue()
+        await asyncio.gather(
+            *(self._reflect_worker() for _ in range(self.config.concurrent_reflector_uploads)), loop=self.loop
+        )
 
     async def start(self):
         await self.load_and_resume_streams_from_database()
@@ -199,39 +453,40 @@ class StreamManager:
         self.started.set()
 
     def stop(self):
+        if self.restore_pending_task and not self.restore_pending_task.done():
+            self.restore_pending_task.cancel()
+        self.pending_file_infos.clear()
+        self._to_resume_saving.clear()
         if self.resume_saving_task and not self.resume_saving_task.done():
             self.resume_saving_task.cancel()
         if self.re_reflect_task and not self.re_reflect_task.done():
             self.re_reflect_task.cancel()
+        for sd_hash in list(self._reflect_entries):
+            self._unschedule_reflect_entry(sd_hash)
+        self._reflect_queue.clear()
         while self.streams:
             _, stream = self.streams.popitem()
-            stream.stop_tasks()
+            stream.stream_changed_callback = None
+            stream.stop_tasks(keep_partial_file=True)
+        self._indexed_values.clear()
+        for index in self._stream_index.values():
+            index.clear()
         while self.update_stream_finished_futs:
             self.update_stream_finished_futs.pop().cancel()
-        while self.running_reflector_uploads:
-            self.running_reflector_uploads.pop().cancel()
         self.started.clear()
         log.info("finished stopping the stream manager")
 
     async def create_stream(self, file_path: str, key: typing.Optional[bytes] = None,
                             iv_generator: typing.Optional[typing.Generator[bytes, None, None]] = None) -> ManagedStream:
         stream = await ManagedStream.create(self.loop, self.config, self.blob_manager, file_path, key, iv_generator)
-        self.streams[stream.sd_hash] = stream
-        self.storage.content_claim_callbacks[stream.stream_hash] = lambda: self._update_content_claim(stream)
-        if self.config.reflect_streams and self.config.reflector_servers:
-            host, port = random.choice(self.config.reflector_servers)
-            task = self.loop.create_task(stream.upload_to_reflector(host, port))
-            self.running_reflector_uploads.append(task)
-            task.add_done_callback(
-                lambda _: None
-                if task not in self.running_reflector_uploads else self.running_reflector_uploads.remove(task)
-            )
+        self._add_to_streams(stream)
+        await self.queue_stream_for_reflection(stream, REFLECT_PRIORITY_PUBLISH)
         return stream
 
     async def delete_stream(self, stream: ManagedStream, delete_file: typing.Optional[bool] = False):
         stream.stop_tasks()
-        if stream.sd_hash in self.streams:
-            del self.streams[stream.sd_hash]
+        self._remove_from_streams(stream.sd_hash)
+        self._unschedule_reflect_entry(stream.sd_hash)
         blob_hashes = [stream.sd_hash] + [b.blob_hash for b in stream.descriptor.blobs[:-1]]
         await self.blob_manager.delete_blobs(blob_hashes, delete_from_db=False)
         await self.storage.delete_stream(stream.descriptor)
@@ -239,9 +494,32 @@ class StreamManager:
             os.remove(stream.full_path)
 
     def get_stream_by_stream_hash(self, stream_hash: str) -> typing.Optional[ManagedStream]:
-        streams = tuple(filter(lambda stream: stream.stream_hash == stream_hash, self.streams.values()))
+        streams = self._stream_index['stream_hash'].get(stream_hash)
         if streams:
-            return streams[0]
+            return next(iter(streams.values()))
+
+    def _get_indexed_streams(self, **search_by) -> typing.List[ManagedStream]:
+        found: typing.Dict[str, ManagedStream] = {}
+        for search, val in search_by.items():
+            if search == 'sd_hash':
+                if val in self.streams:
+                    found.setdefault(val, self.streams[val])
+            else:
+                for sd_hash, stream in self._stream_index[search].get(val, {}).items():
+                    found.setdefault(sd_hash, stream)
+        return list(found.values())
+
+    @staticmethod
+    def _check_filter(sort_by: typing.Optional[str], comparison: typing.Optional[str], search_by: typing.Dict):
+        if sort_by and sort_by not in filter_fields:
+            raise ValueError(f"'{sort_by}' is not a valid field to sort by")
+        if comparison and comparison not in comparison_operators:
+            raise ValueError(f"'{comparison}' is not a valid comparison")
+        if 'full_status' in search_by:
+            del search_by['full_status']
+        for search in search_by.keys():
+            if search not in filter_fields:
+                raise ValueError(f"'{search}' is not a valid search operation")
 
     def get_filtered_streams(self, sort_by: typing.Optional[str] = None, reverse: typing.Optional[bool] = False,
                              comparison: typing.Optional[str] = None,
@@ -254,23 +532,18 @@ class StreamManager:
         :param comparison: comparison operator used for filtering
         :param search_by: fields and values to filter by
         """
-        if sort_by and sort_by not in filter_fields:
-            raise ValueError(f"'{sort_by}' is not a valid field to sort by")
-        if comparison and comparison not in comparison_operators:
-            raise ValueError(f"'{comparison}' is not a valid comparison")
-        if 'full_status' in search_by:
-            del search_by['full_status']
-        for search in search_by.keys():
-            if search not in filter_fields:
-                raise ValueError(f"'{search}' is not a valid search operation")
+        self._check_filter(sort_by, comparison, search_by)
         if search_by:
             comparison = comparison or 'eq'
-            streams = []
-            for stream in self.streams.values():
-                for search, val in search_by.items():
-                    if comparison_operators[comparison](getattr(stream, search), val):
-                        streams.append(stream)
-                        break
+            if comparison == 'eq' and all(search == 'sd_hash' or search in indexed_fields for search in search_by):
+                streams = self._get_indexed_streams(**search_by)
+            else:
+                streams = []
+                for stream in self.streams.values():
+                    for search, val in search_by.items():
+                        if comparison_operators[comparison](getattr(stream, search), val):
+                            streams.append(stream)
+                            break
         else:
             streams = list(self.streams.values())
         if sort_by:
@@ -279,8 +552,52 @@ class StreamManager:
                 streams.reverse()
         return streams
 
+    async def _flush_blob_writes_for_filter(self, sort_by: typing.Optional[str], search_by: typing.Dict):
+        # blobs_remaining is counted from the blob statuses in the database, write the completions waiting in the
+        # write-behind queue first so it matches the in memory count of ManagedStream.blobs_remaining
+        if sort_by == 'blobs_remaining' or 'blobs_remaining' in search_by:
+            await self.blob_manager.flush_blob_writes()
+
+    async def get_filtered_streams_page(self, sort_by: typing.Optional[str] = None,
+                                        reverse: typing.Optional[bool] = False,
+                                        comparison: typing.Optional[str] = None, offset: int = 0,
+                                        limit: typing.Optional[int] = None, **search_by) -> typing.List[ManagedStream]:
+        """
+        Get a page of filtered and sorted ManagedStream objects, filtering, sorting and paging in the database so
+        that only the streams on the page have to be initialized
+
+        :param sort_by: field to sort by
+        :param reverse: reverse sorting
+        :param comparison: comparison operator used for filtering
+        :param offset: number of matching streams to skip
+        :param limit: maximum number of streams to return
+        :param search_by: fields and values to filter by
+        """
+        self._check_filter(sort_by, comparison, search_by)
+        await self._flush_blob_writes_for_filter(sort_by, search_by)
+        sd_hashes = await self.storage.get_filtered_file_sd_hashes(
+            sort_by, reverse, comparison, offset, limit, **search_by
+        )
+        await self._restore_pending(sd_hashes)
+        return [self.streams[sd_hash] for sd_hash in sd_hashes if sd_hash in self.streams]
+
+    async def count_filtered_streams(self, comparison: typing.Optional[str] = None, **search_by) -> int:
+        """
+        Count the streams matching a filter
+
+        :param comparison: comparison operator used for filtering
+        :param search_by: fields and values to filter by, paging constraints are ignored
+        """
+        search_by.pop('offset', None)
+        search_by.pop('limit', None)
+        self._check_filter(None, comparison, search_by)
+        await self._flush_blob_writes_for_filter(None, search_by)
+        return await self.storage.count_filtered_files(comparison, **search_by)
+
     async def _check_update_or_replace(self, outpoint: str, claim_id: str, claim: Claim) -> typing.Tuple[
                                                        typing.Optional[ManagedStream], typing.Optional[ManagedStream]]:
+        # the lookups below only see initialized streams, initialize the deferred ones that could match first
+        await self.restore_streams(outpoint=outpoint, sd_hash=claim.stream.source.sd_hash, claim_id=claim_id)
         existing = self.get_filtered_streams(outpoint=outpoint)
         if existing:
             return existing[0], None
@@ -412,7 +729,7 @@ class StreamManager:
             stream = ManagedStream(
                 self.loop, self.config, self.blob_manager, claim.stream.source.sd_hash, download_directory,
                 file_name, ManagedStream.STATUS_RUNNING, content_fee=content_fee,
-                analytics_manager=self.analytics_manager
+                analytics_manager=self.analytics_manager, download_scheduler=self.download_scheduler
             )
             log.info("starting download for %s", uri)
 
@@ -428,8 +745,7 @@ class StreamManager:
                 log.info("paid fee of %s for %s", fee_amount, uri)
                 await self.storage.save_content_fee(stream.stream_hash, stream.content_fee)
 
-            self.streams[stream.sd_hash] = stream
-            self.storage.content_claim_callbacks[stream.stream_hash] = lambda: self._update_content_claim(stream)
+            self._add_to_streams(stream)
             await self.storage.save_content_claim(stream.stream_hash, outpoint)
             if save_file:
                 await asyncio.wait_for(stream.save_file(node=self.node), timeout - (self.loop.time() - before_download),
@@ -0,0 +1,45 @@
+import argparse
+import os
+import timeit
+
+from lbrynet.dht import constants
+from lbrynet.dht.serialization.bencoding import bencode, bdecode
+from lbrynet.dht.serialization.datagram import ResponseDatagram, RESPONSE_TYPE, make_compact_address
+
+
+def make_find_value_response(peer_count: int) -> ResponseDatagram:
+    key = constants.generate_id()
+    return ResponseDatagram(RESPONSE_TYPE, os.urandom(constants.rpc_id_length), constants.generate_id(), {
+        b'token': os.urandom(constants.hash_length),
+        b'contacts': [
+            (constants.generate_id(), f'10.0.0.{i}', 4444) for i in range(constants.k)
+        ],
+        b'protocolVersion': constants.protocol_version,
+        key: [
+            bytes(make_compact_address(constants.generate_id(), f'10.0.1.{i % 256}', 3333))
+            for i in range(peer_count)
+        ]
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time bencoding and bdecoding find_value response datagrams")
+    parser.add_argument("--peers", nargs="+", type=int, default=[constants.k, 32, 128],
+                        help="number of compact peers in the responses")
+    parser.add_argument("--iterations", type=int, default=10000)
+    args = parser.parse_args()
+
+    for peer_count in args.peers:
+        response = make_find_value_response(peer_count)
+        encoded = response.bencode()
+        primitive = bdecode(encoded)
+        assert bencode(primitive) == encoded
+        encode_time = timeit.timeit(response.bencode, number=args.iterations)
+        decode_time = timeit.timeit(lambda: bdecode(encoded), number=args.iterations)
+        print(f"{peer_count} peers, {len(encoded)} bytes: "
+              f"encode {encode_time / args.iterations * 1000000:.1f}us, "
+              f"decode {decode_time / args.iterations * 1000000:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
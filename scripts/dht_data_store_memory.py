@@ -0,0 +1,66 @@
+import argparse
+import asyncio
+import os
+import tracemalloc
+
+from lbrynet.dht import constants
+from lbrynet.dht.peer import PeerManager, KademliaPeer
+from lbrynet.dht.protocol.data_store import DictDataStore
+
+
+def make_peers(loop, count: int):
+    return [
+        KademliaPeer(loop, f'10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}', constants.generate_id(i), 4444, 3333)
+        for i in range(count)
+    ]
+
+
+def measure(store_announcements) -> int:
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    stored = store_announcements()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del stored
+    return after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description="report the memory used per blob announcement in the DHT data store")
+    parser.add_argument("--keys", type=int, default=10000)
+    parser.add_argument("--peers", type=int, default=1000, help="number of distinct announcing peers")
+    parser.add_argument("--peers_per_key", type=int, default=8)
+    args = parser.parse_args()
+
+    loop = asyncio.get_event_loop()
+    keys = [os.urandom(constants.hash_length) for _ in range(args.keys)]
+    announcements = args.keys * args.peers_per_key
+
+    def store_compact():
+        data_store = DictDataStore(loop, PeerManager(loop))
+        for i, key in enumerate(keys):
+            for j in range(args.peers_per_key):
+                data_store.add_peer_to_blob(peers[(i + j) % len(peers)], key)
+        return data_store
+
+    def store_peer_tuples():
+        # the previous representation, a list of (KademliaPeer, timestamp) per key, where each announcement kept the
+        # peer decoded from its store request
+        data_store = {}
+        for i, key in enumerate(keys):
+            data_store[key] = [
+                (KademliaPeer(loop, ''.join(peer.address), bytes(bytearray(peer.node_id)), peer.udp_port,
+                              peer.tcp_port), loop.time())
+                for peer in (peers[(i + j) % len(peers)] for j in range(args.peers_per_key))
+            ]
+        return data_store
+
+    peers = make_peers(loop, args.peers)
+    for name, store_announcements in (("peer tuples", store_peer_tuples), ("compact", store_compact)):
+        used = measure(store_announcements)
+        print(f"{name}: {used / 1024 / 1024:.1f} MiB for {announcements} announcements, "
+              f"{used / announcements:.0f} bytes each")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import asyncio
+import time
+
+from lbrynet.dht import constants
+from tests.dht_simulation import SimulatedLoop, SimulatedNetwork
+
+
+async def run(network: SimulatedNetwork, lookups: int, concurrency: int):
+    results = []
+    for _ in range(0, lookups, concurrency):
+        results.extend(await asyncio.gather(*(
+            network.lookup(network.random.choice(network.online_nodes()), constants.generate_id())
+            for _ in range(concurrency)
+        ), loop=network.loop))
+    return results[:lookups]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="measure iterative node lookups on a simulated in memory network")
+    parser.add_argument("--nodes", type=int, default=500)
+    parser.add_argument("--lookups", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="mean one way latency in seconds")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    loop = SimulatedLoop()
+    asyncio.set_event_loop(loop)
+    network = SimulatedNetwork(loop, args.latency, seed=args.seed)
+    network.add_nodes(args.nodes)
+    network.bootstrap()
+    started = time.perf_counter()
+    results = loop.run_until_complete(run(network, args.lookups, args.concurrency))
+    network.stop()
+    loop.run_until_complete(asyncio.sleep(0))
+    loop.close()
+
+    print(f"{len(results)} lookups on {args.nodes} nodes in {time.perf_counter() - started:.1f}s")
+    elapsed = [result.latency for result in results]
+    round_trip = args.latency * 2
+    print(f"closest {constants.k} found: {sum(result.closest_found for result in results) / len(results):.2f} "
+          f"on average")
+    print(f"latency: {sum(elapsed) / len(elapsed):.3f}s on average ({sum(elapsed) / len(elapsed) / round_trip:.1f} "
+          f"round trips), {sorted(elapsed)[len(elapsed) // 2]:.3f}s median, {max(elapsed):.3f}s max")
+    print(f"find_node requests: {sum(result.sent_requests for result in results) / len(results):.1f} on average")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import asyncio
+import timeit
+
+from lbrynet.dht import constants
+from lbrynet.dht.peer import PeerManager, KademliaPeer
+from lbrynet.dht.protocol.distance import Distance
+from lbrynet.dht.protocol.routing_table import TreeRoutingTable
+
+
+def make_routing_table(loop, peer_count: int) -> TreeRoutingTable:
+    routing_table = TreeRoutingTable(loop, PeerManager(loop), constants.generate_id(), constants.hash_bits)
+    for i in range(peer_count):
+        peer = KademliaPeer(loop, f'10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}', constants.generate_id(), 4444)
+        bucket_index = routing_table.kbucket_index(peer.node_id)
+        while not routing_table.buckets[bucket_index].add_peer(peer):
+            routing_table.split_bucket(bucket_index)
+            bucket_index = routing_table.kbucket_index(peer.node_id)
+    return routing_table
+
+
+def sorted_by_distance_helper(routing_table: TreeRoutingTable, key: bytes):
+    # the previous find_close_peers, a full sort with the node ids converted to ints inside the sort key
+    distance = Distance(key)
+    contacts = routing_table.get_peers()
+    contacts.sort(key=lambda c: distance(c.node_id))
+    return contacts[:constants.k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="time closest peer lookups on routing tables with many peers")
+    parser.add_argument("--peers", nargs="+", type=int, default=[1000, 5000, 20000])
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    loop = asyncio.get_event_loop()
+    for peer_count in args.peers:
+        routing_table = make_routing_table(loop, peer_count)
+        keys = [constants.generate_id() for _ in range(args.lookups)]
+        for key in keys:
+            assert routing_table.find_close_peers(key) == sorted_by_distance_helper(routing_table, key)
+        old = timeit.timeit(lambda: [sorted_by_distance_helper(routing_table, key) for key in keys], number=1)
+        new = timeit.timeit(lambda: [routing_table.find_close_peers(key) for key in keys], number=1)
+        bucket_index = timeit.timeit(lambda: [routing_table.kbucket_index(key) for key in keys], number=1)
+        print(f"{len(routing_table.get_peers())} peers in {len(routing_table.buckets)} buckets: "
+              f"find_close_peers {new / args.lookups * 1000:.3f}ms "
+              f"(Distance sort {old / args.lookups * 1000:.3f}ms), "
+              f"kbucket_index {bucket_index / args.lookups * 1000000:.1f}us")
+
+
+if __name__ == "__main__":
+    main()
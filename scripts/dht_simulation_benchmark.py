@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from lbrynet.dht import constants
+from tests.dht_simulation import SimulatedLoop, SimulatedNetwork
+
+
+def percentile(values, fraction: float):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run_lookups(network: SimulatedNetwork, lookups: int, concurrency: int = 20):
+    results = []
+    for _ in range(0, lookups, concurrency):
+        results.extend(await asyncio.gather(*(
+            network.lookup(network.random.choice(network.online_nodes()), constants.generate_id())
+            for _ in range(concurrency)
+        ), loop=network.loop))
+    return results[:lookups]
+
+
+async def run_announces(network: SimulatedNetwork, announcing_nodes: int, blobs_per_node: int):
+    stored_to = await asyncio.gather(*(
+        network.announce(node, blobs_per_node)
+        for node in network.random.sample(network.online_nodes(), announcing_nodes)
+    ), loop=network.loop)
+    return [len(node_ids) for result in stored_to for node_ids in result.values()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run lookups and announces on a simulated network of DHT nodes")
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05, help="mean one way latency in seconds")
+    parser.add_argument("--loss", type=float, default=0.0, help="fraction of datagrams dropped")
+    parser.add_argument("--churn", type=float, default=0.0,
+                        help="fraction of the nodes going offline (and as many coming back) each churn interval")
+    parser.add_argument("--churn_interval", type=float, default=60.0)
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--announcing_nodes", type=int, default=10)
+    parser.add_argument("--blobs", type=int, default=20, help="blobs announced by each announcing node")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    loop = SimulatedLoop()
+    asyncio.set_event_loop(loop)
+    network = SimulatedNetwork(loop, args.latency, args.loss, seed=args.seed)
+
+    started = time.perf_counter()
+    tracemalloc.start()
+    network.add_nodes(args.nodes)
+    network.bootstrap()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"started {args.nodes} nodes in {time.perf_counter() - started:.1f}s, "
+          f"{memory / args.nodes / 1024:.1f} KiB per node")
+
+    if args.churn:
+        network.churn(args.churn)
+        network.start_churn(args.churn, args.churn_interval)
+
+    cpu, requests, simulated = time.process_time(), network.requests, loop.time()
+    lookups = loop.run_until_complete(run_lookups(network, args.lookups))
+    announces = loop.run_until_complete(run_announces(network, args.announcing_nodes, args.blobs))
+    cpu, requests = time.process_time() - cpu, network.requests - requests
+    network.stop()
+    loop.run_until_complete(asyncio.sleep(0))
+    loop.close()
+
+    latencies = [result.latency for result in lookups]
+    print(f"{len(lookups)} lookups: "
+          f"{sum(result.closest_found for result in lookups) / len(lookups):.2f} of the {constants.k} closest "
+          f"online nodes found, {sum(result.hops for result in lookups) / len(lookups):.2f} hops, "
+          f"{sum(result.sent_requests for result in lookups) / len(lookups):.1f} requests sent on average")
+    print(f"lookup latency: {sum(latencies) / len(latencies):.3f}s average, {percentile(latencies, 0.5):.3f}s median, "
+          f"{percentile(latencies, 0.95):.3f}s 95th percentile")
+    print(f"{len(announces)} announces: {sum(1 for stored in announces if stored > 4) / len(announces):.1%} stored "
+          f"to more than 4 peers, {sum(announces) / len(announces):.1f} peers on average")
+    print(f"{requests} requests in {loop.time() - simulated:.1f}s of simulated time, "
+          f"{cpu / requests * 1000000:.0f}us of CPU per request, {network.dropped} datagrams dropped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Measure the time to first byte of a stream downloaded from a blob server on this machine
+
+The client connects to the server through a relay that adds latency and limits the bandwidth of each connection, and
+finds the server after a simulated peer search. The time to first byte is counted from starting the stream, as `get`
+does, to the decrypted head blob being read by a player that asks for it --player-delay seconds later.
+"""
+import os
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+import typing
+from lbrynet.blob.blob_file import MAX_BLOB_SIZE
+from lbrynet.blob.blob_manager import BlobManager
+from lbrynet.blob_exchange.server import BlobServer
+from lbrynet.conf import Config
+from lbrynet.dht.peer import KademliaPeer
+from lbrynet.extras.daemon.storage import SQLiteStorage
+from lbrynet.stream.descriptor import StreamDescriptor
+from lbrynet.stream.managed_stream import ManagedStream
+
+
+class LocalPeerFinder:
+    """
+    Stands in for the DHT node, every search finds the blob server after search_latency seconds
+    """
+
+    def __init__(self, loop: asyncio.BaseEventLoop, peer: KademliaPeer, search_latency: float):
+        self.loop = loop
+        self.peer = peer
+        self.search_latency = search_latency
+
+    def accumulate_peers(self, search_queue: asyncio.Queue, peer_queue: asyncio.Queue):
+        async def _accumulate():
+            while True:
+                await search_queue.get()
+                await asyncio.sleep(self.search_latency)
+                peer_queue.put_nowait([self.peer])
+        return peer_queue, self.loop.create_task(_accumulate())
+
+
+def _write(writer: asyncio.StreamWriter, data: bytes):
+    if not writer.transport.is_closing():
+        writer.write(data)
+
+
+async def _relay(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, latency: float, bandwidth: int):
+    loop = asyncio.get_event_loop()
+    try:
+        while True:
+            data = await reader.read(2 ** 16)
+            if not data:
+                break
+            if bandwidth:
+                await asyncio.sleep(len(data) / bandwidth)
+            loop.call_later(latency, _write, writer, data)
+    except ConnectionError:
+        pass
+    finally:
+        loop.call_later(latency, writer.close)
+
+
+async def start_relay(server_port: int, relay_port: int, latency: float, bandwidth: int) -> asyncio.AbstractServer:
+    async def handle(client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter):
+        server_reader, server_writer = await asyncio.open_connection('127.0.0.1', server_port)
+        await asyncio.gather(
+            _relay(client_reader, server_writer, latency, bandwidth),
+            _relay(server_reader, client_writer, latency, bandwidth)
+        )
+    return await asyncio.start_server(handle, '127.0.0.1', relay_port)
+
+
+async def time_to_first_byte(peer_finder: LocalPeerFinder, sd_hash: str, speculative: bool,
+                             player_delay: float) -> typing.Tuple[float, float]:
+    loop = asyncio.get_event_loop()
+    client_dir = tempfile.mkdtemp()
+    try:
+        config = Config(data_dir=client_dir, download_dir=client_dir, wallet=client_dir, reflector_servers=[],
+                        speculative_head_blob_fetch=speculative)
+        storage = SQLiteStorage(config, os.path.join(client_dir, "lbrynet.sqlite"))
+        await storage.open()
+        blob_manager = BlobManager(loop, client_dir, storage, config)
+        await blob_manager.setup()
+        stream = ManagedStream(loop, config, blob_manager, sd_hash, client_dir)
+        started = loop.time()
+        await stream.start(peer_finder)
+        await asyncio.sleep(player_delay)
+        stream.streaming.set()  # as stream_file does while the player is connected, or the idle stream is stopped
+        await stream.downloader.read_blob(stream.descriptor.blobs[0])
+        elapsed = loop.time() - started
+        time_to_descriptor = stream.downloader.time_to_descriptor
+        await stream.stop()
+        await blob_manager.flush_blob_writes()
+        blob_manager.stop()
+        await storage.close()
+        return elapsed, time_to_descriptor
+    finally:
+        shutil.rmtree(client_dir)
+
+
+def describe(label: str, results: typing.List[typing.Tuple[float, float]]):
+    elapsed = sorted(result[0] for result in results)
+    print(f"{label}: {sum(elapsed) / len(elapsed):.3f}s on average, {elapsed[len(elapsed) // 2]:.3f}s median, "
+          f"{elapsed[0]:.3f}s min, {elapsed[-1]:.3f}s max (descriptor after "
+          f"{sum(result[1] for result in results) / len(results):.3f}s)")
+
+
+async def main(args):
+    loop = asyncio.get_event_loop()
+    server_dir = tempfile.mkdtemp()
+    try:
+        server_config = Config(data_dir=server_dir, download_dir=server_dir, wallet=server_dir, reflector_servers=[])
+        server_storage = SQLiteStorage(server_config, os.path.join(server_dir, "lbrynet.sqlite"))
+        await server_storage.open()
+        server_blob_manager = BlobManager(loop, server_dir, server_storage, server_config)
+        await server_blob_manager.setup()
+        file_path = os.path.join(server_dir, "test_file")
+        with open(file_path, 'wb') as f:
+            for _ in range(args.blobs):
+                f.write(os.urandom(MAX_BLOB_SIZE - 1))
+        descriptor = await StreamDescriptor.create_stream(loop, server_dir, file_path)
+        server = BlobServer(loop, server_blob_manager, 'bQEaw42GXsgCAGio1nxFncJSyRmnztSCjP')
+        server.start_server(args.port, '127.0.0.1')
+        await server.started_listening.wait()
+        relay = await start_relay(args.port, args.port + 1, args.latency, args.bandwidth)
+        peer_finder = LocalPeerFinder(
+            loop, KademliaPeer(loop, '127.0.0.1', b'1' * 48, tcp_port=args.port + 1), args.search_latency
+        )
+
+        print(f"{args.runs} runs of a {args.blobs} blob stream, {args.latency:.3f}s one way latency, "
+              f"{args.bandwidth / 2 ** 20:.1f} MiB/s per connection, peers found after {args.search_latency:.3f}s, "
+              f"first read {args.player_delay:.3f}s after the stream started")
+        started = time.perf_counter()
+        results = {True: [], False: []}
+        for _ in range(args.runs):  # alternate the modes so both see the same conditions
+            for speculative in (False, True):
+                results[speculative].append(await time_to_first_byte(
+                    peer_finder, descriptor.sd_hash, speculative, args.player_delay
+                ))
+        describe("head blob fetched on the first read", results[False])
+        describe("head blob fetched with the descriptor", results[True])
+        print(f"finished in {time.perf_counter() - started:.1f}s")
+
+        relay.close()
+        await relay.wait_closed()
+        server.stop_server()
+        server_blob_manager.stop()
+        await server_storage.close()
+    finally:
+        shutil.rmtree(server_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="measure the time to first byte of a stream from a local blob server")
+    parser.add_argument("--blobs", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="one way latency to the server in seconds")
+    parser.add_argument("--bandwidth", type=int, default=5 * 2 ** 20, help="bytes per second per connection")
+    parser.add_argument("--search-latency", type=float, default=0.5, help="seconds for a peer search to find "
+                                                                          "the server")
+    parser.add_argument("--player-delay", type=float, default=0.5, help="seconds between starting the stream and "
+                                                                        "the first read")
+    parser.add_argument("--port", type=int, default=33533, help="port for the blob server, the relay uses the next one")
+    asyncio.run(main(parser.parse_args()))
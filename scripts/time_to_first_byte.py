@@ -86,7 +86,7 @@ async def main(uris=None, cmd_args=None):
     except (ClientConnectorError, ConnectionError):
         print("Could not connect to daemon")
         return 1
-    print(f"Checking {len(uris)} uris from the front page")
+    print(f"Checking {len(uris)} uris")
     print("**********************************************")
 
     resolvable = []
@@ -100,7 +100,7 @@ async def main(uris=None, cmd_args=None):
         else:
             print(f"failed to resolve {name}: {resolved[name]['error']}")
     await asyncio.gather(*(__resolve(name) for name in uris))
-    print(f"attempting to download {len(resolvable)}/{len(uris)} frontpage streams")
+    print(f"attempting to download {len(resolvable)}/{len(uris)} streams")
 
     first_byte_times = []
     download_speeds = []
@@ -140,7 +140,7 @@ async def main(uris=None, cmd_args=None):
         await asyncio.sleep(0.1)
 
     print("**********************************************")
-    result = f"Started {len(first_byte_times)} of {len(resolvable)} attempted front page streams\n" \
+    result = f"Started {len(first_byte_times)} of {len(resolvable)} attempted streams\n" \
              f"Worst first byte time: {round(max(first_byte_times), 2)}\n" \
              f"Best first byte time: {round(min(first_byte_times), 2)}\n" \
              f"95% confidence time-to-first-byte: {confidence(first_byte_times, 1.984)}s\n" \
@@ -174,4 +174,7 @@ if __name__ == "__main__":
     parser.add_argument("--stall_download_timeout", default=10, type=int)
     parser.add_argument("--delete_after_download", action='store_true')
     parser.add_argument("--head_blob_only", action='store_true')
-    asyncio.run(main(cmd_args=parser.parse_args()))
+    parser.add_argument("--uris", nargs='*', help="test these uris (e.g. from a local test network) "
+                                                   "instead of the front page")
+    args = parser.parse_args()
+    asyncio.run(main(uris=args.uris, cmd_args=args))
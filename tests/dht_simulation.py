@@ -0,0 +1,219 @@
+"""
+An in process simulation of a DHT network, running many Node instances in one event loop
+
+The nodes talk over in memory datagram transports with configurable latency, packet loss and churn, and the event
+loop runs on a simulated clock that skips ahead to the next scheduled callback whenever it would otherwise wait, so
+a run takes as long as the CPU work it does rather than the simulated network delays.
+"""
+import asyncio
+import random
+import selectors
+import typing
+import binascii
+from lbrynet.dht import constants
+from lbrynet.dht.node import Node
+from lbrynet.dht.peer import PeerManager
+from lbrynet.dht.protocol.distance import closest_peers
+from lbrynet.dht.protocol.iterative_find import IterativeNodeFinder, FindResponse
+if typing.TYPE_CHECKING:
+    from lbrynet.dht.peer import KademliaPeer
+
+
+class _SimulatedClockSelector(selectors.DefaultSelector):
+    def __init__(self, loop: 'SimulatedLoop'):
+        super().__init__()
+        self._loop = loop
+
+    def select(self, timeout=None):
+        # instead of waiting for the next scheduled callback, move the clock forward to it
+        if timeout:
+            self._loop.advance(timeout)
+        return super().select(0)
+
+
+class SimulatedLoop(asyncio.SelectorEventLoop):
+    """
+    Event loop with a simulated clock, for running code that only waits on timers and in memory transports
+    """
+
+    def __init__(self):
+        self._simulated_time = 0.0
+        super().__init__(_SimulatedClockSelector(self))
+
+    def time(self) -> float:
+        return self._simulated_time
+
+    def advance(self, seconds: float):
+        self._simulated_time += seconds
+
+
+class SimulatedTransport(asyncio.DatagramTransport):
+    def __init__(self, network: 'SimulatedNetwork', address: typing.Tuple[str, int]):
+        super().__init__()
+        self.network = network
+        self.address = address
+        self._closing = False
+
+    def sendto(self, data, addr=None):
+        self.network.send(data, self.address, addr)
+
+    def is_closing(self) -> bool:
+        return self._closing
+
+    def close(self):
+        self._closing = True
+
+
+class HopCountingNodeFinder(IterativeNodeFinder):
+    """
+    IterativeNodeFinder that records how many hops away from the shortlist each peer was learned about
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.hops: typing.Dict['KademliaPeer', int] = {}
+        super().__init__(*args, **kwargs)
+
+    async def _handle_probe_result(self, peer: 'KademliaPeer', response: FindResponse):
+        hop = self.hops.get(peer, 0) + 1
+        for node_id, address, udp_port in response.get_close_triples():
+            self.hops.setdefault(self.peer_manager.get_kademlia_peer(node_id, address, udp_port), hop)
+        return await super()._handle_probe_result(peer, response)
+
+
+class LookupResult(typing.NamedTuple):
+    closest_found: int  # how many of the k closest online nodes were found
+    hops: int  # hops from the shortlist to the closest peer found
+    latency: float
+    sent_requests: int
+
+
+class SimulatedNetwork:
+    def __init__(self, loop: SimulatedLoop, latency: float = 0.05, loss: float = 0.0,
+                 rpc_timeout: float = constants.rpc_timeout, seed: typing.Optional[int] = None):
+        """
+        :param latency: mean one way latency in seconds, each datagram takes 0.5 to 1.5 times this long
+        :param loss: the fraction of datagrams dropped
+        """
+        self.loop = loop
+        self.latency = latency
+        self.loss = loss
+        self.rpc_timeout = rpc_timeout
+        self.random = random.Random(seed)
+        self.nodes: typing.Dict[typing.Tuple[str, int], Node] = {}
+        self.offline: typing.Set[typing.Tuple[str, int]] = set()
+        self.delivered = 0
+        self.dropped = 0
+        self.requests = 0
+        self._churn_task: typing.Optional[asyncio.Task] = None
+
+    def send(self, data: bytes, from_address: typing.Tuple[str, int], to_address: typing.Tuple[str, int]):
+        node = self.nodes.get(to_address)
+        if not node or from_address in self.offline or to_address in self.offline or \
+                (self.loss and self.random.random() < self.loss):
+            self.dropped += 1
+            return
+        self.delivered += 1
+        if data.startswith(b'di0ei0e'):  # the bencoded packet type of a request
+            self.requests += 1
+        self.loop.call_later(
+            self.random.uniform(self.latency / 2, self.latency * 1.5), self._deliver, node, data, from_address
+        )
+
+    def _deliver(self, node: Node, data: bytes, from_address: typing.Tuple[str, int]):
+        if node.listening_port and not node.listening_port.is_closing() \
+                and node.protocol.transport.address not in self.offline:
+            node.protocol.datagram_received(data, from_address)
+
+    def add_node(self, node_id: typing.Optional[bytes] = None) -> Node:
+        i = len(self.nodes) + 1
+        address = (f'10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}', 4444)
+        node = Node(self.loop, PeerManager(self.loop), node_id or constants.generate_id(self.random.getrandbits(64)),
+                    address[1], address[1], 3333, address[0], rpc_timeout=self.rpc_timeout)
+        # the same as Node.start_listening, with a simulated transport instead of a UDP socket
+        node.listening_port = SimulatedTransport(self, address)
+        node.protocol.connection_made(node.listening_port)
+        node.protocol.start()
+        node.protocol.ping_queue.start()
+        self.nodes[address] = node
+        return node
+
+    def add_nodes(self, count: int) -> typing.List[Node]:
+        return [self.add_node() for _ in range(count)]
+
+    def bootstrap(self, random_peers: int = 100):
+        """
+        Fill the routing tables of the nodes as if they had been running for a while, without the traffic of joining
+
+        Each node is offered a random sample of the other nodes and the nodes next to it in the keyspace, and adds
+        them the way KademliaProtocol._add_peer does
+        """
+        nodes = sorted(self.nodes.values(), key=lambda n: n.protocol.node_id)
+        for position, node in enumerate(nodes):
+            offered = self.random.sample(nodes, min(random_peers, len(nodes)))
+            offered.extend(nodes[max(0, position - constants.k * 2):position + constants.k * 2 + 1])
+            routing_table = node.protocol.routing_table
+            for other in offered:
+                if other is node:
+                    continue
+                peer = node.protocol.peer_manager.get_kademlia_peer(
+                    other.protocol.node_id, other.protocol.external_ip, other.protocol.udp_port
+                )
+                bucket_index = routing_table.kbucket_index(peer.node_id)
+                while not routing_table.buckets[bucket_index].add_peer(peer):
+                    if not routing_table.should_split(bucket_index, peer.node_id):
+                        break
+                    routing_table.split_bucket(bucket_index)
+                    bucket_index = routing_table.kbucket_index(peer.node_id)
+            node.joined.set()
+
+    def online_nodes(self) -> typing.List[Node]:
+        return [node for address, node in self.nodes.items() if address not in self.offline]
+
+    def churn(self, fraction: float):
+        """
+        Take `fraction` of the online nodes offline and bring back as many of the nodes that were offline
+        """
+        leaving = self.random.sample(self.online_nodes(), int(len(self.nodes) * fraction))
+        returning = self.random.sample(list(self.offline), min(len(self.offline), len(leaving)))
+        self.offline.difference_update(returning)
+        self.offline.update(node.protocol.transport.address for node in leaving)
+
+    def start_churn(self, fraction: float, interval: float = 60.0):
+        async def churn():
+            while True:
+                await asyncio.sleep(interval, loop=self.loop)
+                self.churn(fraction)
+        self._churn_task = self.loop.create_task(churn())
+
+    def closest_online_nodes(self, key: bytes, count: int = constants.k) -> typing.List[Node]:
+        key_int = int.from_bytes(key, 'big')
+        online = self.online_nodes()
+        return sorted(online, key=lambda n: int.from_bytes(n.protocol.node_id, 'big') ^ key_int)[:count]
+
+    async def lookup(self, node: Node, key: bytes) -> LookupResult:
+        """
+        Run the same search as Node.peer_search, measuring it
+        """
+        start, sent_requests = self.loop.time(), node.protocol.sent_requests
+        finder = HopCountingNodeFinder(self.loop, node.protocol.peer_manager, node.protocol.routing_table,
+                                       node.protocol, key, 20, constants.k * 2)
+        peers = []
+        async for iteration_peers in finder:
+            peers.extend(iteration_peers)
+        found = closest_peers(key, peers, constants.k)
+        expected = {n.protocol.node_id for n in self.closest_online_nodes(key)}
+        return LookupResult(
+            len(expected.intersection(peer.node_id for peer in found)), finder.hops.get(found[0], 0) if found else 0,
+            self.loop.time() - start, node.protocol.sent_requests - sent_requests
+        )
+
+    async def announce(self, node: Node, count: int) -> typing.Dict[str, typing.List[bytes]]:
+        blob_hashes = [binascii.hexlify(constants.generate_id(self.random.getrandbits(64))).decode()
+                       for _ in range(count)]
+        return await node.announce_blobs(blob_hashes)
+
+    def stop(self):
+        if self._churn_task:
+            self._churn_task.cancel()
+        for node in self.nodes.values():
+            node.stop()
@@ -16,23 +16,23 @@ class FileCommands(CommandTestCase):
         await self.stream_create('foo', '0.01')
         await self.stream_create('foo2', '0.01')
 
-        file1, file2 = self.sout(self.daemon.jsonrpc_file_list('claim_name'))
+        file1, file2 = self.sout(await self.daemon.jsonrpc_file_list('claim_name'))
         self.assertEqual(file1['claim_name'], 'foo')
         self.assertEqual(file2['claim_name'], 'foo2')
 
         await self.daemon.jsonrpc_file_delete(claim_name='foo')
-        self.assertEqual(len(self.daemon.jsonrpc_file_list()), 1)
+        self.assertEqual(len(await self.daemon.jsonrpc_file_list()), 1)
         await self.daemon.jsonrpc_file_delete(claim_name='foo2')
-        self.assertEqual(len(self.daemon.jsonrpc_file_list()), 0)
+        self.assertEqual(len(await self.daemon.jsonrpc_file_list()), 0)
 
         await self.daemon.jsonrpc_get('lbry://foo')
-        self.assertEqual(len(self.daemon.jsonrpc_file_list()), 1)
+        self.assertEqual(len(await self.daemon.jsonrpc_file_list()), 1)
 
     async def test_announces(self):
         # announces on publish
         self.assertEqual(await self.daemon.storage.get_blobs_to_announce(), [])
         await self.stream_create('foo', '0.01')
-        stream = self.daemon.jsonrpc_file_list()[0]
+        stream = (await self.daemon.jsonrpc_file_list())[0]
         self.assertSetEqual(
             set(await self.daemon.storage.get_blobs_to_announce()),
             {stream.sd_hash, stream.descriptor.blobs[0].blob_hash}
@@ -48,14 +48,14 @@ class FileCommands(CommandTestCase):
 
     async def test_file_list_fields(self):
         await self.stream_create('foo', '0.01')
-        file_list = self.sout(self.daemon.jsonrpc_file_list())
+        file_list = self.sout(await self.daemon.jsonrpc_file_list())
         self.assertEqual(
             file_list[0]['timestamp'],
             None
         )
         self.assertEqual(file_list[0]['confirmations'], -1)
         await self.daemon.jsonrpc_resolve('foo')
-        file_list = self.sout(self.daemon.jsonrpc_file_list())
+        file_list = self.sout(await self.daemon.jsonrpc_file_list())
         self.assertEqual(
             file_list[0]['timestamp'],
             self.ledger.headers[file_list[0]['height']]['timestamp']
@@ -85,7 +85,7 @@ class FileCommands(CommandTestCase):
         claim.stream.description = "fix typos, fix the world"
         await self.blockchain_update_name(txid, hexlify(claim.to_bytes()).decode(), '0.01')
         await self.daemon.jsonrpc_resolve('lbry://bar')
-        file_list = self.daemon.jsonrpc_file_list()
+        file_list = await self.daemon.jsonrpc_file_list()
         self.assertEqual(file_list[0].stream_claim_info.claim.stream.description, claim.stream.description)
 
     async def test_download_different_timeouts(self):
@@ -106,12 +106,12 @@ class FileCommands(CommandTestCase):
         self.assertEqual('Failed to download sd blob %s within timeout' % sd_hash, resp['error'])
 
     async def wait_files_to_complete(self):
-        while self.sout(self.daemon.jsonrpc_file_list(status='running')):
+        while self.sout(await self.daemon.jsonrpc_file_list(status='running')):
             await asyncio.sleep(0.01)
 
     async def test_filename_conflicts_management_on_resume_download(self):
         await self.stream_create('foo', '0.01', data=bytes([0] * (1 << 23)))
-        file_info = self.sout(self.daemon.jsonrpc_file_list())[0]
+        file_info = self.sout(await self.daemon.jsonrpc_file_list())[0]
         original_path = os.path.join(self.daemon.conf.download_dir, file_info['file_name'])
         await self.daemon.jsonrpc_file_delete(claim_name='foo')
         await self.daemon.jsonrpc_get('lbry://foo')
@@ -122,7 +122,7 @@ class FileCommands(CommandTestCase):
         await asyncio.wait_for(self.wait_files_to_complete(), timeout=5)  # if this hangs, file didnt get set completed
         # check that internal state got through up to the file list API
         stream = self.daemon.stream_manager.get_stream_by_stream_hash(file_info['stream_hash'])
-        file_info = self.sout(self.daemon.jsonrpc_file_list()[0])
+        file_info = self.sout((await self.daemon.jsonrpc_file_list())[0])
         self.assertEqual(stream.file_name, file_info['file_name'])
         # checks if what the API shows is what he have at the very internal level.
         self.assertEqual(stream.full_path, file_info['download_path'])
@@ -130,7 +130,7 @@ class FileCommands(CommandTestCase):
     async def test_incomplete_downloads_erases_output_file_on_stop(self):
         tx = await self.stream_create('foo', '0.01', data=b'deadbeef' * 1000000)
         sd_hash = tx['outputs'][0]['value']['source']['sd_hash']
-        file_info = self.sout(self.daemon.jsonrpc_file_list())[0]
+        file_info = self.sout(await self.daemon.jsonrpc_file_list())[0]
         await self.daemon.jsonrpc_file_delete(claim_name='foo')
         blobs = await self.server_storage.get_blobs_for_stream(
             await self.server_storage.get_stream_hash_for_sd_hash(sd_hash)
@@ -170,8 +170,8 @@ class FileCommands(CommandTestCase):
         # start the download
         resp = await self.out(self.daemon.jsonrpc_get('lbry://foo', timeout=2))
         self.assertNotIn('error', resp)
-        self.assertEqual(len(self.daemon.jsonrpc_file_list()), 1)
-        self.assertEqual('running', self.sout(self.daemon.jsonrpc_file_list())[0]['status'])
+        self.assertEqual(len(await self.daemon.jsonrpc_file_list()), 1)
+        self.assertEqual('running', self.sout(await self.daemon.jsonrpc_file_list())[0]['status'])
         await self.daemon.jsonrpc_file_set_status('stop', claim_name='foo')
 
         # recover blobs
@@ -183,7 +183,7 @@ class FileCommands(CommandTestCase):
 
         await self.daemon.jsonrpc_file_set_status('start', claim_name='foo')
         await asyncio.wait_for(self.wait_files_to_complete(), timeout=5)
-        file_info = self.sout(self.daemon.jsonrpc_file_list())[0]
+        file_info = self.sout(await self.daemon.jsonrpc_file_list())[0]
         self.assertEqual(file_info['blobs_completed'], file_info['blobs_in_stream'])
         self.assertEqual('finished', file_info['status'])
 
@@ -218,7 +218,7 @@ class FileCommands(CommandTestCase):
         await self.daemon.jsonrpc_file_delete(claim_name='expensive')
         response = await self.out(self.daemon.jsonrpc_get('lbry://expensive'))
         self.assertEqual(response['error'], 'fee of 11.00000 exceeds max available balance')
-        self.assertEqual(len(self.daemon.jsonrpc_file_list()), 0)
+        self.assertEqual(len(await self.daemon.jsonrpc_file_list()), 0)
 
         # FAIL: beyond maximum key fee
         await self.stream_create(
@@ -227,7 +227,7 @@ class FileCommands(CommandTestCase):
         )
         await self.daemon.jsonrpc_file_delete(claim_name='maxkey')
         response = await self.out(self.daemon.jsonrpc_get('lbry://maxkey'))
-        self.assertEqual(len(self.daemon.jsonrpc_file_list()), 0)
+        self.assertEqual(len(await self.daemon.jsonrpc_file_list()), 0)
         self.assertEqual(response['error'], 'fee of 111.00000 exceeds max configured to allow of 50.00000')
 
         # PASS: purchase is successful
@@ -241,7 +241,7 @@ class FileCommands(CommandTestCase):
         raw_content_fee = response.content_fee.raw
         await self.ledger.wait(response.content_fee)
         await self.assertBalance(self.account, '8.925555')
-        self.assertEqual(len(self.daemon.jsonrpc_file_list()), 1)
+        self.assertEqual(len(await self.daemon.jsonrpc_file_list()), 1)
 
         await asyncio.wait_for(self.wait_files_to_complete(), timeout=1)
 
@@ -257,5 +257,5 @@ class FileCommands(CommandTestCase):
 
         self.daemon.stream_manager.stop()
         await self.daemon.stream_manager.start()
-        self.assertEqual(len(self.daemon.jsonrpc_file_list()), 1)
-        self.assertEqual(self.daemon.jsonrpc_file_list()[0].content_fee.raw, raw_content_fee)
+        self.assertEqual(len(await self.daemon.jsonrpc_file_list()), 1)
+        self.assertEqual((await self.daemon.jsonrpc_file_list())[0].content_fee.raw, raw_content_fee)
@@ -31,7 +31,7 @@ class RangeRequests(CommandTestCase):
         await self.stream_create('foo', '0.01', data=self.data, file_size=file_size)
         if save_blobs:
             self.assertTrue(len(os.listdir(self.daemon.blob_manager.blob_dir)) > 1)
-        await self.daemon.jsonrpc_file_list()[0].fully_reflected.wait()
+        await (await self.daemon.jsonrpc_file_list())[0].fully_reflected.wait()
         await self.daemon.jsonrpc_file_delete(delete_from_download_dir=True, claim_name='foo')
         self.assertEqual(0, len(os.listdir(self.daemon.blob_manager.blob_dir)))
         # await self._restart_stream_manager()
@@ -39,7 +39,7 @@ class RangeRequests(CommandTestCase):
         site = aiohttp.web.TCPSite(self.daemon.streaming_runner, self.daemon.conf.streaming_host,
                                    self.daemon.conf.streaming_port)
         await site.start()
-        self.assertListEqual(self.daemon.jsonrpc_file_list(), [])
+        self.assertListEqual(await self.daemon.jsonrpc_file_list(), [])
 
     async def _test_range_requests(self):
         name = 'foo'
@@ -126,7 +126,7 @@ class RangeRequests(CommandTestCase):
         await self._setup_stream(self.data)
 
         await self._test_range_requests()
-        stream = self.daemon.jsonrpc_file_list()[0]
+        stream = (await self.daemon.jsonrpc_file_list())[0]
         self.assertTrue(os.path.isfile(self.daemon.blob_manager.get_blob(stream.sd_hash).file_path))
         self.assertIsNone(stream.download_directory)
         self.assertIsNone(stream.full_path)
@@ -135,7 +135,7 @@ class RangeRequests(CommandTestCase):
         # test that repeated range requests do not create duplicate files
         for _ in range(3):
             await self._test_range_requests()
-            stream = self.daemon.jsonrpc_file_list()[0]
+            stream = (await self.daemon.jsonrpc_file_list())[0]
             self.assertTrue(os.path.isfile(self.daemon.blob_manager.get_blob(stream.sd_hash).file_path))
             self.assertIsNone(stream.download_directory)
             self.assertIsNone(stream.full_path)
@@ -151,13 +151,13 @@ class RangeRequests(CommandTestCase):
         self.assertEqual(
             len(files_in_download_dir), len(current_files_in_download_dir)
         )
-        stream = self.daemon.jsonrpc_file_list()[0]
+        stream = (await self.daemon.jsonrpc_file_list())[0]
         self.assertTrue(os.path.isfile(self.daemon.blob_manager.get_blob(stream.sd_hash).file_path))
         self.assertIsNone(stream.download_directory)
         self.assertIsNone(stream.full_path)
 
         await self._test_range_requests()
-        stream = self.daemon.jsonrpc_file_list()[0]
+        stream = (await self.daemon.jsonrpc_file_list())[0]
         self.assertTrue(os.path.isfile(self.daemon.blob_manager.get_blob(stream.sd_hash).file_path))
         self.assertIsNone(stream.download_directory)
         self.assertIsNone(stream.full_path)
@@ -170,7 +170,7 @@ class RangeRequests(CommandTestCase):
         self.data = get_random_bytes((MAX_BLOB_SIZE - 1) * 4)
         await self._setup_stream(self.data, save_blobs=False)
         await self._test_range_requests()
-        stream = self.daemon.jsonrpc_file_list()[0]
+        stream = (await self.daemon.jsonrpc_file_list())[0]
         self.assertIsNone(stream.download_directory)
         self.assertIsNone(stream.full_path)
         files_in_download_dir = list(os.scandir(os.path.dirname(self.daemon.conf.data_dir)))
@@ -178,7 +178,7 @@ class RangeRequests(CommandTestCase):
         # test that repeated range requests do not create duplicate files
         for _ in range(3):
             await self._test_range_requests()
-            stream = self.daemon.jsonrpc_file_list()[0]
+            stream = (await self.daemon.jsonrpc_file_list())[0]
             self.assertIsNone(stream.download_directory)
             self.assertIsNone(stream.full_path)
             current_files_in_download_dir = list(os.scandir(os.path.dirname(self.daemon.conf.data_dir)))
@@ -193,12 +193,12 @@ class RangeRequests(CommandTestCase):
         self.assertEqual(
             len(files_in_download_dir), len(current_files_in_download_dir)
         )
-        stream = self.daemon.jsonrpc_file_list()[0]
+        stream = (await self.daemon.jsonrpc_file_list())[0]
         self.assertIsNone(stream.download_directory)
         self.assertIsNone(stream.full_path)
 
         await self._test_range_requests()
-        stream = self.daemon.jsonrpc_file_list()[0]
+        stream = (await self.daemon.jsonrpc_file_list())[0]
         self.assertIsNone(stream.download_directory)
         self.assertIsNone(stream.full_path)
         current_files_in_download_dir = list(os.scandir(os.path.dirname(self.daemon.conf.data_dir)))
@@ -211,7 +211,7 @@ class RangeRequests(CommandTestCase):
         await self._setup_stream(self.data, save_files=True)
 
         await self._test_range_requests()
-        streams = self.daemon.jsonrpc_file_list()
+        streams = await self.daemon.jsonrpc_file_list()
         self.assertEqual(1, len(streams))
         stream = streams[0]
         self.assertTrue(os.path.isfile(self.daemon.blob_manager.get_blob(stream.sd_hash).file_path))
@@ -222,7 +222,7 @@ class RangeRequests(CommandTestCase):
 
         for _ in range(3):
             await self._test_range_requests()
-            streams = self.daemon.jsonrpc_file_list()
+            streams = await self.daemon.jsonrpc_file_list()
             self.assertEqual(1, len(streams))
             stream = streams[0]
             self.assertTrue(os.path.isfile(self.daemon.blob_manager.get_blob(stream.sd_hash).file_path))
@@ -239,7 +239,7 @@ class RangeRequests(CommandTestCase):
         self.assertEqual(
             len(files_in_download_dir), len(current_files_in_download_dir)
         )
-        streams = self.daemon.jsonrpc_file_list()
+        streams = await self.daemon.jsonrpc_file_list()
         self.assertEqual(1, len(streams))
         stream = streams[0]
         self.assertTrue(os.path.isfile(self.daemon.blob_manager.get_blob(stream.sd_hash).file_path))
@@ -247,7 +247,7 @@ class RangeRequests(CommandTestCase):
         self.assertTrue(os.path.isfile(stream.full_path))
 
         await self._test_range_requests()
-        streams = self.daemon.jsonrpc_file_list()
+        streams = await self.daemon.jsonrpc_file_list()
         self.assertEqual(1, len(streams))
         stream = streams[0]
         self.assertTrue(os.path.isfile(self.daemon.blob_manager.get_blob(stream.sd_hash).file_path))
@@ -266,7 +266,7 @@ class RangeRequests(CommandTestCase):
         self.daemon.conf.save_blobs = False
 
         await self._test_range_requests()
-        stream = self.daemon.jsonrpc_file_list()[0]
+        stream = (await self.daemon.jsonrpc_file_list())[0]
         self.assertTrue(os.path.isdir(stream.download_directory))
         self.assertTrue(os.path.isfile(stream.full_path))
         full_path = stream.full_path
@@ -274,7 +274,7 @@ class RangeRequests(CommandTestCase):
 
         for _ in range(3):
             await self._test_range_requests()
-            stream = self.daemon.jsonrpc_file_list()[0]
+            stream = (await self.daemon.jsonrpc_file_list())[0]
             self.assertTrue(os.path.isdir(stream.download_directory))
             self.assertTrue(os.path.isfile(stream.full_path))
             current_files_in_download_dir = list(os.scandir(os.path.dirname(full_path)))
@@ -287,14 +287,14 @@ class RangeRequests(CommandTestCase):
         self.assertEqual(
             len(files_in_download_dir), len(current_files_in_download_dir)
         )
-        streams = self.daemon.jsonrpc_file_list()
+        streams = await self.daemon.jsonrpc_file_list()
         self.assertEqual(1, len(streams))
         stream = streams[0]
         self.assertTrue(os.path.isdir(stream.download_directory))
         self.assertTrue(os.path.isfile(stream.full_path))
 
         await self._test_range_requests()
-        streams = self.daemon.jsonrpc_file_list()
+        streams = await self.daemon.jsonrpc_file_list()
         self.assertEqual(1, len(streams))
         stream = streams[0]
         self.assertTrue(os.path.isdir(stream.download_directory))
@@ -310,31 +310,31 @@ class RangeRequests(CommandTestCase):
     async def test_switch_save_blobs_while_running(self):
         await self.test_streaming_only_without_blobs()
         self.daemon.conf.save_blobs = True
-        blobs_in_stream = self.daemon.jsonrpc_file_list()[0].blobs_in_stream
-        sd_hash = self.daemon.jsonrpc_file_list()[0].sd_hash
+        blobs_in_stream = (await self.daemon.jsonrpc_file_list())[0].blobs_in_stream
+        sd_hash = (await self.daemon.jsonrpc_file_list())[0].sd_hash
         start_file_count = len(os.listdir(self.daemon.blob_manager.blob_dir))
         await self._test_range_requests()
         self.assertEqual(start_file_count + blobs_in_stream, len(os.listdir(self.daemon.blob_manager.blob_dir)))
-        self.assertEqual(0, self.daemon.jsonrpc_file_list()[0].blobs_remaining)
+        self.assertEqual(0, (await self.daemon.jsonrpc_file_list())[0].blobs_remaining)
 
         # switch back
         self.daemon.conf.save_blobs = False
         await self._test_range_requests()
         self.assertEqual(start_file_count + blobs_in_stream, len(os.listdir(self.daemon.blob_manager.blob_dir)))
-        self.assertEqual(0, self.daemon.jsonrpc_file_list()[0].blobs_remaining)
+        self.assertEqual(0, (await self.daemon.jsonrpc_file_list())[0].blobs_remaining)
         await self.daemon.jsonrpc_file_delete(delete_from_download_dir=True, sd_hash=sd_hash)
         self.assertEqual(start_file_count, len(os.listdir(self.daemon.blob_manager.blob_dir)))
         await self._test_range_requests()
         self.assertEqual(start_file_count, len(os.listdir(self.daemon.blob_manager.blob_dir)))
-        self.assertEqual(blobs_in_stream, self.daemon.jsonrpc_file_list()[0].blobs_remaining)
+        self.assertEqual(blobs_in_stream, (await self.daemon.jsonrpc_file_list())[0].blobs_remaining)
 
     async def test_file_save_streaming_only_save_blobs(self):
         await self.test_streaming_only_with_blobs()
-        stream = self.daemon.jsonrpc_file_list()[0]
+        stream = (await self.daemon.jsonrpc_file_list())[0]
         self.assertIsNone(stream.full_path)
         self.server.stop_server()
         await self.daemon.jsonrpc_file_save('test', self.daemon.conf.data_dir)
-        stream = self.daemon.jsonrpc_file_list()[0]
+        stream = (await self.daemon.jsonrpc_file_list())[0]
         self.assertIsNotNone(stream.full_path)
         await stream.finished_writing.wait()
         with open(stream.full_path, 'rb') as f:
@@ -343,18 +343,18 @@ class RangeRequests(CommandTestCase):
 
     async def test_file_save_stop_before_finished_streaming_only(self, wait_for_start_writing=False):
         await self.test_streaming_only_with_blobs()
-        stream = self.daemon.jsonrpc_file_list()[0]
+        stream = (await self.daemon.jsonrpc_file_list())[0]
         self.assertIsNone(stream.full_path)
         self.server.stop_server()
         await self.daemon.jsonrpc_file_save('test', self.daemon.conf.data_dir)
-        stream = self.daemon.jsonrpc_file_list()[0]
+        stream = (await self.daemon.jsonrpc_file_list())[0]
         path = stream.full_path
         self.assertIsNotNone(path)
         if wait_for_start_writing:
             await stream.started_writing.wait()
             self.assertTrue(os.path.isfile(path))
         await self._restart_stream_manager()
-        stream = self.daemon.jsonrpc_file_list()[0]
+        stream = (await self.daemon.jsonrpc_file_list())[0]
         self.assertIsNotNone(stream.full_path)
         self.assertFalse(os.path.isfile(path))
         if wait_for_start_writing:
@@ -366,10 +366,10 @@ class RangeRequests(CommandTestCase):
 
     async def test_file_save_streaming_only_dont_save_blobs(self):
         await self.test_streaming_only_without_blobs()
-        stream = self.daemon.jsonrpc_file_list()[0]
+        stream = (await self.daemon.jsonrpc_file_list())[0]
         self.assertIsNone(stream.full_path)
         await self.daemon.jsonrpc_file_save('test', self.daemon.conf.data_dir)
-        stream = self.daemon.jsonrpc_file_list()[0]
+        stream = (await self.daemon.jsonrpc_file_list())[0]
         await stream.finished_writing.wait()
         with open(stream.full_path, 'rb') as f:
             self.assertEqual(self.data, f.read())
@@ -36,7 +36,7 @@ class TestBlob(AsyncioTestCase):
         writer.write(self.blob_bytes)
         await blob.verified.wait()
         self.assertTrue(blob.get_is_verified())
-        await asyncio.sleep(0, loop=self.loop)  # wait for the db save task
+        await self.blob_manager.flush_blob_writes()  # write the batched completion to the db
         return blob
 
     async def _test_close_writers_on_finished(self, blob_class=AbstractBlob, blob_directory=None):
@@ -113,6 +113,29 @@ class TestBlob(AsyncioTestCase):
             with blob.reader_context() as reader:
                 self.assertEqual(self.blob_bytes, reader.read())
 
+    async def test_stream_blob_file_to_disk(self):
+        blob = self._get_blob(BlobFile, self.tmp_dir)
+        writer = blob.get_blob_writer(stream_to_disk=True)
+        self.assertIsNotNone(writer.file_path)
+        writer.write(self.blob_bytes[:1024])
+        self.assertTrue(os.path.isfile(writer.file_path))
+        self.assertFalse(os.path.isfile(blob.file_path))
+        writer.write(self.blob_bytes[1024:])
+        await blob.verified.wait()
+        self.assertFalse(os.path.isfile(writer.file_path))
+        with blob.reader_context() as reader:
+            self.assertEqual(self.blob_bytes, reader.read())
+
+    async def test_stream_invalid_blob_file_to_disk(self):
+        blob = self._get_blob(BlobFile, self.tmp_dir)
+        writer = blob.get_blob_writer(stream_to_disk=True)
+        writer.write(self.blob_bytes[:-4] + b'fake')
+        with self.assertRaises(InvalidBlobHashError):
+            await writer.finished
+        self.assertFalse(os.path.isfile(writer.file_path))
+        self.assertFalse(os.path.isfile(blob.file_path))
+        self.assertFalse(blob.get_is_verified())
+
     async def test_create_blob_buffer(self):
         blob = await self._test_create_blob(BlobBuffer)
         self.assertIsInstance(blob, BlobBuffer)
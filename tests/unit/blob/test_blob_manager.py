@@ -1,6 +1,7 @@
 import asyncio
 import tempfile
 import shutil
+import sqlite3
 import os
 from torba.testcase import AsyncioTestCase
 from lbrynet.conf import Config
@@ -55,3 +56,77 @@ class TestBlobManager(AsyncioTestCase):
                 await self.storage.run_and_return_one_or_none('select status from blob where blob_hash=?', blob_hash)
             )
         )
+
+    async def test_completion_counter(self):
+        await self.setup_blob_manager(save_blobs=True)
+        blob_hash = "7f5ab2def99f0ddd008da71db3a3772135f4002b19b7605840ed1034c8955431bd7079549e65e6b2a3b9c17c773073ed"
+        blob_bytes = b'1' * ((2 * 2 ** 20) - 1)
+        other_hash = "1" * 96
+        await self.blob_manager.setup()
+        counter = self.blob_manager.get_completion_counter([blob_hash, other_hash])
+        self.assertEqual(0, len(counter))
+        self.assertEqual(2, counter.remaining)
+
+        with open(os.path.join(self.blob_manager.blob_dir, blob_hash), 'wb') as f:
+            f.write(blob_bytes)
+        await self.blob_manager.blob_completed(self.blob_manager.get_blob(blob_hash, len(blob_bytes)))
+        self.assertEqual(1, len(counter))
+        self.assertEqual(1, counter.remaining)
+
+        self.blob_manager.delete_blob(blob_hash)
+        self.assertEqual(0, len(counter))
+        self.assertEqual(2, counter.remaining)
+
+        # the blobs are no longer tracked once no counter refers to them
+        other_counter = self.blob_manager.get_completion_counter([other_hash])
+        del counter
+        self.assertSetEqual({other_hash}, set(self.blob_manager._completion_counters))
+        del other_counter
+        self.assertDictEqual({}, self.blob_manager._completion_counters)
+
+    async def test_batched_blob_completion_writes(self):
+        await self.setup_blob_manager(save_blobs=True)
+        await self.blob_manager.setup()
+        blob_bytes = b'1' * ((2 * 2 ** 20) - 1)
+        blob_hashes = [str(i) * 96 for i in range(3)]
+        for blob_hash in blob_hashes:
+            with open(os.path.join(self.blob_manager.blob_dir, blob_hash), 'wb') as f:
+                f.write(blob_bytes)
+
+        written = [self.blob_manager.blob_completed(self.blob_manager.get_blob(blob_hash, len(blob_bytes)))
+                   for blob_hash in blob_hashes]
+        self.assertEqual(1, len(set(written)))
+        self.assertSetEqual(set(blob_hashes), self.blob_manager.completed_blob_hashes)
+        self.assertEqual(0, await self.storage.run_and_return_one_or_none("select count(*) from blob"))
+
+        # deleting a blob before its completion is written drops it from the batch
+        self.blob_manager.delete_blob(blob_hashes[2])
+        await self.blob_manager.flush_blob_writes()
+        self.assertTrue(written[0].done())
+        self.assertListEqual(
+            sorted(blob_hashes[:2]),
+            sorted(await self.storage.run_and_return_list("select blob_hash from blob where status='finished'"))
+        )
+
+        # a full batch is written without waiting for the interval
+        self.blob_manager.BLOB_WRITE_BATCH_SIZE = 1
+        await asyncio.wait_for(
+            self.blob_manager.blob_completed(self.blob_manager.get_blob(blob_hashes[0], len(blob_bytes))), 0.1
+        )
+
+    async def test_failed_blob_completion_write(self):
+        await self.setup_blob_manager(save_blobs=True)
+        await self.blob_manager.setup()
+        blob_hash = "1" * 96
+        with open(os.path.join(self.blob_manager.blob_dir, blob_hash), 'wb') as f:
+            f.write(b'1' * 100)
+
+        async def add_completed_blobs(finished, unfinished):
+            raise sqlite3.OperationalError("database is locked")
+
+        self.storage.add_completed_blobs = add_completed_blobs
+        with self.assertLogs('lbrynet.blob.blob_manager', 'ERROR'):
+            written = self.blob_manager.blob_completed(self.blob_manager.get_blob(blob_hash, 100))
+            with self.assertRaises(sqlite3.OperationalError):
+                await self.blob_manager.flush_blob_writes()
+        self.assertIsInstance(written.exception(), sqlite3.OperationalError)
@@ -0,0 +1,93 @@
+import asyncio
+from torba.testcase import AsyncioTestCase
+from lbrynet.blob_exchange.scheduler import DownloadScheduler, PRIORITY_INTERACTIVE, PRIORITY_FOREGROUND, \
+    PRIORITY_BACKGROUND
+
+
+class TestDownloadScheduler(AsyncioTestCase):
+    async def test_single_class_uses_all_connections(self):
+        scheduler = DownloadScheduler(self.loop, 4)
+        for _ in range(4):
+            await scheduler.acquire(PRIORITY_BACKGROUND)
+        self.assertEqual(4, scheduler.active[PRIORITY_BACKGROUND])
+        waiter = self.loop.create_task(scheduler.acquire(PRIORITY_BACKGROUND))
+        await asyncio.sleep(0, loop=self.loop)
+        self.assertFalse(waiter.done())
+        scheduler.release(PRIORITY_BACKGROUND)
+        await waiter
+        self.assertEqual(4, scheduler.active[PRIORITY_BACKGROUND])
+
+    async def test_interactive_preempts_background_waiters(self):
+        scheduler = DownloadScheduler(self.loop, 4)
+        for _ in range(4):
+            await scheduler.acquire(PRIORITY_BACKGROUND)
+        background = self.loop.create_task(scheduler.acquire(PRIORITY_BACKGROUND))
+        foreground = self.loop.create_task(scheduler.acquire(PRIORITY_FOREGROUND))
+        interactive = self.loop.create_task(scheduler.acquire(PRIORITY_INTERACTIVE))
+        await asyncio.sleep(0, loop=self.loop)
+
+        # freed connections go to the highest priority waiter first
+        scheduler.release(PRIORITY_BACKGROUND)
+        await asyncio.sleep(0, loop=self.loop)
+        self.assertTrue(interactive.done())
+        self.assertFalse(foreground.done())
+        scheduler.release(PRIORITY_BACKGROUND)
+        await asyncio.sleep(0, loop=self.loop)
+        self.assertTrue(foreground.done())
+        self.assertFalse(background.done())
+
+        # background is held to its share (one of four connections) while higher priority classes are busy
+        scheduler.release(PRIORITY_BACKGROUND)
+        await asyncio.sleep(0, loop=self.loop)
+        self.assertFalse(background.done())
+        scheduler.release(PRIORITY_BACKGROUND)
+        await asyncio.sleep(0, loop=self.loop)
+        self.assertTrue(background.done())
+        self.assertDictEqual(
+            {PRIORITY_INTERACTIVE: 1, PRIORITY_FOREGROUND: 1, PRIORITY_BACKGROUND: 1}, scheduler.active
+        )
+
+    async def test_interactive_preempts_background_without_a_limit(self):
+        scheduler = DownloadScheduler(self.loop, 0)
+        for _ in range(8):  # alone, background work isn't limited
+            await scheduler.acquire(PRIORITY_BACKGROUND)
+        for _ in range(4):  # nor does it hold up interactive requests
+            await scheduler.acquire(PRIORITY_INTERACTIVE)
+        background = self.loop.create_task(scheduler.acquire(PRIORITY_BACKGROUND))
+        await asyncio.sleep(0, loop=self.loop)
+        self.assertFalse(background.done())
+        interactive = self.loop.create_task(scheduler.acquire(PRIORITY_INTERACTIVE))
+        await asyncio.sleep(0, loop=self.loop)
+        self.assertTrue(interactive.done())
+        self.assertFalse(background.done())
+
+        # background waits until it is within its share of the connections in use
+        for _ in range(7):
+            scheduler.release(PRIORITY_BACKGROUND)
+        await asyncio.sleep(0, loop=self.loop)
+        self.assertFalse(background.done())
+        scheduler.release(PRIORITY_BACKGROUND)
+        await asyncio.sleep(0, loop=self.loop)
+        self.assertTrue(background.done())
+        self.assertDictEqual(
+            {PRIORITY_INTERACTIVE: 5, PRIORITY_FOREGROUND: 0, PRIORITY_BACKGROUND: 1}, scheduler.active
+        )
+
+        # and is unlimited again once the interactive requests are done
+        for _ in range(5):
+            scheduler.release(PRIORITY_INTERACTIVE)
+        for _ in range(8):
+            await scheduler.acquire(PRIORITY_BACKGROUND)
+        self.assertEqual(9, scheduler.active[PRIORITY_BACKGROUND])
+
+    async def test_cancel_waiter(self):
+        scheduler = DownloadScheduler(self.loop, 1)
+        await scheduler.acquire(PRIORITY_FOREGROUND)
+        waiter = self.loop.create_task(scheduler.acquire(PRIORITY_INTERACTIVE))
+        await asyncio.sleep(0, loop=self.loop)
+        waiter.cancel()
+        await asyncio.sleep(0, loop=self.loop)
+        scheduler.release(PRIORITY_FOREGROUND)
+        await scheduler.acquire(PRIORITY_BACKGROUND)
+        self.assertEqual(1, scheduler.active[PRIORITY_BACKGROUND])
+        self.assertEqual(0, scheduler.active[PRIORITY_INTERACTIVE])
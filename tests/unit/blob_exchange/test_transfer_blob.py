@@ -12,6 +12,8 @@ from lbrynet.extras.daemon.storage import SQLiteStorage
 from lbrynet.blob.blob_manager import BlobManager
 from lbrynet.blob_exchange.server import BlobServer, BlobServerProtocol
 from lbrynet.blob_exchange.client import request_blob
+from lbrynet.blob_exchange.downloader import BlobDownloader
+from lbrynet.blob_exchange.scheduler import PRIORITY_FOREGROUND, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
 from lbrynet.dht.peer import KademliaPeer, PeerManager
 
 # import logging
@@ -225,3 +227,29 @@ class TestBlobExchange(BlobExchangeTestBase):
             server_protocol.data_received(bytes([byte]))
         await asyncio.sleep(0.1)  # yield execution
         self.assertTrue(len(received_data.getvalue()) > 0)
+
+    async def test_download_blob_requested_at_two_priorities(self):
+        blob_hash = "7f5ab2def99f0ddd008da71db3a3772135f4002b19b7605840ed1034c8955431bd7079549e65e6b2a3b9c17c773073ed"
+        mock_blob_bytes = b'1' * ((2 * 2 ** 20) - 1)
+        await self._add_blob_to_server(blob_hash, mock_blob_bytes)
+        peer_queue = asyncio.Queue(loop=self.loop)
+        peer_queue.put_nowait([self.server_from_client])
+        downloader = BlobDownloader(self.loop, self.client_config, self.client_blob_manager, peer_queue)
+        self.addCleanup(downloader.close)
+        requested = []
+        request_blob_from_peer = downloader.request_blob_from_peer
+
+        async def record_request(blob, peer, connection_id=0, priority=PRIORITY_FOREGROUND):
+            requested.append(priority)
+            return await request_blob_from_peer(blob, peer, connection_id, priority)
+
+        downloader.request_blob_from_peer = record_request
+        # both calls share one download, requested at the higher of the two priorities
+        background, interactive = await asyncio.gather(
+            downloader.download_blob(blob_hash, len(mock_blob_bytes), priority=PRIORITY_BACKGROUND),
+            downloader.download_blob(blob_hash, len(mock_blob_bytes), priority=PRIORITY_INTERACTIVE)
+        )
+        self.assertIs(background, interactive)
+        self.assertTrue(background.get_is_verified())
+        self.assertListEqual([PRIORITY_INTERACTIVE], requested)
+        self.assertDictEqual({}, downloader.blob_priorities)
@@ -1,4 +1,6 @@
+import os
 import shutil
+import sqlite3
 import tempfile
 import unittest
 import asyncio
@@ -121,6 +123,18 @@ class TestSQLiteStorage(StorageTest):
         blob_hashes = await self.storage.get_all_blob_hashes()
         self.assertEqual(blob_hashes, [])
 
+    async def test_batched_announce_bookkeeping(self):
+        now = 1000000
+        self.storage.time_getter = lambda: now
+        blob_hashes = [random_lbry_hash() for _ in range(2000)]
+        await self.storage.add_blobs(*((blob_hash, 100) for blob_hash in blob_hashes), finished=True)
+        self.assertEqual(2000, await self.storage.should_single_announce_blobs(blob_hashes, immediate=True))
+        now += 1
+        self.assertEqual(1500, len(await self.storage.get_blobs_to_announce(limit=1500)))
+        self.assertSetEqual(set(blob_hashes), set(await self.storage.get_blobs_to_announce(limit=2000)))
+        self.assertEqual(2000, await self.storage.update_last_announced_blobs(blob_hashes))
+        self.assertListEqual([], await self.storage.get_blobs_to_announce())
+
     async def test_supports_storage(self):
         claim_ids = [random_lbry_hash() for _ in range(10)]
         random_supports = [{
@@ -157,6 +171,66 @@ class StreamStorageTests(StorageTest):
         stream_hashes = await self.storage.get_all_stream_hashes()
         self.assertListEqual(stream_hashes, [])
 
+    async def test_filter_and_page_files(self):
+        sd_hashes = []
+        for i in range(5):
+            descriptor = await self.store_fake_stream(random_lbry_hash(), file_name=f"file{i}")
+            await self.storage.save_published_file(
+                descriptor.stream_hash, f"file{i}", self.blob_dir, 0, status='finished' if i % 2 else 'stopped'
+            )
+            outpoint = f"{'beef' * 16}:{i}"
+            await self.storage.db.execute(
+                "insert into claim values (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (outpoint, f"{i:040}", f"claim{i}", 1, 1, b'', None, "address", 1)
+            )
+            await self.storage.db.execute("insert into content_claim values (?, ?)", (descriptor.stream_hash, outpoint))
+            sd_hashes.append(descriptor.calculate_sd_hash())
+        # like get_all_lbry_files, files without a claim are left out
+        descriptor = await self.store_fake_stream(random_lbry_hash(), file_name="unclaimed")
+        await self.storage.save_published_file(descriptor.stream_hash, "unclaimed", self.blob_dir, 0)
+
+        self.assertListEqual(sd_hashes, await self.storage.get_filtered_file_sd_hashes('rowid'))
+        self.assertListEqual(
+            sd_hashes[::-1][1:3], await self.storage.get_filtered_file_sd_hashes('rowid', True, offset=1, limit=2)
+        )
+        self.assertListEqual(
+            [sd_hashes[1], sd_hashes[3]], await self.storage.get_filtered_file_sd_hashes('rowid', status='finished')
+        )
+        self.assertListEqual(
+            [sd_hashes[2]], await self.storage.get_filtered_file_sd_hashes('rowid', file_name='file2')
+        )
+        self.assertListEqual(
+            sd_hashes[3:],
+            await self.storage.get_filtered_file_sd_hashes('file_name', comparison='g', file_name='file2')
+        )
+        self.assertEqual(2, await self.storage.count_filtered_files(status='finished'))
+        self.assertEqual(5, await self.storage.count_filtered_files())
+
+
+class PooledReadStreamStorageTests(StreamStorageTests):
+    async def asyncSetUp(self):
+        self.conf = Config()
+        db_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, db_dir)
+        self.storage = SQLiteStorage(self.conf, os.path.join(db_dir, "lbrynet.sqlite"))
+        self.blob_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.blob_dir)
+        self.blob_manager = BlobManager(asyncio.get_event_loop(), self.blob_dir, self.storage, self.conf)
+        await self.storage.open()
+        self.assertIsNotNone(self.storage.read_pool)
+
+    async def test_read_connections_see_committed_writes(self):
+        blob_hash = random_lbry_hash()
+        await self.store_fake_blob(blob_hash)
+        self.assertListEqual([blob_hash], await self.storage.get_all_finished_blobs())
+        self.assertListEqual(
+            [(blob_hash, )], await self.storage.read_fetchall("select blob_hash from blob where status='finished'")
+        )
+
+    async def test_read_connections_are_read_only(self):
+        with self.assertRaises(sqlite3.OperationalError):
+            await self.storage.read(lambda transaction: transaction.execute("delete from blob"))
+
 
 @unittest.SkipTest
 class FileStorageTests(StorageTest):
@@ -1,6 +1,6 @@
 import asyncio
 from unittest import mock, TestCase
-from lbrynet.dht.protocol.data_store import DictDataStore
+from lbrynet.dht.protocol.data_store import DictDataStore, unpack_announcement
 from lbrynet.dht.peer import PeerManager
 
 
@@ -26,11 +26,15 @@ class DataStoreTests(TestCase):
         peer = self._test_add_peer_to_blob(blob=blob, node_id=b'a' * 48, address='1.2.3.4')
         self.assertTrue(self.data_store.has_peers_for_blob(blob))
         self.assertEqual(len(self.data_store.get_peers_for_blob(blob)), 1)
-        self.assertEqual(self.data_store._data_store[blob][0][1], 0)
+        stored = self.data_store._data_store[blob]
+        compact_address = bytes(peer.compact_address_udp())
+        self.assertEqual(unpack_announcement(stored[compact_address]), (0, 3333))
         self.loop.time = lambda: 100.0
-        self.assertEqual(self.data_store._data_store[blob][0][1], 0)
+        self.assertEqual(unpack_announcement(stored[compact_address]), (0, 3333))
+        peer.update_tcp_port(3334)
         self.data_store.add_peer_to_blob(peer, blob)
-        self.assertEqual(self.data_store._data_store[blob][0][1], 100)
+        self.assertEqual(unpack_announcement(stored[compact_address]), (100, 3334))
+        self.assertListEqual([3334], [p.tcp_port for p in self.data_store.get_peers_for_blob(blob)])
 
     def test_add_peer_to_blob(self, blob=b'f' * 48, peers=None):
         peers = peers or [
@@ -46,7 +50,7 @@ class DataStoreTests(TestCase):
         self.assertEqual(len(self.data_store.get_peers_for_blob(blob)), len(peers))
         return peer_objects
 
-    def test_get_storing_contacts(self, peers=None, blob1=b'd' * 48, blob2=b'e' * 48):
+    def _test_get_storing_contacts(self, peers=None, blob1=b'd' * 48, blob2=b'e' * 48):
         peers = peers or [
             (b'a' * 48, '1.2.3.4'),
             (b'b' * 48, '1.2.3.5'),
@@ -62,6 +66,15 @@ class DataStoreTests(TestCase):
 
         for o1, o2 in zip(peer_objs1, peer_objs2):
             self.assertIs(o1, o2)
+        return peer_objs1
+
+    def test_get_storing_contacts(self):
+        self._test_get_storing_contacts()
+
+    def _reannounce(self, ts, peers, blob):
+        self.loop.time = lambda: ts
+        for peer in peers:
+            self.data_store.add_peer_to_blob(peer, blob)
 
     def test_remove_expired_peers(self):
         peers = [
@@ -73,14 +86,15 @@ class DataStoreTests(TestCase):
         blob2 = b'e' * 48
 
         self.data_store.removed_expired_peers()  # nothing should happen
-        self.test_get_storing_contacts(peers, blob1, blob2)
+        peer_objs = self._test_get_storing_contacts(peers, blob1, blob2)
         self.assertEqual(len(self.data_store.get_peers_for_blob(blob1)), len(peers))
         self.assertEqual(len(self.data_store.get_peers_for_blob(blob2)), len(peers))
         self.assertEqual(len(self.data_store.get_storing_contacts()), len(peers))
 
         # expire the first peer from blob1
-        first = self.data_store._data_store[blob1][0][0]
-        self.data_store._data_store[blob1][0] = (first, -86401)
+        self._reannounce(100.0, peer_objs[1:], blob1)
+        self._reannounce(100.0, peer_objs, blob2)
+        self.loop.time = lambda: 86400.0 + 50.0
         self.assertEqual(len(self.data_store.get_storing_contacts()), len(peers))
         self.data_store.removed_expired_peers()
         self.assertEqual(len(self.data_store.get_peers_for_blob(blob1)), len(peers) - 1)
@@ -88,19 +102,31 @@ class DataStoreTests(TestCase):
         self.assertEqual(len(self.data_store.get_storing_contacts()), len(peers))
 
         # expire the first peer from blob2
-        first = self.data_store._data_store[blob2][0][0]
-        self.data_store._data_store[blob2][0] = (first, -86401)
+        self._reannounce(200.0, peer_objs[1:], blob1)
+        self._reannounce(200.0, peer_objs[1:], blob2)
+        self.loop.time = lambda: 86400.0 + 150.0
         self.data_store.removed_expired_peers()
         self.assertEqual(len(self.data_store.get_peers_for_blob(blob1)), len(peers) - 1)
         self.assertEqual(len(self.data_store.get_peers_for_blob(blob2)), len(peers) - 1)
         self.assertEqual(len(self.data_store.get_storing_contacts()), len(peers) - 1)
 
         # expire the second and third peers from blob1
-        first = self.data_store._data_store[blob2][0][0]
-        self.data_store._data_store[blob1][0] = (first, -86401)
-        second = self.data_store._data_store[blob2][1][0]
-        self.data_store._data_store[blob1][1] = (second, -86401)
+        self._reannounce(300.0, peer_objs[1:], blob2)
+        self.loop.time = lambda: 86400.0 + 250.0
         self.data_store.removed_expired_peers()
         self.assertEqual(len(self.data_store.get_peers_for_blob(blob1)), 0)
+        self.assertFalse(self.data_store.has_peers_for_blob(blob1))
         self.assertEqual(len(self.data_store.get_peers_for_blob(blob2)), len(peers) - 1)
         self.assertEqual(len(self.data_store.get_storing_contacts()), len(peers) - 1)
+
+    def test_refreshed_announcements_are_not_expired(self):
+        blob = b'f' * 48
+        peer = self._test_add_peer_to_blob(blob=blob)
+        for ts in range(1, 2001):
+            self._reannounce(float(ts), [peer], blob)
+        self.loop.time = lambda: 86400.0 + 1000.0
+        self.data_store.removed_expired_peers()
+        self.assertListEqual([peer], self.data_store.get_peers_for_blob(blob))
+        # the minutes that have fully expired are dropped from the time wheel
+        self.assertEqual(min(self.data_store._expirations), 16)
+        self.assertEqual(max(self.data_store._expirations), 33)
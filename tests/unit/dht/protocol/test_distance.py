@@ -1,5 +1,7 @@
 import unittest
-from lbrynet.dht.protocol.distance import Distance
+from lbrynet.dht import constants
+from lbrynet.dht.peer import KademliaPeer
+from lbrynet.dht.protocol.distance import Distance, sort_by_distance, closest_peers
 
 
 class DistanceTests(unittest.TestCase):
@@ -11,3 +13,14 @@ class DistanceTests(unittest.TestCase):
         self.assertRaises(ValueError, Distance(b'0' * 48), b'1' * 47)
         self.assertRaises(ValueError, Distance(b'0' * 48), b'1' * 49)
         self.assertRaises(ValueError, Distance(b'0' * 48), b'')
+
+    def test_sort_by_distance(self):
+        key = constants.generate_id(0)
+        peers = [KademliaPeer(None, '1.2.3.4', constants.generate_id(i), 4444) for i in range(1, 50)]
+        distance = Distance(key)
+        expected = sorted(peers, key=lambda peer: distance(peer.node_id))
+        self.assertListEqual(expected, sort_by_distance(key, peers))
+        self.assertListEqual(expected[:constants.k], closest_peers(key, peers, constants.k))
+        self.assertListEqual(expected, closest_peers(key, peers, 100))
+        self.assertListEqual([], closest_peers(key, [], constants.k))
+        self.assertRaises(ValueError, sort_by_distance, b'1' * 47, peers)
@@ -0,0 +1,82 @@
+import asyncio
+import random
+import typing
+from torba.testcase import AsyncioTestCase
+from lbrynet.dht import constants
+from lbrynet.dht.peer import PeerManager, KademliaPeer
+from lbrynet.dht.protocol.distance import closest_peers
+from lbrynet.dht.protocol.iterative_find import IterativeNodeFinder
+
+
+class FakeNetwork:
+    """
+    Answers find_node requests for a set of peers that each know their closest peers and a random sample of others
+    """
+
+    def __init__(self, peers: typing.List[KademliaPeer], known_per_peer: int = 20, seed: int = 0):
+        self.random = random.Random(seed)
+        self.known = {
+            peer: set(closest_peers(peer.node_id, (p for p in peers if p is not peer), constants.k)).union(
+                self.random.sample(peers, known_per_peer)
+            ).difference({peer}) for peer in peers
+        }
+        self.probed: typing.List[KademliaPeer] = []
+        self.outstanding = 0
+        self.max_outstanding = 0
+
+    async def find_node(self, peer: KademliaPeer, key: bytes) -> typing.List[typing.Tuple[bytes, str, int]]:
+        self.probed.append(peer)
+        self.outstanding += 1
+        self.max_outstanding = max(self.max_outstanding, self.outstanding)
+        try:
+            await asyncio.sleep(self.random.uniform(0.001, 0.01))
+        finally:
+            self.outstanding -= 1
+        return [(p.node_id, p.address, p.udp_port) for p in closest_peers(key, self.known[peer], constants.k)]
+
+
+class FakeProtocol:
+    def __init__(self, network: FakeNetwork):
+        self.network = network
+        self.node_id = constants.generate_id(-1)
+        self.external_ip = '1.2.3.4'
+        self.udp_port = 4444
+
+    def get_rpc_peer(self, peer: KademliaPeer):
+        network = self.network
+
+        class FakeRPC:
+            async def find_node(self, key: bytes):
+                return await network.find_node(peer, key)
+
+        return FakeRPC()
+
+
+class TestIterativeNodeFinder(AsyncioTestCase):
+    async def test_lookup_converges_with_alpha_outstanding(self):
+        loop = asyncio.get_event_loop()
+        peer_manager = PeerManager(loop)
+        peers = [
+            peer_manager.get_kademlia_peer(constants.generate_id(i), f'1.2.{i // 256}.{i % 256}', 4444)
+            for i in range(300)
+        ]
+        network = FakeNetwork(peers)
+        key = constants.generate_id(1000)
+        shortlist = network.random.sample(peers, constants.k)
+        finder = IterativeNodeFinder(loop, peer_manager, None, FakeProtocol(network), key, 20, constants.k * 2,
+                                     shortlist=shortlist)
+        found = []
+        async for iteration_peers in finder:
+            found.extend(iteration_peers)
+
+        # a lookup can miss one of the closest peers when the peers that know of it are probed late
+        self.assertGreaterEqual(
+            len(set(closest_peers(key, peers, constants.k)).intersection(found)), constants.k - 1
+        )
+        # the first probes go to the closest peers of the shortlist, then a probe is sent as each one finishes
+        self.assertSetEqual(set(closest_peers(key, shortlist, constants.alpha)),
+                            set(network.probed[:constants.alpha]))
+        self.assertEqual(constants.alpha, network.max_outstanding)
+        # only the closest peers known are probed rather than every peer heard of
+        self.assertLess(len(network.probed), 50)
+        self.assertEqual(len(network.probed), len(set(network.probed)))
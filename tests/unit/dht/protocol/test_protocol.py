@@ -143,7 +143,8 @@ class TestProtocol(AsyncioTestCase):
             await asyncio.sleep(0.5)
             self.assertEqual(1, len(peer1.routing_table.get_peers()))
             self.assertEqual(0, len(peer1.ping_queue._pending_contacts))
-            peer1.routing_table.buckets[0].peers.clear()
+            for peer in peer1.routing_table.get_peers():
+                peer1.routing_table.remove_peer(peer)
 
             # peers who are known to be bad recently should not be added or maybe-pinged
             peer1_from_peer4 = peer4.get_rpc_peer(peer4.peer_manager.get_kademlia_peer(node_id1, '1.2.3.4', 4444))
@@ -99,9 +99,48 @@ class TestRouting(AsyncioTestCase):
                 self.assertEqual(expected_max, bucket.range_max)
                 covered += bucket.range_max - bucket.range_min
             self.assertEqual(2**384, covered)
+            # the index stays in sync with the buckets through the splits
+            routing_table = node_1.protocol.routing_table
+            for peer in routing_table.get_peers():
+                self.assertIs(peer, routing_table.get_peer(peer.node_id))
+                self.assertIs(peer, routing_table.get_peer_by_address(peer.address, peer.udp_port))
+            self.assertEqual(40, len(routing_table._index.by_node_id))
             for node in nodes.values():
                 node.stop()
 
+    async def test_address_and_node_id_index(self):
+        loop = asyncio.get_event_loop()
+        peer_manager = PeerManager(loop)
+        with dht_mocks.mock_network_loop(loop):
+            node = Node(loop, peer_manager, constants.generate_id(1), 4444, 4444, 3333, '1.2.3.1')
+            routing_table = node.protocol.routing_table
+            peer = peer_manager.get_kademlia_peer(constants.generate_id(2), '1.2.3.2', 4444)
+            self.assertTrue(await node.protocol._add_peer(peer))
+            self.assertIn(peer, routing_table)
+            self.assertTrue(routing_table.contact_in_routing_table(('1.2.3.2', 4444)))
+            self.assertFalse(routing_table.contact_in_routing_table(('1.2.3.2', 4445)))
+
+            # a new node id at a known address replaces the old peer
+            replacement = peer_manager.get_kademlia_peer(constants.generate_id(3), '1.2.3.2', 4444)
+            self.assertTrue(await node.protocol._add_peer(replacement))
+            self.assertListEqual([replacement], routing_table.get_peers())
+            self.assertNotIn(peer, routing_table)
+            self.assertIs(replacement, routing_table.get_peer_by_address('1.2.3.2', 4444))
+            with self.assertRaises(IndexError):
+                routing_table.get_peer(peer.node_id)
+
+            # a known node id at a new address replaces its old address
+            moved = peer_manager.get_kademlia_peer(replacement.node_id, '1.2.3.3', 4444)
+            self.assertTrue(await node.protocol._add_peer(moved))
+            self.assertListEqual([moved], routing_table.get_peers())
+            self.assertIsNone(routing_table.get_peer_by_address('1.2.3.2', 4444))
+            self.assertIs(moved, routing_table.get_peer(moved.node_id))
+
+            routing_table.remove_peer(moved)
+            self.assertListEqual([], routing_table.get_peers())
+            self.assertFalse(routing_table.contact_in_routing_table(('1.2.3.3', 4444)))
+            node.stop()
+
 
 # from binascii import hexlify, unhexlify
 #
@@ -59,7 +59,15 @@ class EncodeDecodeTest(unittest.TestCase):
             [[b'abc', b'127.0.0.1', 1919], [b'def', b'127.0.0.1', 1921]]
         )
 
+    def test_nested_dict(self):
+        encoded = bencode({b'a': {b'b': [1, {b'c': b'd'}]}, b'e': 2})
+        self.assertEqual(encoded, b'd1:ad1:bli1ed1:c1:deee1:ei2ee')
+        self.assertEqual(bdecode(encoded), {b'a': {b'b': [1, {b'c': b'd'}]}, b'e': 2})
+
     def test_decode_error(self):
         self.assertRaises(DecodeError, bdecode, b'abcdefghijklmnopqrstuvwxyz', True)
         self.assertRaises(DecodeError, bdecode, b'', True)
         self.assertRaises(DecodeError, bdecode, b'l4:spami42ee')
+        self.assertRaises(DecodeError, bdecode, b'd3:foo4:spae', True)
+        self.assertRaises(DecodeError, bdecode, b'd3:fooi42e', True)
+        self.assertRaises(DecodeError, bdecode, b'li42', True)
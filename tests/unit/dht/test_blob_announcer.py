@@ -2,16 +2,59 @@ import contextlib
 import typing
 import binascii
 import asyncio
+import unittest
 from torba.testcase import AsyncioTestCase
 from tests import dht_mocks
 from lbrynet.conf import Config
 from lbrynet.dht import constants
 from lbrynet.dht.node import Node
 from lbrynet.dht.peer import PeerManager
-from lbrynet.dht.blob_announcer import BlobAnnouncer
+from lbrynet.dht.blob_announcer import BlobAnnouncer, AnnounceScheduler
 from lbrynet.extras.daemon.storage import SQLiteStorage
 
 
+class TestAnnounceScheduler(unittest.TestCase):
+    def test_backlog(self):
+        scheduler = AnnounceScheduler(10)
+        self.assertEqual(60.0, scheduler.round_delay())
+        self.assertEqual(5, scheduler.next_batch_size(5))
+        self.assertEqual(100, scheduler.next_batch_size(5000))
+        scheduler.fetched(scheduler.fetch_limit)
+        self.assertEqual(0.0, scheduler.round_delay())
+        # size the batches from the observed announce rate
+        scheduler.record_batch(100, 100, 10.0, 5000)
+        self.assertEqual(300, scheduler.next_batch_size(5000))
+        scheduler.fetched(10)
+        self.assertEqual(60.0, scheduler.round_delay())
+
+    def test_failures_reduce_concurrency(self):
+        scheduler = AnnounceScheduler(10)
+        scheduler.fetched(scheduler.fetch_limit)
+        scheduler.record_batch(100, 10, 10.0, 5000)
+        self.assertEqual(5, scheduler.concurrency)
+        scheduler.record_batch(100, 10, 10.0, 5000)
+        self.assertEqual(2, scheduler.concurrency)
+        scheduler.record_batch(100, 10, 10.0, 5000)
+        self.assertEqual(1, scheduler.concurrency)
+        # back off between rounds once most announcements fail
+        self.assertEqual(60.0, scheduler.round_delay())
+        for _ in range(20):
+            scheduler.record_batch(100, 100, 10.0, 5000)
+        self.assertEqual(10, scheduler.concurrency)
+        self.assertEqual(0.0, scheduler.round_delay())
+
+    def test_packet_rate_limit(self):
+        scheduler = AnnounceScheduler(10, max_packets_per_second=100.0)
+        scheduler.record_batch(100, 100, 10.0, 5000)
+        self.assertEqual(5, scheduler.concurrency)
+        self.assertEqual(40.0, scheduler.pause(10.0, 5000))
+        # 50 packets per blob at 100 packets per second fits 60 blobs in a 30 second batch
+        self.assertEqual(60, scheduler.next_batch_size(5000))
+        scheduler.record_batch(60, 60, 60.0, 3000)
+        self.assertEqual(6, scheduler.concurrency)
+        self.assertEqual(0.0, scheduler.pause(60.0, 3000))
+
+
 class TestBlobAnnouncer(AsyncioTestCase):
     async def setup_node(self, peer_addresses, address, node_id):
         self.nodes: typing.Dict[int, Node] = {}
@@ -113,3 +156,16 @@ class TestBlobAnnouncer(AsyncioTestCase):
             self.assertEqual(self.node.protocol.node_id, found_peers[0].node_id)
             self.assertEqual(self.node.protocol.external_ip, found_peers[0].address)
             self.assertEqual(self.node.protocol.peer_port, found_peers[0].tcp_port)
+
+    async def test_announce_blobs_batch(self):
+        blob_hashes = [binascii.hexlify(constants.generate_id(1000 + i)).decode() for i in range(20)]
+
+        async with self._test_network_context():
+            announce = self.loop.create_task(self.node.announce_blobs(blob_hashes, search_concurrency=3))
+            await self.advance(60.0)
+            stored_to = await announce
+            self.assertSetEqual(set(blob_hashes), set(stored_to))
+            for blob_hash in blob_hashes:
+                self.assertSetEqual({n.protocol.node_id for n in self.nodes.values()}, set(stored_to[blob_hash]))
+                for n in self.nodes.values():
+                    self.assertTrue(n.protocol.data_store.has_peers_for_blob(binascii.unhexlify(blob_hash)))
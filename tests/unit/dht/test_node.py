@@ -4,7 +4,7 @@ from torba.testcase import AsyncioTestCase
 from tests import dht_mocks
 from lbrynet.dht import constants
 from lbrynet.dht.node import Node
-from lbrynet.dht.peer import PeerManager
+from lbrynet.dht.peer import PeerManager, KademliaPeer
 
 
 class TestNodePingQueueDiscover(AsyncioTestCase):
@@ -84,3 +84,22 @@ class TestNodePingQueueDiscover(AsyncioTestCase):
             # teardown
             for n in nodes.values():
                 n.stop()
+
+
+class TestLookupCoversKey(AsyncioTestCase):
+    def test_lookup_covers_key(self):
+        loop = asyncio.get_event_loop()
+        searched = bytes(constants.hash_length)
+
+        def make_peer(distance: int) -> KademliaPeer:
+            return KademliaPeer(loop, '1.2.3.4', distance.to_bytes(constants.hash_length, 'big'), udp_port=4444)
+
+        # the k closest peers are at distances below 2 ** 101, the next k at distances of 2 ** 101 and above
+        found = [make_peer(2 ** 100 + i) for i in range(constants.k)] + \
+                [make_peer(2 ** 101 + i) for i in range(constants.k)]
+        nearby = (2 ** 101 - 1).to_bytes(constants.hash_length, 'big')
+        self.assertTrue(Node._lookup_covers_key(searched, found, nearby))
+        farther = (2 ** 101).to_bytes(constants.hash_length, 'big')
+        self.assertFalse(Node._lookup_covers_key(searched, found, farther))
+        # without 2k peers found there is no boundary to check against
+        self.assertFalse(Node._lookup_covers_key(searched, found[:-1], nearby))
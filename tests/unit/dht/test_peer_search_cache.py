@@ -0,0 +1,66 @@
+import asyncio
+from unittest import mock, TestCase
+from lbrynet.dht import constants
+from lbrynet.dht.peer import KademliaPeer
+from lbrynet.dht.peer_search_cache import PeerSearchCache
+
+
+class PeerSearchCacheTests(TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.loop = mock.Mock(spec=asyncio.BaseEventLoop)
+        self.loop.time = lambda: self.now
+        self.cache = PeerSearchCache(self.loop, ttl=60.0, negative_ttl=10.0, max_size=3)
+
+    def _make_peer(self, i: int) -> KademliaPeer:
+        return KademliaPeer(self.loop, f'1.2.3.{i}', constants.generate_id(i), tcp_port=3333)
+
+    def test_add_and_expire(self):
+        key = constants.generate_id(100)
+        peers = [self._make_peer(i) for i in range(3)]
+        self.assertIsNone(self.cache.get(key))
+        self.cache.add(key, peers[:2])
+        self.cache.add(key, peers[1:])
+        self.assertListEqual(peers, self.cache.get(key))
+        self.now = 59.0
+        self.assertListEqual(peers, self.cache.get(key))
+        self.now = 60.0
+        self.assertIsNone(self.cache.get(key))
+        self.assertEqual(0, len(self.cache))
+        self.assertDictEqual({}, self.cache._keys_by_address)
+
+    def test_not_found(self):
+        key = constants.generate_id(100)
+        self.cache.add_not_found(key)
+        self.assertListEqual([], self.cache.get(key))
+        self.now = 10.0
+        self.assertIsNone(self.cache.get(key))
+        # a search that found peers isn't replaced by a later one that didn't
+        peer = self._make_peer(1)
+        self.cache.add(key, [peer])
+        self.cache.add_not_found(key)
+        self.assertListEqual([peer], self.cache.get(key))
+
+    def test_invalidate_peer(self):
+        key1, key2 = constants.generate_id(100), constants.generate_id(101)
+        peer1, peer2 = self._make_peer(1), self._make_peer(2)
+        self.cache.add(key1, [peer1, peer2])
+        self.cache.add(key2, [peer2])
+        self.cache.invalidate_peer(peer1)
+        self.assertIsNone(self.cache.get(key1))
+        self.assertListEqual([peer2], self.cache.get(key2))
+        self.cache.invalidate_peer(self._make_peer(2))
+        self.assertIsNone(self.cache.get(key2))
+        self.assertDictEqual({}, self.cache._keys_by_address)
+
+    def test_size_bound(self):
+        keys = [constants.generate_id(100 + i) for i in range(4)]
+        for i, key in enumerate(keys[:3]):
+            self.cache.add(key, [self._make_peer(i)])
+        # keep the first key as the most recently used
+        self.cache.get(keys[0])
+        self.cache.add(keys[3], [self._make_peer(3)])
+        self.assertEqual(3, len(self.cache))
+        self.assertIsNone(self.cache.get(keys[1]))
+        for key in (keys[0], keys[2], keys[3]):
+            self.assertIsNotNone(self.cache.get(key))
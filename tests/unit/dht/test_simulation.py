@@ -0,0 +1,63 @@
+import asyncio
+from unittest import TestCase
+from lbrynet.dht import constants
+from tests.dht_simulation import SimulatedLoop, SimulatedNetwork
+
+
+class TestSimulatedNetwork(TestCase):
+    def setUp(self):
+        self.loop = SimulatedLoop()
+        self.addCleanup(self.loop.close)
+
+    def _make_network(self, node_count: int, **kwargs) -> SimulatedNetwork:
+        network = SimulatedNetwork(self.loop, seed=0, **kwargs)
+        network.add_nodes(node_count)
+        network.bootstrap()
+
+        def stop():
+            network.stop()
+            self.loop.run_until_complete(asyncio.sleep(0, loop=self.loop))
+        self.addCleanup(stop)
+        return network
+
+    def test_simulated_clock(self):
+        async def sleep():
+            await asyncio.sleep(3600, loop=self.loop)
+            return self.loop.time()
+        self.assertEqual(3600.0, self.loop.run_until_complete(sleep()))
+
+    def test_lookups_and_announces(self):
+        network = self._make_network(200)
+        nodes = list(network.nodes.values())
+        for i, node in enumerate(nodes[:10]):
+            result = self.loop.run_until_complete(network.lookup(node, constants.generate_id(i)))
+            self.assertGreaterEqual(result.closest_found, constants.k - 1)
+            self.assertGreater(result.latency, 0)
+            self.assertGreater(result.sent_requests, 0)
+        stored_to = self.loop.run_until_complete(network.announce(nodes[0], 10))
+        self.assertEqual(10, len(stored_to))
+        self.assertTrue(all(len(node_ids) == constants.k for node_ids in stored_to.values()))
+
+    def test_loss_and_churn(self):
+        network = self._make_network(200, loss=0.05)
+        network.churn(0.1)
+        self.assertEqual(20, len(network.offline))
+        network.churn(0.1)
+        self.assertEqual(20, len(network.offline))
+        node = network.online_nodes()[0]
+        result = self.loop.run_until_complete(network.lookup(node, constants.generate_id(0)))
+        self.assertGreater(result.closest_found, 0)
+        self.assertGreater(network.dropped, 0)
+
+    def test_search_blob_peers_caches_complete_searches(self):
+        network = self._make_network(100)
+        nodes = list(network.nodes.values())
+        blob_hash = list(self.loop.run_until_complete(network.announce(nodes[0], 1)))[0]
+        searching = nodes[1]
+        peers = self.loop.run_until_complete(searching.search_blob_peers(blob_hash, bottom_out_limit=4, max_results=1))
+        self.assertEqual(1, len(peers))
+        self.assertEqual(0, len(searching.peer_search_cache))
+        peers = self.loop.run_until_complete(searching.search_blob_peers(blob_hash))
+        self.assertEqual(1, len(peers))
+        self.assertEqual(1, len(searching.peer_search_cache))
+        self.assertListEqual(peers, self.loop.run_until_complete(searching.search_blob_peers(blob_hash, max_results=1)))
@@ -76,6 +76,19 @@ class TestManagedStream(BlobExchangeTestBase):
         self.assertEqual(self.stream.status, "finished")
         self.assertFalse(self.stream._running.is_set())
 
+    async def test_peers_found_for_sd_blob_are_reused(self):
+        searched = []
+
+        def _mock_accumulate_peers(q1, q2):
+            async def _task():
+                while True:
+                    searched.append(await q1.get())
+            q2.put_nowait([self.server_from_client])
+            return q2, self.loop.create_task(_task())
+
+        await self._test_transfer_stream(10, _mock_accumulate_peers)
+        self.assertListEqual([self.sd_hash], searched)
+
     @unittest.SkipTest
     async def test_transfer_hundred_blob_stream(self):
         await self._test_transfer_stream(100)
@@ -107,6 +120,67 @@ class TestManagedStream(BlobExchangeTestBase):
         # self.assertIs(self.server_from_client.tcp_last_down, None)
         # self.assertIsNot(bad_peer.tcp_last_down, None)
 
+    async def test_resume_saving_partial_file(self):
+        await self._test_transfer_stream(10)
+        output_path = self.stream.full_path
+        written = 3 * (MAX_BLOB_SIZE - 1)
+        with open(output_path, 'r+b') as f:
+            f.truncate(written)
+        await self.client_storage.save_file_progress(self.stream.stream_hash, 3, written)
+
+        read_blobs = []
+        read_blob = self.stream.downloader.read_blob
+
+        async def _read_blob(blob_info, *args, **kwargs):
+            read_blobs.append(blob_info.blob_num)
+            return await read_blob(blob_info, *args, **kwargs)
+
+        self.stream.downloader.read_blob = _read_blob
+        mock_node = mock.Mock(spec=Node)
+
+        def _mock_accumulate_peers(q1, q2):
+            async def _task():
+                pass
+            q2.put_nowait([self.server_from_client])
+            return q2, self.loop.create_task(_task())
+
+        mock_node.accumulate_peers = _mock_accumulate_peers
+        await self.stream.save_file(self.stream.file_name, self.stream.download_directory, node=mock_node)
+        await self.stream.finished_writing.wait()
+        self.assertEqual(output_path, self.stream.full_path)
+        self.assertListEqual(list(range(3, 10)), read_blobs)
+        with open(output_path, 'rb') as f:
+            self.assertEqual(f.read(), self.stream_bytes)
+        self.assertIsNone(await self.client_storage.get_file_progress(self.stream.stream_hash))
+        await self.stream.stop()
+
+    async def _test_head_blob_fetch(self, speculative: bool):
+        self.client_config.speculative_head_blob_fetch = speculative
+        await self.setup_stream(2)
+        mock_node = mock.Mock(spec=Node)
+
+        def _mock_accumulate_peers(q1, q2):
+            async def _task():
+                pass
+            q2.put_nowait([self.server_from_client])
+            return q2, self.loop.create_task(_task())
+
+        mock_node.accumulate_peers = _mock_accumulate_peers
+        await self.stream.start(mock_node)
+        head_blob_hash = self.stream.descriptor.blobs[0].blob_hash
+        if speculative:
+            await self.stream.downloader.head_blob_task
+        await asyncio.sleep(0.1, loop=self.loop)
+        self.assertEqual(speculative, self.client_blob_manager.is_blob_verified(head_blob_hash))
+        await self.stream.stop()
+
+    async def test_speculative_head_blob_fetch(self):
+        await self._test_head_blob_fetch(True)
+
+    async def test_head_blob_fetched_on_read(self):
+        await self._test_head_blob_fetch(False)
+        self.assertIsNone(self.stream.downloader.head_blob_task)
+
     async def test_client_chunked_response(self):
         self.server.stop_server()
 
@@ -41,7 +41,7 @@ class TestStreamAssembler(AsyncioTestCase):
 
         self.stream = await self.stream_manager.create_stream(file_path)
 
-    async def test_reflect_stream(self):
+    async def _test_reflect_stream(self):
         reflector = ReflectorServer(self.server_blob_manager)
         reflector.start_server(5566, '127.0.0.1')
         await reflector.started_listening.wait()
@@ -63,6 +63,30 @@ class TestStreamAssembler(AsyncioTestCase):
         sent = await self.stream.upload_to_reflector('127.0.0.1', 5566)
         self.assertListEqual(sent, [])
 
+    async def test_reflect_stream(self):
+        return await self._test_reflect_stream()
+
+    async def test_reflect_stream_single_connection(self):
+        self.stream.config.reflector_upload_connections = 1
+        return await self._test_reflect_stream()
+
+    async def test_resume_reflect_stream(self):
+        reflector = ReflectorServer(self.server_blob_manager)
+        reflector.start_server(5566, '127.0.0.1')
+        await reflector.started_listening.wait()
+        self.addCleanup(reflector.stop_server)
+        sent = await self.stream.upload_to_reflector('127.0.0.1', 5566)
+        self.assertEqual(len(self.stream.descriptor.blobs), len(sent))
+
+        # the reflector lost some blobs, a new upload should only send those
+        to_delete = [blob.blob_hash for blob in self.stream.descriptor.blobs[1:3]]
+        await self.server_blob_manager.delete_blobs(to_delete)
+        self.stream.fully_reflected.clear()
+        sent = await self.stream.upload_to_reflector('127.0.0.1', 5566)
+        self.assertSetEqual(set(to_delete), set(sent))
+        for blob_hash in to_delete:
+            self.assertTrue(self.server_blob_manager.get_blob(blob_hash).get_is_verified())
+
     async def test_announces(self):
         to_announce = await self.storage.get_blobs_to_announce()
         self.assertIn(self.stream.sd_hash, to_announce, "sd blob not set to announce")
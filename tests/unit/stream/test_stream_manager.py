@@ -12,7 +12,8 @@ from lbrynet.error import InsufficientFundsError, KeyFeeAboveMaxAllowed, Resolve
     DownloadDataTimeout
 from lbrynet.wallet.manager import LbryWalletManager
 from lbrynet.extras.daemon.analytics import AnalyticsManager
-from lbrynet.stream.stream_manager import StreamManager
+from lbrynet.stream.stream_manager import StreamManager, REFLECT_PRIORITY_RE_REFLECT, file_info_value
+from lbrynet.stream.managed_stream import ManagedStream
 from lbrynet.stream.descriptor import StreamDescriptor
 from lbrynet.dht.node import Node
 from lbrynet.dht.protocol.protocol import KademliaProtocol
@@ -255,6 +256,24 @@ class TestStreamManager(BlobExchangeTestBase):
         self.assertEqual(stored_status, None)
         self.assertListEqual(expected_events, received)
 
+    async def test_filtered_streams_use_indexes(self):
+        await self.setup_stream_manager()
+        stream = await self.stream_manager.download_stream_from_uri(self.uri, self.exchange_rate_manager)
+        self.assertListEqual([stream], self.stream_manager.get_filtered_streams(sd_hash=stream.sd_hash))
+        self.assertListEqual([stream], self.stream_manager.get_filtered_streams(claim_id=stream.claim_id))
+        self.assertListEqual([stream], self.stream_manager.get_filtered_streams(outpoint=stream.outpoint))
+        self.assertListEqual([stream], self.stream_manager.get_filtered_streams(status='running'))
+        self.assertIs(stream, self.stream_manager.get_stream_by_stream_hash(stream.stream_hash))
+
+        await stream.stop()
+        self.assertListEqual([], self.stream_manager.get_filtered_streams(status='running'))
+        self.assertListEqual([stream], self.stream_manager.get_filtered_streams(status='stopped'))
+
+        await self.stream_manager.delete_stream(stream, True)
+        self.assertListEqual([], self.stream_manager.get_filtered_streams(claim_id=stream.claim_id))
+        self.assertListEqual([], self.stream_manager.get_filtered_streams(status='stopped'))
+        self.assertIsNone(self.stream_manager.get_stream_by_stream_hash(stream.stream_hash))
+
     async def _test_download_error_on_start(self, expected_error, timeout=None):
         with self.assertRaises(expected_error):
             await self.stream_manager.download_stream_from_uri(self.uri, self.exchange_rate_manager, timeout)
@@ -332,6 +351,115 @@ class TestStreamManager(BlobExchangeTestBase):
         self.assertIsNone(stream.full_path)
         self.assertEqual(0, stream.written_bytes)
 
+    async def test_lazy_restore_on_startup(self):
+        await self.setup_stream_manager()
+        stream = await self.stream_manager.download_stream_from_uri(self.uri, self.exchange_rate_manager)
+        await stream.finished_writing.wait()
+        await asyncio.sleep(0, loop=self.loop)
+        self.stream_manager.stop()
+
+        self.client_config.lazy_stream_restore = True
+        self.stream_manager.restore_pending_streams = lambda *_: asyncio.sleep(0, loop=self.loop)
+        await self.stream_manager.start()
+        self.assertDictEqual({}, self.stream_manager.streams)
+        self.assertListEqual([self.sd_hash], list(self.stream_manager.pending_file_infos.keys()))
+
+        await self.stream_manager.restore_streams(claim_id='0' * 40)
+        self.assertDictEqual({}, self.stream_manager.streams)
+        # a deferred file without a claim is only matched by the file fields
+        self.assertIsNone(file_info_value(dict(self.stream_manager.pending_file_infos[self.sd_hash], claim=None),
+                                          'claim_id'))
+        # looking for an existing download of a claim initializes the deferred streams for it
+        claim = Claim()
+        claim.stream.source.sd_hash = self.sd_hash
+        existing, to_replace = await self.stream_manager._check_update_or_replace(
+            stream.outpoint, stream.claim_id, claim
+        )
+        self.assertIsNone(to_replace)
+        self.assertEqual(self.sd_hash, existing.sd_hash)
+        self.assertDictEqual({}, self.stream_manager.pending_file_infos)
+        self.assertListEqual([self.sd_hash], list(self.stream_manager.streams.keys()))
+        self.assertEqual('finished', self.stream_manager.streams[self.sd_hash].status)
+
+    async def test_restore_from_cached_descriptor(self):
+        await self.setup_stream_manager()
+        stream = await self.stream_manager.download_stream_from_uri(self.uri, self.exchange_rate_manager)
+        await stream.finished_writing.wait()
+        await asyncio.sleep(0, loop=self.loop)
+        self.stream_manager.stop()
+
+        def get_stream_descriptor(sd_hash):
+            raise AssertionError("sd blob should not be parsed")
+
+        self.client_blob_manager.get_stream_descriptor = get_stream_descriptor
+        await self.stream_manager.start()
+        restored = self.stream_manager.streams[self.sd_hash]
+        self.assertEqual(stream.descriptor.as_json(), restored.descriptor.as_json())
+        self.assertEqual(stream.descriptor.length, restored.descriptor.length)
+        self.assertEqual('finished', restored.status)
+
+    async def test_reflect_queue_retry_and_persist(self):
+        await self.setup_stream_manager()
+        stream = await self.stream_manager.download_stream_from_uri(self.uri, self.exchange_rate_manager)
+        await stream.finished_writing.wait()
+        await asyncio.sleep(0, loop=self.loop)
+        self.client_config.reflector_servers = [('127.0.0.1', 5566)]
+        attempts = []
+
+        async def upload_to_reflector(managed_stream, host, port):
+            attempts.append((host, port))
+            if len(attempts) > 1:
+                managed_stream.fully_reflected.set()
+            return []
+
+        with mock.patch.object(ManagedStream, 'upload_to_reflector', upload_to_reflector), \
+                mock.patch('lbrynet.stream.stream_manager.REFLECT_RETRY_DELAY', 0.5):
+            await self.stream_manager.queue_stream_for_reflection(stream)
+            self.stream_manager.re_reflect_task = self.loop.create_task(self.stream_manager.reflect_streams())
+            while not attempts:
+                await asyncio.sleep(0.01, loop=self.loop)
+            await asyncio.sleep(0.1, loop=self.loop)
+            queued = await self.client_storage.get_reflector_queue()
+            self.assertEqual(1, len(queued))
+            self.assertEqual((self.sd_hash, 0, 1), queued[0][:2] + queued[0][3:4])
+
+            # the failed upload is retried after a restart
+            self.stream_manager.stop()
+            await self.stream_manager.start()
+            await asyncio.wait_for(self.stream_manager.streams[self.sd_hash].fully_reflected.wait(), 2)
+            await asyncio.sleep(0.1, loop=self.loop)
+        self.assertEqual(2, len(attempts))
+        self.assertListEqual([], await self.client_storage.get_reflector_queue())
+
+    async def test_re_reflect_after_interval(self):
+        await self.setup_stream_manager()
+        stream = await self.stream_manager.download_stream_from_uri(self.uri, self.exchange_rate_manager)
+        await stream.finished_writing.wait()
+        await asyncio.sleep(0, loop=self.loop)
+        self.client_config.reflector_servers = [('127.0.0.1', 5566)]
+        uploaded = asyncio.Queue(loop=self.loop)
+
+        async def upload_to_reflector(managed_stream, host, port):
+            managed_stream.fully_reflected.set()
+            uploaded.put_nowait(managed_stream.sd_hash)
+            return []
+
+        with mock.patch.object(ManagedStream, 'upload_to_reflector', upload_to_reflector):
+            await self.stream_manager.queue_stream_for_reflection(stream)
+            self.stream_manager.re_reflect_task = self.loop.create_task(self.stream_manager.reflect_streams())
+            self.assertEqual(self.sd_hash, await asyncio.wait_for(uploaded.get(), 2))
+            await asyncio.sleep(0.1, loop=self.loop)
+            self.assertEqual(REFLECT_PRIORITY_RE_REFLECT, self.stream_manager._reflect_entries[self.sd_hash][0])
+            self.assertIn(self.sd_hash, self.stream_manager._reflect_retries)
+            self.assertListEqual([], await self.client_storage.get_reflector_queue())
+
+            # a day later the stream is queued and uploaded again
+            now = self.loop.time()
+            with mock.patch.object(self.loop, 'time', lambda: now + 86401):
+                self.assertEqual(self.sd_hash, await asyncio.wait_for(uploaded.get(), 2))
+            await asyncio.sleep(0.1, loop=self.loop)
+            self.assertIn(self.sd_hash, self.stream_manager._reflect_retries)
+
     async def test_download_then_recover_stream_on_startup(self, old_sort=False):
         expected_analytics_events = [
             'Time To First Bytes',
@@ -350,6 +478,7 @@ class TestStreamManager(BlobExchangeTestBase):
         await stream.finished_writing.wait()
         await asyncio.sleep(0, loop=self.loop)
         self.stream_manager.stop()
+        await self.client_blob_manager.flush_blob_writes()
         self.client_blob_manager.stop()
         os.remove(os.path.join(self.client_blob_manager.blob_dir, stream.sd_hash))
         for blob in stream.descriptor.blobs[:-1]: